@@ -42,6 +42,21 @@ def create_app(config_class=Config):
     except Exception as e:
         print(f"Error initializing MongoDB: {e}")
     
+    # Create indexes used by the services
+    try:
+        from app.services.report_service import ReportService
+        from app.services.student_service import StudentService
+        from app.services.student_index_service import StudentIndexService
+        from app.services.job_service import JobService
+        from app.services.notice_service import NoticeService
+        ReportService.ensure_indexes()
+        JobService.ensure_indexes()
+        NoticeService.ensure_indexes()
+        StudentService.ensure_indexes()
+        StudentIndexService.ensure_indexes()
+    except Exception as e:
+        print(f"Error creating indexes: {e}")
+    
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.notices import notices_bp
@@ -71,4 +86,8 @@ def create_app(config_class=Config):
     from app.utils.errors import register_error_handlers
     register_error_handlers(app)
     
+    # CLI commands (migrations and maintenance)
+    from app.commands import register_commands
+    register_commands(app)
+    
     return app
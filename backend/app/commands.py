@@ -0,0 +1,67 @@
+# app/commands.py
+import click
+
+
+def register_commands(app):
+    @app.cli.command('backfill-packages')
+    @click.option('--all', 'recompute', is_flag=True, help='Recompute jobs that already have a package value.')
+    def backfill_packages(recompute):
+        """Store the numeric package and stipend on existing jobs."""
+        from app.services.placement_service import PlacementService
+        updated = PlacementService.backfill_package_values(recompute=recompute)
+        click.echo(f"Updated package and stipend values on {updated} jobs")
+
+    @app.cli.command('backfill-student-cohorts')
+    def backfill_student_cohorts():
+        """Store batch, department and program on existing students and student users."""
+        from app.services.student_service import StudentService
+        updated = StudentService.backfill_cohorts()
+        click.echo(f"Updated batch, department and program on {updated['users']} users and {updated['student']} students")
+
+    @app.cli.command('backfill-verified-flags')
+    def backfill_verified_flags():
+        """Store whether each student's profile is fully verified."""
+        from app.services.student_service import StudentService
+        verified = StudentService.backfill_verified_flags()
+        click.echo(f"Stored verification flags; {verified} students are fully verified")
+
+    @app.cli.command('dedupe-applications')
+    def dedupe_applications():
+        """Delete duplicate applications of a student to a job and create the unique index."""
+        from app.services.job_service import JobService
+        deleted = JobService.dedupe_applications()
+        JobService.ensure_indexes()
+        click.echo(f"Deleted {deleted} duplicate applications")
+
+    @app.cli.command('rebuild-cycle-stats')
+    @click.option('--cycle-id', default=None, help='Only rebuild this placement cycle.')
+    def rebuild_cycle_stats(cycle_id):
+        """Recompute the maintained placement statistics from applications."""
+        from app.services.cycle_stats_service import CycleStatsService
+        if cycle_id:
+            CycleStatsService.rebuild(cycle_id)
+            click.echo(f"Rebuilt statistics for cycle {cycle_id}")
+        else:
+            count = CycleStatsService.rebuild_all()
+            click.echo(f"Rebuilt statistics for {count} cycles")
+
+    @app.cli.command('run-report-worker')
+    def run_report_worker():
+        """Run the report queue dispatcher and scheduler until stopped."""
+        import time
+        from app.services.report_queue_service import ReportQueueService
+        from app.services.report_scheduler_service import ReportSchedulerService
+        if app.config.get('REPORT_QUEUE_ENABLED'):
+            ReportQueueService.start(app)
+        if app.config.get('REPORT_SCHEDULER_ENABLED'):
+            ReportSchedulerService.start(app)
+        click.echo("Report worker started")
+        while True:
+            time.sleep(60)
+
+    @app.cli.command('cleanup-reports')
+    def cleanup_reports():
+        """Delete the stored data and exports of expired reports."""
+        from app.services.report_service import ReportService
+        count = ReportService.cleanup_expired_reports()
+        click.echo(f"Cleaned up {count} expired reports")
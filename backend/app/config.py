@@ -15,6 +15,33 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max upload
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'}
 
+    # Reports
+    REPORT_CURSOR_BATCH_SIZE = int(os.environ.get('REPORT_CURSOR_BATCH_SIZE', 500))
+    REPORT_QUEUE_ENABLED = os.environ.get('REPORT_QUEUE_ENABLED', 'False').lower() in ('true', '1', 't')  # opt-in; needs 'flask run-report-worker'
+    REPORT_WORKER_PROCESSES = int(os.environ.get('REPORT_WORKER_PROCESSES', 2))
+    REPORT_LEASE_SECONDS = int(os.environ.get('REPORT_LEASE_SECONDS', 120))
+    REPORT_POLL_INTERVAL = float(os.environ.get('REPORT_POLL_INTERVAL', 2))
+    REPORT_MAX_ATTEMPTS = int(os.environ.get('REPORT_MAX_ATTEMPTS', 3))
+    REPORT_PDF_PROCESSES = int(os.environ.get('REPORT_PDF_PROCESSES', 2))
+    REPORT_PDF_TIMEOUT = int(os.environ.get('REPORT_PDF_TIMEOUT', 300))  # seconds
+    REPORT_CACHE_MAX_AGE = int(os.environ.get('REPORT_CACHE_MAX_AGE', 6 * 3600))  # seconds, 0 disables
+    REPORT_FANOUT_THREADS = int(os.environ.get('REPORT_FANOUT_THREADS', 4))  # partitions generated concurrently
+    REPORT_CHUNK_ROWS = int(os.environ.get('REPORT_CHUNK_ROWS', 1000))
+    REPORT_INLINE_ROWS = int(os.environ.get('REPORT_INLINE_ROWS', 1000))  # larger reports are read through /rows
+    REPORT_STORAGE = os.environ.get('REPORT_STORAGE', 'gridfs')  # 'gridfs' or 'local'
+    REPORT_GRIDFS_BUCKET = os.environ.get('REPORT_GRIDFS_BUCKET', 'report_files')
+    REPORT_ARTIFACT_TTL = int(os.environ.get('REPORT_ARTIFACT_TTL', 7 * 24 * 3600))  # seconds
+    REPORT_CLEANUP_INTERVAL = int(os.environ.get('REPORT_CLEANUP_INTERVAL', 3600))  # seconds
+    REPORT_FLIGHT_LEASE_SECONDS = int(os.environ.get('REPORT_FLIGHT_LEASE_SECONDS', 1800))
+    REPORT_FLIGHT_WAIT_SECONDS = int(os.environ.get('REPORT_FLIGHT_WAIT_SECONDS', 300))
+    REPORT_SCHEDULER_ENABLED = os.environ.get('REPORT_SCHEDULER_ENABLED', 'True').lower() in ('true', '1', 't')  # runs in the report worker
+    REPORT_SCHEDULER_INTERVAL = int(os.environ.get('REPORT_SCHEDULER_INTERVAL', 60))  # seconds
+    REPORT_SCHEDULER_TIMEZONE = os.environ.get('REPORT_SCHEDULER_TIMEZONE', 'Asia/Kolkata')  # zone of template cron expressions
+
+    # Eligibility simulation
+    STUDENT_INDEX_REFRESH_SECONDS = float(os.environ.get('STUDENT_INDEX_REFRESH_SECONDS', 5))  # pull changed students
+    STUDENT_INDEX_REBUILD_SECONDS = int(os.environ.get('STUDENT_INDEX_REBUILD_SECONDS', 900))  # full reload
+
     # Email Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
@@ -1,8 +1,11 @@
 # app/routes/admin.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.auth import admin_required
+from app.utils.pagination import InvalidCursor, cursor_args
 from app.services.student_service import StudentService
+from app.services.student_index_service import StudentIndexService
+from app.services.placement_service import PlacementService
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -18,6 +21,8 @@ def get_students():
     - roll_number: Search by roll number (student_id field in DB)
     - page: Page number for pagination
     - per_page: Number of items per page
+    - cursor: Cursor from the previous page's nextCursor (empty for the first page) to page by key instead
+    - total: Whether to count all matching students (default true with page numbers, false with cursors)
     """
     # Extract query parameters
     branch = request.args.get('branch', 'all')
@@ -59,10 +64,13 @@ def get_students():
 
     try:
         # Get paginated students
-        students, total = StudentService.get_students_with_pagination(
+        cursor, include_total = cursor_args(request.args)
+        students, total, next_page = StudentService.get_students_with_pagination(
             filters=filters, 
             page=page, 
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total
         )
 
         print(f"[DEBUG] Found {len(students)} students matching filters")
@@ -83,9 +91,12 @@ def get_students():
 
         return jsonify({
             "students": formatted_students,
-            "total": total
+            "total": total,
+            "nextCursor": next_page
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": "Bad Request", "message": str(e)}), 400
     except Exception as e:
         print(f"Error retrieving students: {str(e)}")
         return jsonify({
@@ -355,4 +366,50 @@ def verify_all_fields(student_id):
         return jsonify({
             "error": "Failed to verify all fields",
             "message": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@admin_bp.route('/eligibility/simulate', methods=['POST'])
+@jwt_required()
+@admin_required
+def simulate_eligibility():
+    """
+    Count the students a draft job's eligibility rules would admit
+    Body:
+    - eligibility: Rules in the job format (branches, gender, uniformCgpa, cgpa, cgpaCriteria)
+    - cycleId: Limit to the cycle's batch and programs (and exclude students placed in it, for placement cycles)
+    - batch, programs: Limit to a batch and programs when no cycle is given
+    - excludePlaced: Override whether placed students are excluded
+    - limit: Number of matching students to list (default 0, at most 500)
+    """
+    data = request.get_json() or {}
+    eligibility = data.get('eligibility')
+    if not isinstance(eligibility, dict):
+        return jsonify({"message": "eligibility is required"}), 400
+    
+    limit = data.get('limit', 0)
+    if not isinstance(limit, int) or limit < 0 or limit > 500:
+        return jsonify({"message": "limit must be between 0 and 500"}), 400
+    
+    batch = data.get('batch')
+    programs = data.get('programs')
+    exclude_placed = False
+    if data.get('cycleId'):
+        cycle = PlacementService.get_placement_cycle_by_id(data['cycleId'])
+        if not cycle:
+            return jsonify({"message": "Placement cycle not found"}), 404
+        batch = cycle.get('batch')
+        programs = cycle.get('eligiblePrograms', [])
+        exclude_placed = cycle.get('type') == 'placement'
+    exclude_placed = bool(data.get('excludePlaced', exclude_placed))
+    
+    result = StudentIndexService.simulate(
+        eligibility,
+        batch=batch,
+        programs=programs,
+        exclude_placed=exclude_placed,
+        limit=limit,
+        refresh_seconds=current_app.config.get('STUDENT_INDEX_REFRESH_SECONDS', 5),
+        rebuild_seconds=current_app.config.get('STUDENT_INDEX_REBUILD_SECONDS', 900),
+        cycle_id=data.get('cycleId')
+    )
+    return jsonify(result), 200
@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.job_service import JobService
 from app.utils.auth import admin_required, student_required
 from app.utils.validators import validate_job
+from app.utils.pagination import cursor_args
 from bson.objectid import ObjectId
 from bson.json_util import dumps
 from flask import Response
@@ -102,6 +103,8 @@ def apply_for_job(job_id):
     }
     
     application_id = JobService.create_application(job_id, current_user['id'], application_data)
+    if not application_id:
+        return jsonify({"message": "Could not apply. Make sure your profile is fully verified."}), 400
     application = JobService.get_application_by_id(application_id)
     
     return Response(dumps(application), mimetype='application/json'), 201
@@ -110,8 +113,42 @@ def apply_for_job(job_id):
 @jwt_required()
 @admin_required
 def get_job_applications(job_id):
-    applications, total = JobService.get_applications_by_job(job_id)
-    return dumps(applications), 200
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 25, type=int)
+    
+    if page < 1 or per_page < 1 or per_page > 5000:
+        return jsonify({"message": "page must be >= 1 and per_page between 1 and 5000"}), 400
+    
+    result = JobService.get_applications_by_job(
+        job_id, page, per_page, request.args.get('status'), request.args.get('cursor')
+    )
+    return dumps(result), 200
+
+@jobs_bp.route('/<job_id>/statistics', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_job_statistics(job_id):
+    stats = JobService.get_job_statistics(job_id)
+    if not stats:
+        return jsonify({"message": "Job not found"}), 404
+    
+    return jsonify(stats), 200
+
+@jobs_bp.route('/<job_id>/eligible-students', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_eligible_students(job_id):
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    
+    if page < 1 or per_page < 1 or per_page > 500:
+        return jsonify({"message": "page must be >= 1 and per_page between 1 and 500"}), 400
+    
+    result = JobService.get_eligible_students(job_id, page, per_page)
+    if result is None:
+        return jsonify({"message": "Job not found"}), 404
+    
+    return jsonify(result), 200
 
 @jobs_bp.route('/applications/<application_id>/status', methods=['PUT'])
 @jwt_required()
@@ -134,6 +171,35 @@ def update_application_status(application_id):
     application = JobService.get_application_by_id(application_id)
     return jsonify(application), 200
 
+@jobs_bp.route('/applications/status', methods=['POST'])
+@jwt_required()
+@admin_required
+def bulk_update_application_status():
+    """Move many applications to a status, by ID or by job and current status"""
+    data = request.get_json() or {}
+    
+    if not data.get('status') or not data.get('currentStage'):
+        return jsonify({"message": "Status and currentStage are required"}), 400
+    
+    application_ids = data.get('applicationIds')
+    filters = data.get('filter') or {}
+    if application_ids is None:
+        if not ObjectId.is_valid(filters.get('jobId') or ''):
+            return jsonify({"message": "applicationIds or filter.jobId is required"}), 400
+    elif not isinstance(application_ids, list):
+        return jsonify({"message": "applicationIds must be a list"}), 400
+    elif len(application_ids) > 5000:
+        return jsonify({"message": "At most 5000 applications can be updated at once"}), 400
+    
+    result = JobService.bulk_update_application_status(
+        data.get('status'),
+        data.get('currentStage'),
+        application_ids=application_ids,
+        job_id=filters.get('jobId'),
+        current_status=filters.get('status')
+    )
+    return jsonify(result), 200
+
 @jobs_bp.route('', methods=['GET'])
 @jwt_required()
 def get_all_jobs():
@@ -162,21 +228,12 @@ def get_all_jobs():
     filters['cycleId'] = student_cycle
 
     # Get jobs with pagination
-    jobs, total = JobService.search_jobs(query_text, filters, page, per_page)
+    cursor, include_total = cursor_args(request.args)
+    jobs, total, next_page = JobService.search_jobs(query_text, filters, page, per_page, cursor, include_total)
     
-    # For students, add application status to each job
+    # For students, add application status and eligibility to each job
     if current_user.get('role') == 'student':
-        student_id = current_user.get('id')
-        for job in jobs:
-            job_id = job['_id']
-            if isinstance(job_id, dict) and '$oid' in job_id:
-                job_id = job_id['$oid']
-                
-            # Check if student has applied
-            job['hasApplied'] = JobService.has_student_applied(job_id, student_id)
-            
-            # Check if student is eligible
-            job['isEligible'] = JobService.check_student_eligibility(job_id, student_id)
+        JobService.annotate_jobs_for_student(jobs, current_user.get('id'))
     
     # Convert ObjectId to string for JSON serialization
     
@@ -185,7 +242,8 @@ def get_all_jobs():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': (total + per_page - 1) // per_page if total is not None else None,
+        'nextCursor': next_page
     }), 200
 
 @jobs_bp.route('/upload-company-image', methods=['POST'])
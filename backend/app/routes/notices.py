@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.notice_service import NoticeService
 from app.utils.auth import admin_required
 from app.utils.validators import validate_notice
+from app.utils.pagination import InvalidCursor, cursor_args
 from app.utils.cloudinary_config import upload_file, upload_notice
 import logging
 import cloudinary
@@ -23,7 +24,11 @@ def get_notices():
         notice_type = request.args.get('type')
         company = request.args.get('company')
         
-        notices, total = NoticeService.get_notices(page, per_page, notice_type, company)
+        cursor, include_total = cursor_args(request.args)
+        
+        notices, total, next_page = NoticeService.get_notices(
+            page, per_page, notice_type, company, cursor, include_total
+        )
         
         return jsonify({
             'notices': notices,
@@ -31,9 +36,12 @@ def get_notices():
                 'total': total,
                 'page': page,
                 'per_page': per_page,
-                'pages': (total + per_page - 1) // per_page
+                'pages': (total + per_page - 1) // per_page if total is not None else None,
+                'nextCursor': next_page
             }
         }), 200
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error in get_notices: {str(e)}", exc_info=True)
         return jsonify({"error": "Failed to fetch notices"}), 500
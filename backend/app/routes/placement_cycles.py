@@ -2,6 +2,7 @@ from venv import logger
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.placement_service import PlacementService
+from app.services.job_service import JobService
 from app.utils.auth import admin_required, student_required
 from app.utils.validators import validate_placement_cycle, validate_job
 from bson.json_util import dumps
@@ -12,30 +13,18 @@ from app.services.email_service import EmailService
 
 placement_cycles_bp = Blueprint('placement_cycles', __name__)
 
-def format_placement_cycle(raw_cycle):
+def format_placement_cycle(raw_cycle, counts=None):
     """Format a raw placement cycle into the expected frontend format"""
    
     
     cycle_id = str(raw_cycle.get("_id", ""))
     
-    # Calculate jobs count if not present
-    jobs_count = raw_cycle.get("jobs", 0)
-    if not jobs_count:
-        # Use PlacementService to get jobs by cycle ID
-        jobs = PlacementService.get_jobs_by_filters({"cycleId": cycle_id})
-        jobs_count = len(jobs) if jobs else 0
-    
-    # Calculate students count if not present
-    students_count = raw_cycle.get("students", 0)
-    if not students_count:
-        # Get batch and eligible programs from cycle
-        batch = raw_cycle.get('batch')
-        eligible_programs = raw_cycle.get('eligiblePrograms', [])
-        
-        if batch and eligible_programs:
-            # Use the same method as get_cycle_students endpoint
-            students = StudentService.get_students_by_cycle(cycle_id, batch, eligible_programs)
-            students_count = len(students) if students else 0
+    # Job and student counts come from grouped aggregations, shared when listing cycles
+    if counts is None:
+        counts = PlacementService.get_cycle_counts([raw_cycle])[cycle_id]
+    
+    jobs_count = raw_cycle.get("jobs", 0) or counts["jobs"]
+    students_count = raw_cycle.get("students", 0) or counts["students"]
     
     return {
         "id": cycle_id,
@@ -88,7 +77,11 @@ def get_all_placement_cycles():
         filters['type'] = type_filter
         
     cycles = PlacementService.get_all_placement_cycles(filters)
-    formatted_cycles = [format_placement_cycle(cycle) for cycle in cycles]
+    cycle_counts = PlacementService.get_cycle_counts(cycles)
+    formatted_cycles = [
+        format_placement_cycle(cycle, cycle_counts[str(cycle["_id"])])
+        for cycle in cycles
+    ]
     return dumps(formatted_cycles), 200
 
 @placement_cycles_bp.route('/<cycle_id>', methods=['GET'])
@@ -191,11 +184,12 @@ def create_job(cycle_id):
     job_id = PlacementService.create_job(cycle_id,data)
     job = PlacementService.get_job_by_id(job_id)
     
-    # Send email notification to all eligible students
+    # Send email notification to the students eligible for this job
     try:
         print("\n=== Sending Job Creation Email Notifications ===")
         EmailService.send_notice_notification(
             cycle_id=cycle_id,
+            recipients=JobService.get_eligible_student_emails(job_id),
             notice_type="add",
             notice_title=f"New Job Posted: {data['company']} - {data['role']}",
             notice_content=f"""
@@ -221,7 +215,11 @@ def create_job(cycle_id):
 @jwt_required()
 def get_cycle_statistics(cycle_id):
     """Get statistics for a placement cycle"""
-    statistics = PlacementService.get_cycle
+    statistics = PlacementService.get_cycle_statistics(cycle_id)
+    if statistics is None:
+        return jsonify({"message": "Placement cycle not found"}), 404
+    
+    return jsonify(statistics), 200
 
 @placement_cycles_bp.route('/<cycle_id>/students', methods=['GET'])
 # @jwt_required()
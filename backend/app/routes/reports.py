@@ -1,8 +1,12 @@
 # app/routes/reports.py
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required
 from app.services.report_service import ReportService
+from app.services.report_queue_service import ReportQueueService
 from app.utils.auth import admin_required
+from app.utils.blob_store import get_report_store, iter_blob
+from app.utils.validators import validate_report_schedule
+import mimetypes
 import os
 
 reports_bp = Blueprint('reports', __name__)
@@ -23,13 +27,81 @@ def generate_report():
     if not data.get('type') or not data.get('filters'):
         return jsonify({"message": "Report type and filters are required"}), 400
     
-    report_id = ReportService.generate_report(
+    # Without background workers the report is generated inside the request
+    if not current_app.config.get('REPORT_QUEUE_ENABLED'):
+        report_id = ReportService.generate_report(
+            data.get('type'),
+            data.get('filters')
+        )
+        
+        report = ReportService.get_report_by_id(report_id)
+        return jsonify(report), 201
+    
+    # Serve a fresh cached result without queueing
+    cached_id = ReportService.find_cached_report(data.get('type'), data.get('filters'))
+    if cached_id:
+        report = ReportService.get_report_by_id(cached_id)
+        return jsonify(report), 200
+    
+    # Identical requests already queued or running are joined, not duplicated
+    report_id = ReportQueueService.enqueue(
         data.get('type'),
         data.get('filters')
     )
     
+    report = ReportService.get_report_by_id(report_id) or {}
+    return jsonify({
+        "id": report_id,
+        "status": report.get('status', 'queued'),
+        "progress": report.get('progress', 0)
+    }), 202, {"Location": f"/api/reports/{report_id}"}
+
+@reports_bp.route('/<report_id>', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_report(report_id):
+    report = ReportService.get_report_by_id(report_id)
+    if not report:
+        return jsonify({"message": "Report not found"}), 404
+    
+    return jsonify(report), 200
+
+@reports_bp.route('/<report_id>/rows', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_report_rows(report_id):
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', 100, type=int)
+    sort = request.args.get('sort')
+
+    if offset < 0 or limit < 1 or limit > 1000:
+        return jsonify({"message": "offset must be >= 0 and limit between 1 and 1000"}), 400
+
+    # A leading '-' sorts in descending order, e.g. ?sort=-package
+    descending = bool(sort) and sort.startswith('-')
+    if descending:
+        sort = sort[1:]
+
+    try:
+        page = ReportService.get_report_rows(report_id, offset, limit, sort or None, descending)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    if page is None:
+        return jsonify({"message": "Report not found"}), 404
+
+    return jsonify(page), 200
+
+@reports_bp.route('/<report_id>/cancel', methods=['POST'])
+@jwt_required()
+@admin_required
+def cancel_report(report_id):
+    cancelled = ReportQueueService.request_cancel(report_id)
+    if not cancelled:
+        return jsonify({"message": "Report not found or already finished"}), 404
+    
     report = ReportService.get_report_by_id(report_id)
-    return jsonify(report), 201
+    return jsonify(report), 200
 
 @reports_bp.route('/download/<report_id>', methods=['GET'])
 @jwt_required()
@@ -37,14 +109,56 @@ def generate_report():
 def download_report(report_id):
     format_type = request.args.get('format', 'excel')
     
-    if format_type not in ['excel', 'pdf']:
+    if format_type not in ['excel', 'pdf', 'csv']:
         return jsonify({"message": "Invalid format type"}), 400
     
-    file_path = ReportService.get_report_file(report_id, format_type)
-    if not file_path:
+    # CSV is streamed to the client as it is rendered
+    if format_type == 'csv':
+        chunks = ReportService.stream_report_csv(report_id)
+        if chunks is None:
+            return jsonify({"message": "Report not found"}), 404
+        
+        return Response(
+            stream_with_context(chunks),
+            mimetype='text/csv',
+            headers={"Content-Disposition": f"attachment; filename={report_id}.csv"}
+        )
+    
+    export_key = ReportService.get_report_file(report_id, format_type)
+    if not export_key:
         return jsonify({"message": "Report not found"}), 404
     
-    return send_file(file_path, as_attachment=True)
+    extension = 'xlsx' if format_type == 'excel' else 'pdf'
+    return _blob_response(export_key, f"{report_id}.{extension}")
+
+def _blob_response(name, download_name):
+    """Stream a file from the report store, honouring HTTP range requests."""
+    store = get_report_store()
+    info = store.stat(name)
+    blob = store.open(name) if info else None
+    if blob is None:
+        return jsonify({"message": "Report file not found"}), 404
+    
+    length = info['length']
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    headers = {
+        "Content-Disposition": f"attachment; filename={download_name}",
+        "Accept-Ranges": "bytes"
+    }
+    
+    byte_range = request.range.range_for_length(length) if request.range else None
+    if request.range and byte_range is None:
+        blob.close()
+        return Response(status=416, headers={"Content-Range": f"bytes */{length}"})
+    
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{length}"
+        headers["Content-Length"] = str(end - start)
+        return Response(iter_blob(blob, start, end), 206, mimetype=mimetype, headers=headers)
+    
+    headers["Content-Length"] = str(length)
+    return Response(iter_blob(blob), 200, mimetype=mimetype, headers=headers)
 
 # Report templates
 @reports_bp.route('/templates', methods=['GET'])
@@ -64,6 +178,16 @@ def get_report_template(template_id):
     
     return jsonify(template), 200
 
+@reports_bp.route('/templates/<template_id>/latest', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_latest_template_report(template_id):
+    report = ReportService.get_latest_template_report(template_id)
+    if not report:
+        return jsonify({"message": "No report generated for this template yet"}), 404
+    
+    return jsonify(report), 200
+
 @reports_bp.route('/templates', methods=['POST'])
 @jwt_required()
 @admin_required
@@ -73,6 +197,10 @@ def create_report_template():
     if not data.get('name') or not data.get('columns'):
         return jsonify({"message": "Template name and columns are required"}), 400
     
+    errors = validate_report_schedule(data)
+    if errors:
+        return jsonify({"errors": errors}), 400
+    
     template_id = ReportService.create_template(data)
     template = ReportService.get_template_by_id(template_id)
     
@@ -82,7 +210,16 @@ def create_report_template():
 @jwt_required()
 @admin_required
 def update_report_template(template_id):
-    data = request.get_json()
+    data = request.get_json() or {}
+    
+    template = ReportService.get_template_by_id(template_id)
+    if not template:
+        return jsonify({"message": "Template not found"}), 404
+    
+    # Fields left out of the request keep their stored values
+    errors = validate_report_schedule({**template, **data})
+    if errors:
+        return jsonify({"errors": errors}), 400
     
     updated = ReportService.update_template(template_id, data)
     if not updated:
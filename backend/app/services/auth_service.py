@@ -5,6 +5,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from bson.objectid import ObjectId
 from datetime import datetime, timedelta
 from app.services.email_service import EmailService
+from app.utils.cohort import parse_cohort
 from flask import current_app
 from flask_mail import Message
 
@@ -84,6 +85,8 @@ class AuthService:
             return None
         
         user_data['password'] = generate_password_hash(user_data['password'])
+        if user_data.get('role') == 'student':
+            user_data.update(parse_cohort(user_data['email']))
         user_data['createdAt'] = datetime.utcnow()
         user_data['updatedAt'] = datetime.utcnow()
         
@@ -0,0 +1,457 @@
+# app/services/cycle_stats_service.py
+from app import mongo
+from datetime import datetime
+
+from pymongo import ReplaceOne, ReturnDocument
+
+
+# Application statuses that count as an offer
+SELECTED_STATUSES = ['selected', 'offered', 'placed', 'accepted']
+
+# Per-student counter rows written per bulk_write during a rebuild
+REBUILD_BATCH_SIZE = 500
+
+
+def stats_key(value):
+    """Turn a branch, company or gender into a field name usable in a stats document."""
+    text = str(value).strip() if value not in (None, '') else 'Unknown'
+    return text.replace('.', '_').replace('$', '_') or 'Unknown'
+
+
+def _counter_updates(company, branch, gender, status, delta, package=None):
+    """
+    Build the ``$inc`` paths for adding (or removing) one application.
+
+    Args:
+        company: Company of the job applied to
+        branch: Branch of the applicant
+        gender: Gender of the applicant
+        status: Status of the application
+        delta: 1 to add the application, -1 to remove it
+        package: Numeric package of the job in LPA
+
+    Returns:
+        Dictionary mapping dotted field paths to increments
+    """
+    status = (status or 'applied').lower()
+    company, branch, gender = stats_key(company), stats_key(branch), stats_key(gender).lower()
+
+    inc = {
+        'totalApplications': delta,
+        f'status.{stats_key(status)}': delta,
+        f'company.{company}.applications': delta,
+        f'branch.{branch}.applications': delta,
+        f'gender.{gender}.applications': delta
+    }
+
+    if status in SELECTED_STATUSES:
+        inc['selectedApplications'] = delta
+        inc[f'company.{company}.selected'] = delta
+        inc[f'branch.{branch}.selected'] = delta
+        inc[f'gender.{gender}.selected'] = delta
+        if package:
+            inc[f'branch.{branch}.packageTotal'] = delta * package
+            inc[f'branch.{branch}.packageCount'] = delta
+    elif status == 'rejected':
+        inc[f'company.{company}.rejected'] = delta
+    else:
+        inc[f'company.{company}.inProcess'] = delta
+
+    return inc
+
+
+def _distinct_updates(branch, gender, field, delta):
+    """Build the ``$inc`` paths for a student entering or leaving a distinct count."""
+    branch, gender = stats_key(branch), stats_key(gender).lower()
+    return {
+        field: delta,
+        f'branch.{branch}.{field}': delta,
+        f'gender.{gender}.{field}': delta
+    }
+
+
+def _merge(target, inc):
+    """Add the increments in ``inc`` into ``target``."""
+    for path, value in inc.items():
+        target[path] = target.get(path, 0) + value
+
+
+def _nest(flat):
+    """Expand dotted field paths into a nested document."""
+    document = {}
+    for path, value in flat.items():
+        node = document
+        *parents, leaf = path.split('.')
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return document
+
+
+class CycleStatsService:
+    """
+    Materialized placement statistics, one document per cycle in ``cycle_stats``.
+
+    Counters are kept up to date with atomic ``$inc`` updates as applications
+    are created or change status, so dashboards and reports read a single
+    small document instead of scanning applications. Distinct student counts
+    are derived from per-student counters in ``cycle_stats_students``, which
+    also record the student's branch so distinct students can be combined
+    across cycles. The
+    highest package per branch is kept with ``$max`` and so only ever rises
+    between rebuilds. Drift (withdrawn offers, writes made outside these
+    services) is reconciled by ``rebuild``.
+
+    Counter updates only touch existing documents: a cycle without one is
+    built from its jobs and applications on first read, never started from
+    a partial count.
+    """
+
+    @staticmethod
+    def ensure_indexes():
+        """Create the indexes used by the statistics collections."""
+        mongo.db.cycle_stats_students.create_index('cycleId')
+
+    @staticmethod
+    def get(cycle_id):
+        """
+        Get the statistics document of a cycle, building it on first use.
+
+        Args:
+            cycle_id: The ID of the placement cycle
+
+        Returns:
+            The statistics document
+        """
+        stats = mongo.db.cycle_stats.find_one({'_id': str(cycle_id)})
+        if stats is None:
+            stats = CycleStatsService.rebuild(cycle_id)
+        return stats
+
+    @staticmethod
+    def get_many(cycle_ids):
+        """
+        Get the statistics documents of several cycles in one query.
+
+        Args:
+            cycle_ids: IDs of the placement cycles
+
+        Returns:
+            Dictionary mapping cycle ID to its statistics document (missing cycles are omitted)
+        """
+        ids = [str(cycle_id) for cycle_id in cycle_ids]
+        return {stats['_id']: stats for stats in mongo.db.cycle_stats.find({'_id': {'$in': ids}})}
+
+    @staticmethod
+    def get_students(cycle_id, branches=None):
+        """
+        Get the IDs of the students who applied and were selected in a cycle, per branch.
+
+        Args:
+            cycle_id: The ID of the placement cycle
+            branches: Only return these branches (as stats keys)
+
+        Returns:
+            Dictionary mapping branch to a dictionary with 'applied' and
+            'selected' sets of student IDs
+        """
+        cycle_id = str(cycle_id)
+        query = {'cycleId': cycle_id, 'applications': {'$gt': 0}}
+        if branches is not None:
+            query['branch'] = {'$in': list(branches)}
+
+        students = {}
+        for row in mongo.db.cycle_stats_students.find(query, {'branch': 1, 'selected': 1}):
+            student_id = row['_id'][len(cycle_id) + 1:]
+            ids = students.setdefault(row.get('branch') or 'Unknown', {'applied': set(), 'selected': set()})
+            ids['applied'].add(student_id)
+            if row.get('selected', 0) > 0:
+                ids['selected'].add(student_id)
+        return students
+
+    @staticmethod
+    def record_job(cycle_id, company, delta=1):
+        """
+        Count a job added to (or removed from) a cycle.
+
+        Args:
+            cycle_id: The ID of the placement cycle
+            company: Company posting the job
+            delta: 1 for a new job, -1 for a removed one
+        """
+        if not cycle_id:
+            return
+        mongo.db.cycle_stats.update_one(
+            {'_id': str(cycle_id)},
+            {
+                '$inc': {'jobs': delta, f'company.{stats_key(company)}.jobs': delta},
+                '$set': {'updatedAt': datetime.utcnow()}
+            }
+        )
+
+    @staticmethod
+    def record_application(application, status=None, delta=1, job=None, student=None):
+        """
+        Apply one application to its cycle's counters.
+
+        Args:
+            application: Application document (needs job_id and student_id)
+            status: Status to count the application under (defaults to its own status)
+            delta: 1 to add the application, -1 to remove it
+            job: The job document, when the caller already has it
+            student: The student document, when the caller already has it
+        """
+        job = job or mongo.db.jobs.find_one(
+            {'_id': application.get('job_id')},
+            {'cycleId': 1, 'company': 1, 'packageValue': 1}
+        )
+        if not job or not job.get('cycleId'):
+            return
+
+        student = student or mongo.db.student.find_one(
+            {'user_id': application.get('student_id')},
+            {'major': 1, 'gender': 1}
+        ) or {}
+
+        cycle_id = str(job['cycleId'])
+        status = (status or application.get('status') or 'applied').lower()
+        branch, gender = student.get('major'), student.get('gender')
+        selected = status in SELECTED_STATUSES
+
+        inc = _counter_updates(job.get('company'), branch, gender, status, delta, job.get('packageValue'))
+
+        # Track how many of this student's applications in the cycle are live or
+        # selected, so distinct counts change only on the 0 <-> 1 transitions
+        counts = mongo.db.cycle_stats_students.find_one_and_update(
+            {'_id': f"{cycle_id}:{application.get('student_id')}"},
+            {
+                '$inc': {'applications': delta, 'selected': delta if selected else 0},
+                '$set': {'cycleId': cycle_id, 'branch': stats_key(branch)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if counts['applications'] == (1 if delta > 0 else 0):
+            _merge(inc, _distinct_updates(branch, gender, 'studentsApplied', delta))
+        if selected and counts['selected'] == (1 if delta > 0 else 0):
+            _merge(inc, _distinct_updates(branch, gender, 'studentsSelected', delta))
+
+        update = {'$inc': inc, '$set': {'updatedAt': datetime.utcnow()}}
+        if selected and delta > 0 and job.get('packageValue'):
+            update['$max'] = {f'branch.{stats_key(branch)}.highestPackage': job['packageValue']}
+
+        mongo.db.cycle_stats.update_one({'_id': cycle_id}, update)
+
+    @staticmethod
+    def record_status_change(application, old_status, new_status):
+        """
+        Move an application between status counters.
+
+        Args:
+            application: Application document (needs job_id and student_id)
+            old_status: Status before the update
+            new_status: Status after the update
+        """
+        CycleStatsService.record_status_changes([(application, old_status, new_status)])
+
+    @staticmethod
+    def record_status_changes(changes):
+        """
+        Move many applications between status counters.
+
+        Jobs and students are read in one query each and the increments are
+        merged into a single update per cycle. Only students whose selected
+        count crosses zero touch ``cycle_stats_students``.
+
+        Args:
+            changes: List of (application, old_status, new_status) tuples;
+                applications need job_id and student_id
+        """
+        changes = [
+            (application, (old_status or 'applied').lower(), (new_status or 'applied').lower())
+            for application, old_status, new_status in changes
+            if (old_status or '').lower() != (new_status or '').lower()
+        ]
+        if not changes:
+            return
+
+        jobs = {
+            job['_id']: job for job in mongo.db.jobs.find(
+                {'_id': {'$in': list({application.get('job_id') for application, _, _ in changes})}},
+                {'cycleId': 1, 'company': 1, 'packageValue': 1}
+            )
+        }
+        students = {
+            student['user_id']: student for student in mongo.db.student.find(
+                {'user_id': {'$in': list({application.get('student_id') for application, _, _ in changes})}},
+                {'user_id': 1, 'major': 1, 'gender': 1}
+            )
+        }
+
+        updates = {}
+        for application, old_status, new_status in changes:
+            job = jobs.get(application.get('job_id'))
+            if not job or not job.get('cycleId'):
+                continue
+
+            cycle_id = str(job['cycleId'])
+            student = students.get(application.get('student_id'), {})
+            branch, gender = student.get('major'), student.get('gender')
+            package = job.get('packageValue')
+            inc, highest = updates.setdefault(cycle_id, ({}, {}))
+
+            _merge(inc, _counter_updates(job.get('company'), branch, gender, old_status, -1, package))
+            _merge(inc, _counter_updates(job.get('company'), branch, gender, new_status, 1, package))
+
+            selected = new_status in SELECTED_STATUSES
+            if selected != (old_status in SELECTED_STATUSES):
+                delta = 1 if selected else -1
+                counts = mongo.db.cycle_stats_students.find_one_and_update(
+                    {'_id': f"{cycle_id}:{application.get('student_id')}"},
+                    {'$inc': {'selected': delta}, '$set': {'cycleId': cycle_id, 'branch': stats_key(branch)}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                if counts['selected'] == (1 if delta > 0 else 0):
+                    _merge(inc, _distinct_updates(branch, gender, 'studentsSelected', delta))
+
+            if selected and package:
+                path = f'branch.{stats_key(branch)}.highestPackage'
+                highest[path] = max(highest.get(path, package), package)
+
+        for cycle_id, (inc, highest) in updates.items():
+            update = {'$set': {'updatedAt': datetime.utcnow()}}
+            inc = {path: value for path, value in inc.items() if value}
+            if inc:
+                update['$inc'] = inc
+            if highest:
+                update['$max'] = highest
+            mongo.db.cycle_stats.update_one({'_id': cycle_id}, update)
+
+    @staticmethod
+    def rebuild(cycle_id):
+        """
+        Recompute a cycle's statistics from jobs and applications.
+
+        Args:
+            cycle_id: The ID of the placement cycle
+
+        Returns:
+            The rebuilt statistics document
+        """
+        cycle_id = str(cycle_id)
+        inc = {}
+        highest = {}
+        student_counts = {}
+
+        jobs = list(mongo.db.jobs.find({'cycleId': cycle_id}, {'company': 1}))
+        inc['jobs'] = len(jobs)
+        for job in jobs:
+            _merge(inc, {f"company.{stats_key(job.get('company'))}.jobs": 1})
+
+        rows = mongo.db.jobs.aggregate([
+            {'$match': {'cycleId': cycle_id}},
+            {'$lookup': {
+                'from': 'applications',
+                'localField': '_id',
+                'foreignField': 'job_id',
+                'as': 'application'
+            }},
+            {'$unwind': '$application'},
+            {'$lookup': {
+                'from': 'student',
+                'localField': 'application.student_id',
+                'foreignField': 'user_id',
+                'as': 'student'
+            }},
+            {'$unwind': {'path': '$student', 'preserveNullAndEmptyArrays': True}},
+            {'$project': {
+                '_id': 0,
+                'company': 1,
+                'packageValue': 1,
+                'status': '$application.status',
+                'studentId': '$application.student_id',
+                'branch': '$student.major',
+                'gender': '$student.gender'
+            }}
+        ], allowDiskUse=True)
+
+        for row in rows:
+            status = (row.get('status') or 'applied').lower()
+            _merge(inc, _counter_updates(
+                row.get('company'), row.get('branch'), row.get('gender'),
+                status, 1, row.get('packageValue')
+            ))
+
+            counts = student_counts.setdefault(row.get('studentId'), {
+                'applications': 0, 'selected': 0,
+                'branch': row.get('branch'), 'gender': row.get('gender')
+            })
+            counts['applications'] += 1
+            if status in SELECTED_STATUSES:
+                counts['selected'] += 1
+                if row.get('packageValue'):
+                    path = f"branch.{stats_key(row.get('branch'))}.highestPackage"
+                    highest[path] = max(highest.get(path, 0), row['packageValue'])
+
+        for counts in student_counts.values():
+            _merge(inc, _distinct_updates(counts['branch'], counts['gender'], 'studentsApplied', 1))
+            if counts['selected']:
+                _merge(inc, _distinct_updates(counts['branch'], counts['gender'], 'studentsSelected', 1))
+
+        stats = _nest({**inc, **highest})
+        stats['_id'] = cycle_id
+        stats['updatedAt'] = datetime.utcnow()
+        mongo.db.cycle_stats.replace_one({'_id': cycle_id}, stats, upsert=True)
+
+        # Rows are replaced in place (never deleted and re-inserted), so a
+        # concurrent counter upsert cannot collide with the rebuild
+        row_ids = []
+        operations = []
+        for student_id, counts in student_counts.items():
+            row_id = f"{cycle_id}:{student_id}"
+            row_ids.append(row_id)
+            operations.append(ReplaceOne(
+                {'_id': row_id},
+                {
+                    'cycleId': cycle_id,
+                    'branch': stats_key(counts['branch']),
+                    'applications': counts['applications'],
+                    'selected': counts['selected']
+                },
+                upsert=True
+            ))
+            if len(operations) == REBUILD_BATCH_SIZE:
+                mongo.db.cycle_stats_students.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            mongo.db.cycle_stats_students.bulk_write(operations, ordered=False)
+
+        mongo.db.cycle_stats_students.delete_many({'cycleId': cycle_id, '_id': {'$nin': row_ids}})
+
+        return stats
+
+    @staticmethod
+    def rebuild_all():
+        """
+        Recompute the statistics of every placement cycle.
+
+        Returns:
+            Number of cycles rebuilt
+        """
+        count = 0
+        for cycle in mongo.db.placement_cycles.find({}, {'_id': 1}):
+            CycleStatsService.rebuild(cycle['_id'])
+            count += 1
+        return count
+
+    @staticmethod
+    def delete(cycle_id):
+        """
+        Remove the statistics of a deleted cycle.
+
+        Args:
+            cycle_id: The ID of the placement cycle
+        """
+        mongo.db.cycle_stats.delete_one({'_id': str(cycle_id)})
+        mongo.db.cycle_stats_students.delete_many({'cycleId': str(cycle_id)})
@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 class EmailService:
     @staticmethod
-    def send_notice_notification(cycle_id, notice_type, notice_title, notice_content):
+    def send_notice_notification(cycle_id, notice_type, notice_title, notice_content, recipients=None):
         """
         Send email notification to all eligible students in a placement cycle
         
@@ -20,6 +20,7 @@ class EmailService:
             notice_type: Type of notice (add/update/delete)
             notice_title: Title of the notice
             notice_content: Content of the notice
+            recipients: Emails to notify instead of every student in the cycle
         """
         try:
             # Log current email configuration
@@ -33,7 +34,10 @@ class EmailService:
 
             # Get student emails
             logger.info(f"Getting student emails for cycle: {cycle_id}")
-            student_emails = StudentService.get_student_emails_by_cycle(cycle_id)
+            if recipients is not None:
+                student_emails = list(recipients)
+            else:
+                student_emails = StudentService.get_student_emails_by_cycle(cycle_id)
             
             if not student_emails:
                 logger.error("No eligible students found for notification")
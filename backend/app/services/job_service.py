@@ -1,8 +1,45 @@
 # app/services/job_service.py
 from app import mongo
+from flask import current_app
 from bson.objectid import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from app.services.student_service import StudentService
+from app.services.cycle_stats_service import CycleStatsService, stats_key
+from app.utils.compensation import COMPENSATION_FIELDS, job_package_value, job_stipend_value
+from app.utils.pagination import InvalidCursor, keyset_filter, decode_cursor, next_cursor, cached_count
+import re
+
+# Sort keys of the job feed and of ranked text searches; both end in a unique field
+JOB_FEED_SORT = [('createdAt', -1), ('_id', -1)]
+JOB_SEARCH_SORT = [('_score', -1), ('createdAt', -1), ('_id', -1)]
+
+# Sort keys of a job's applicants, newest first
+APPLICANT_SORT = [('created_at', -1), ('_id', -1)]
+
+# Applications written per bulk_write when changing statuses in bulk
+BULK_STATUS_BATCH_SIZE = 500
+
+# Filter that matches no student, for rules that can never be met
+NO_STUDENTS = {'_id': {'$exists': False}}
+
+
+def _cgpa_at_least(min_cgpa):
+    """
+    Build an $expr comparing the student's (possibly string) CGPA with a minimum.
+
+    As in the per-student check, a missing CGPA counts as 0 while a null or
+    unreadable one never qualifies.
+    """
+    return {'$gte': [
+        {'$cond': [
+            {'$eq': [{'$type': '$cgpa'}, 'missing']},
+            0.0,
+            {'$convert': {'input': '$cgpa', 'to': 'double', 'onError': None, 'onNull': None}}
+        ]},
+        min_cgpa
+    ]}
 
 class JobService:
     @staticmethod
@@ -64,6 +101,16 @@ class JobService:
             if 'createdAt' in data:
                 del data['createdAt']
             
+            # Fields left out of the request keep their stored values
+            if any(field in data for field in COMPENSATION_FIELDS):
+                stored = mongo.db.jobs.find_one(
+                    {'_id': ObjectId(job_id)},
+                    {field: 1 for field in COMPENSATION_FIELDS}
+                ) or {}
+                merged = {**stored, **data}
+                data['packageValue'] = job_package_value(merged)
+                data['stipendValue'] = job_stipend_value(merged)
+            
             data['updatedAt'] = datetime.utcnow()
             
             result = mongo.db.jobs.update_one(
@@ -71,6 +118,10 @@ class JobService:
                 {'$set': data}
             )
             
+            # Cached statistics carry the company and role
+            if result.modified_count and ('company' in data or 'role' in data):
+                JobService.invalidate_job_statistics(job_id)
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating job: {str(e)}")
@@ -88,63 +139,437 @@ class JobService:
             True if deletion was successful, False otherwise
         """
         try:
+            job = mongo.db.jobs.find_one({'_id': ObjectId(job_id)}, {'cycleId': 1})
+            
             # First delete all applications for this job
-            mongo.db.applications.delete_many({'jobId': job_id})
+            mongo.db.applications.delete_many({'$or': [{'job_id': ObjectId(job_id)}, {'jobId': job_id}]})
             
             # Then delete the job
             result = mongo.db.jobs.delete_one({'_id': ObjectId(job_id)})
+            
+            mongo.db.job_stats.delete_one({'_id': str(job_id)})
+            
+            # A deletion drops many counters at once, so recount the cycle
+            if job and job.get('cycleId'):
+                try:
+                    CycleStatsService.rebuild(job['cycleId'])
+                except Exception as e:
+                    print(f"Error updating cycle statistics: {str(e)}")
+            
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting job: {str(e)}")
             return False
     
     @staticmethod
-    def search_jobs(query_text, filters=None, page=1, per_page=10):
+    def ensure_indexes():
+        """Create the indexes used to search and page through jobs and applicants."""
+        # A collection has a single text index; matches on company and role rank highest
+        mongo.db.jobs.create_index(
+            [('company', 'text'), ('role', 'text'), ('jobDescription', 'text')],
+            weights={'company': 10, 'role': 5, 'jobDescription': 1},
+            name='job_search'
+        )
+        mongo.db.jobs.create_index([('cycleId', 1), ('createdAt', -1), ('_id', -1)])
+        mongo.db.applications.create_index([('job_id', 1), ('created_at', -1), ('_id', -1)])
+        mongo.db.applications.create_index([('job_id', 1), ('status', 1), ('created_at', -1)])
+        # One application per student and job, even when requests race
+        try:
+            mongo.db.applications.create_index([('job_id', 1), ('student_id', 1)], unique=True)
+        except OperationFailure as e:
+            duplicates = JobService.find_duplicate_applications()
+            current_app.logger.error(
+                "Unique (job_id, student_id) application index was not created: %s. "
+                "%d job/student pairs have duplicate applications (e.g. %s); "
+                "run 'flask dedupe-applications' and restart.",
+                e, len(duplicates), [group['_id'] for group in duplicates[:5]]
+            )
+    
+    @staticmethod
+    def find_duplicate_applications():
+        """
+        Find students with more than one application to the same job.
+        
+        Returns:
+            List of groups with the (job_id, student_id) pair as _id and the
+            application IDs, most recently updated first
+        """
+        return list(mongo.db.applications.aggregate([
+            {'$sort': {'updated_at': -1, '_id': 1}},
+            {'$group': {
+                '_id': {'job_id': '$job_id', 'student_id': '$student_id'},
+                'ids': {'$push': '$_id'},
+                'count': {'$sum': 1}
+            }},
+            {'$match': {'count': {'$gt': 1}}}
+        ], allowDiskUse=True))
+    
+    @staticmethod
+    def dedupe_applications():
+        """
+        Delete duplicate applications so the unique (job, student) index can be built.
+        
+        The most recently updated application of each pair is kept, as it
+        carries the latest status change. Job application counts are lowered
+        by the deleted copies and the affected cycles' statistics rebuilt.
+        
+        Returns:
+            Number of applications deleted
+        """
+        deleted = 0
+        job_ids = set()
+        for group in JobService.find_duplicate_applications():
+            extra = group['ids'][1:]
+            job_id = group['_id']['job_id']
+            deleted += mongo.db.applications.delete_many({'_id': {'$in': extra}}).deleted_count
+            mongo.db.jobs.update_one(
+                {'_id': job_id, 'applications_count': {'$gte': len(extra)}},
+                {'$inc': {'applications_count': -len(extra)}}
+            )
+            job_ids.add(job_id)
+        
+        cycle_ids = set()
+        for job in mongo.db.jobs.find({'_id': {'$in': list(job_ids)}}, {'cycleId': 1}):
+            JobService.invalidate_job_statistics(job['_id'])
+            if job.get('cycleId'):
+                cycle_ids.add(str(job['cycleId']))
+        for cycle_id in cycle_ids:
+            CycleStatsService.rebuild(cycle_id)
+        
+        return deleted
+    
+    @staticmethod
+    def search_jobs(query_text, filters=None, page=1, per_page=10, cursor=None, include_total=True):
         """
         Search jobs by text and filters.
         
+        Text queries use the jobs text index (whole words, with stemming) and
+        are ranked by relevance, newest first among equal scores. Passing a
+        cursor (an empty string for the first page) switches from page numbers
+        to keyset pagination on the sort keys.
+        
         Args:
             query_text: Text to search for in company, role, and description
             filters: Optional filters to apply
-            page: Page number
+            page: Page number (ignored when a cursor is given)
             per_page: Items per page
+            cursor: Cursor returned with the previous page, for keyset pagination
+            include_total: Whether to count all matching jobs
             
         Returns:
-            List of matching job documents and total count
+            List of matching job documents, total count (None if not requested)
+            and the cursor of the next page (None on the last page)
         """
         search_query = {}
         
         # Add text search if provided
-        if query_text:
-            text_query = {
-                '$or': [
-                    {'company': {'$regex': query_text, '$options': 'i'}},
-                    {'role': {'$regex': query_text, '$options': 'i'}},
-                    {'jobDescription': {'$regex': query_text, '$options': 'i'}}
-                ]
-            }
-            search_query.update(text_query)
+        if query_text and query_text.strip():
+            search_query['$text'] = {'$search': query_text.strip()}
         
         # Apply additional filters if provided
         if filters:
             if 'status' in filters:
                 search_query['status'] = filters['status']
             if 'cycleId' in filters:
-                # Get cycle IDs of specified type
                 search_query['cycleId'] = filters['cycleId']
             if 'eligibleBranches' in filters:
                 search_query['eligibility.branches'] = {'$in': filters['eligibleBranches']}
         
-        # Get total count
-        total = mongo.db.jobs.count_documents(search_query)
+        pipeline = [{'$match': search_query}]
+        if '$text' in search_query:
+            pipeline.append({'$addFields': {'_score': {'$meta': 'textScore'}}})
+            sort = JOB_SEARCH_SORT
+        else:
+            sort = JOB_FEED_SORT
+        
+        page_stages = []
+        if cursor:
+            page_stages.append({'$match': keyset_filter(sort, decode_cursor(cursor, sort))})
+        page_stages.append({'$sort': dict(sort)})
+        if cursor is None:
+            page_stages.append({'$skip': (page - 1) * per_page})
+        page_stages.append({'$limit': per_page + 1})
+        
+        total = None
+        if include_total and cursor is None:
+            # The page and the total come from the same aggregation
+            pipeline.append({'$facet': {'jobs': page_stages, 'total': [{'$count': 'count'}]}})
+            result = list(mongo.db.jobs.aggregate(pipeline))[0]
+            jobs = result['jobs']
+            total = result['total'][0]['count'] if result['total'] else 0
+        else:
+            jobs = list(mongo.db.jobs.aggregate(pipeline + page_stages))
+            if include_total:
+                total = cached_count(mongo.db.jobs, search_query)
+        
+        next_page = next_cursor(jobs, sort, per_page)
+        for job in jobs:
+            job.pop('_score', None)
+        
+        return jobs, total, next_page
+    
+    @staticmethod
+    def _is_eligible(job, student, cycle=None, is_placed=False):
+        """
+        Apply a job's eligibility rules to a student already loaded in memory.
+        
+        Args:
+            job: The job document
+            student: The student document
+            cycle: The job's placement cycle document, if known
+            is_placed: Whether the student already has a selected application in the job's cycle
+            
+        Returns:
+            True if student is eligible, False otherwise
+        """
+        eligibility = job.get('eligibility') or {}
+        
+        # Check branch eligibility
+        student_branch = student.get('major', student.get('branch', ''))
+        if student.get('major') not in eligibility.get('branches', []):
+            return False
+        
+        # Check gender eligibility
+        gender_req = (eligibility.get('gender') or '').lower()
+        if gender_req and gender_req != 'all' and (student.get('gender') or '').lower() != gender_req:
+            return False
+        
+        # Check CGPA requirement
+        try:
+            student_cgpa = float(student.get('cgpa', 0))
+            
+            if eligibility.get('uniformCgpa', True):
+                # If uniform CGPA is required, check against the single CGPA value
+                min_cgpa = float(eligibility.get('cgpa', 0))
+                if student_cgpa < min_cgpa:
+                    return False
+            else:
+                # If non-uniform CGPA, check against branch-specific criteria
+                cgpa_criteria = eligibility.get('cgpaCriteria', {})
+                if student_branch in cgpa_criteria:
+                    branch_min_cgpa = (cgpa_criteria.get(student_branch, {}))
+                    prog_min_cgpa = float(branch_min_cgpa.get('btech', 0))
+                    if student_cgpa < prog_min_cgpa:
+                        return False
+        except (ValueError, TypeError):
+            # If there's an error converting CGPA to float, consider student ineligible
+            return False
+        
+        # A student who is already placed cannot apply to further placement jobs
+        if cycle and cycle.get('type') == 'placement' and is_placed:
+            return False
+        
+        return True
+    
+    @staticmethod
+    def eligibility_filter(job, cycle=None):
+        """
+        Compile a job's eligibility rules into a filter on the student collection.
+        
+        The filter applies the same rules as ``_is_eligible`` (branches,
+        gender, uniform or branch-wise CGPA) and limits students to the
+        cycle's batch and programs. Students already placed in the cycle are
+        excluded by ``eligible_students_pipeline``, which needs a lookup.
+        
+        Args:
+            job: The job document
+            cycle: The job's placement cycle document, if known
+            
+        Returns:
+            Mongo filter selecting the eligible students
+        """
+        eligibility = job.get('eligibility') or {}
+        conditions = [{'major': {'$in': eligibility.get('branches', [])}}]
+        
+        if cycle and cycle.get('batch'):
+            conditions.append({'batch': cycle['batch'], 'program': {'$in': cycle.get('eligiblePrograms', [])}})
+        
+        gender_req = (eligibility.get('gender') or '').lower()
+        if gender_req and gender_req != 'all':
+            conditions.append({'gender': {'$regex': f"^{re.escape(gender_req)}$", '$options': 'i'}})
+        
+        if eligibility.get('uniformCgpa', True):
+            try:
+                conditions.append({'$expr': _cgpa_at_least(float(eligibility.get('cgpa', 0)))})
+            except (ValueError, TypeError):
+                return NO_STUDENTS
+        else:
+            # Branches without criteria have no CGPA cutoff; unreadable cutoffs exclude the branch
+            cgpa_criteria = eligibility.get('cgpaCriteria', {})
+            branch_rules = [{'major': {'$nin': list(cgpa_criteria)}}]
+            for branch, criteria in cgpa_criteria.items():
+                try:
+                    min_cgpa = float((criteria or {}).get('btech', 0))
+                except (ValueError, TypeError):
+                    continue
+                branch_rules.append({'major': branch, '$expr': _cgpa_at_least(min_cgpa)})
+            conditions.append({'$or': branch_rules})
+        
+        return {'$and': conditions}
+    
+    @staticmethod
+    def _cycle_job_ids(cycle_id):
+        """
+        Get the IDs of the jobs in a placement cycle.
+        
+        Args:
+            cycle_id: The ID of the cycle
+            
+        Returns:
+            List of job ObjectIds
+        """
+        return mongo.db.jobs.distinct('_id', {'cycleId': str(cycle_id)})
+    
+    @staticmethod
+    def eligible_students_pipeline(job, cycle=None):
+        """
+        Build the aggregation stages selecting the students eligible for a job.
+        
+        Stages start with ``eligibility_filter``. In placement cycles a lookup
+        then drops students with a selected application to a job of the same
+        cycle; selections in other cycles do not count.
         
-        # Get paginated results
-        jobs = list(mongo.db.jobs.find(search_query)
-                    .sort('createdAt', -1)
-                    .skip((page - 1) * per_page)
-                    .limit(per_page))
+        Args:
+            job: The job document
+            cycle: The job's placement cycle document, if known
+            
+        Returns:
+            List of pipeline stages to run on the student collection
+        """
+        stages = [{'$match': JobService.eligibility_filter(job, cycle)}]
+        
+        if cycle and cycle.get('type') == 'placement' and cycle.get('_id'):
+            stages += [
+                {'$lookup': {
+                    'from': 'applications',
+                    'let': {'userId': '$user_id'},
+                    'pipeline': [
+                        {'$match': {
+                            'status': 'selected',
+                            'job_id': {'$in': JobService._cycle_job_ids(cycle['_id'])},
+                            '$expr': {'$eq': ['$student_id', '$$userId']}
+                        }},
+                        {'$limit': 1},
+                        {'$project': {'_id': 1}}
+                    ],
+                    'as': 'placedIn'
+                }},
+                {'$match': {'placedIn': {'$size': 0}}}
+            ]
         
-        return jobs, total
+        return stages
+    
+    @staticmethod
+    def get_eligible_students(job_id, page=1, per_page=50):
+        """
+        List the students eligible for a job, with counts.
+        
+        Args:
+            job_id: The ID of the job
+            page: Page number
+            per_page: Students per page
+            
+        Returns:
+            Dictionary with total, applied, notApplied, byBranch and a page of
+            students, or None if the job does not exist
+        """
+        try:
+            job = JobService.get_job_by_id(job_id)
+            if not job:
+                return None
+            
+            cycle = None
+            if ObjectId.is_valid(job.get('cycleId')):
+                cycle = mongo.db.placement_cycles.find_one(
+                    {'_id': ObjectId(job['cycleId'])},
+                    {'type': 1, 'batch': 1, 'eligiblePrograms': 1}
+                )
+            
+            applied_ids = mongo.db.applications.distinct('student_id', {'job_id': job['_id']})
+            has_applied = {'$in': ['$user_id', applied_ids]}
+            
+            result = list(mongo.db.student.aggregate(JobService.eligible_students_pipeline(job, cycle) + [
+                {'$facet': {
+                    'totals': [{'$group': {
+                        '_id': None,
+                        'total': {'$sum': 1},
+                        'applied': {'$sum': {'$cond': [has_applied, 1, 0]}}
+                    }}],
+                    'byBranch': [{'$group': {'_id': '$major', 'count': {'$sum': 1}}}],
+                    'students': [
+                        {'$sort': {'name': 1, '_id': 1}},
+                        {'$skip': (page - 1) * per_page},
+                        {'$limit': per_page},
+                        {'$project': {
+                            'name': 1,
+                            'email': 1,
+                            'student_id': 1,
+                            'major': 1,
+                            'cgpa': 1,
+                            'hasApplied': has_applied
+                        }}
+                    ]
+                }}
+            ]))[0]
+            
+            totals = result['totals'][0] if result['totals'] else {'total': 0, 'applied': 0}
+            return {
+                'total': totals['total'],
+                'applied': totals['applied'],
+                'notApplied': totals['total'] - totals['applied'],
+                'byBranch': {row['_id'] or 'Unknown': row['count'] for row in result['byBranch']},
+                'students': [
+                    {
+                        'id': str(student['_id']),
+                        'name': student.get('name', ''),
+                        'email': student.get('email', ''),
+                        'rollNo': student.get('student_id', ''),
+                        'branch': student.get('major', ''),
+                        'cgpa': student.get('cgpa'),
+                        'hasApplied': student.get('hasApplied', False)
+                    }
+                    for student in result['students']
+                ],
+                'page': page,
+                'per_page': per_page
+            }
+        except Exception as e:
+            print(f"Error listing eligible students: {str(e)}")
+            return None
+    
+    @staticmethod
+    def get_eligible_student_emails(job_id):
+        """
+        Get the emails of the students eligible for a job.
+        
+        Args:
+            job_id: The ID of the job
+            
+        Returns:
+            List of student emails
+        """
+        try:
+            job = JobService.get_job_by_id(job_id)
+            if not job:
+                return []
+            
+            cycle = None
+            if ObjectId.is_valid(job.get('cycleId')):
+                cycle = mongo.db.placement_cycles.find_one(
+                    {'_id': ObjectId(job['cycleId'])},
+                    {'type': 1, 'batch': 1, 'eligiblePrograms': 1}
+                )
+            
+            return [
+                student['email']
+                for student in mongo.db.student.aggregate(
+                    JobService.eligible_students_pipeline(job, cycle) + [{'$project': {'email': 1}}]
+                )
+                if student.get('email')
+            ]
+        except Exception as e:
+            print(f"Error getting eligible student emails: {str(e)}")
+            return []
     
     @staticmethod
     def check_student_eligibility(job_id, student_id):
@@ -162,74 +587,99 @@ class JobService:
             # Get job and student details
             job = JobService.get_job_by_id(job_id)
             student = StudentService.get_student_by_user_id(student_id)
-
             
             if not job or not student:
                 return False
             
-            eligibility = job.get('eligibility', {})
-    
-            
-            # Check branch eligibility
-            student_branch = student.get('major', student.get('branch', ''))
-            if student.get('major') not in job.get('eligibility', {}).get('branches', []):
-                return False
-            
-            
-            # Check gender eligibility
-            gender_req = job.get('eligibility', {}).get('gender').lower() 
-            if gender_req and gender_req != 'all' and student.get('gender').lower() != gender_req:
-                return False
+            cycle = None
+            is_placed = False
+            if job.get('cycleId'):
+                cycle = mongo.db.placement_cycles.find_one({'_id': ObjectId(job['cycleId'])}, {'type': 1})
+            if cycle and cycle.get('type') == 'placement':
+                # A selected application to a job of this cycle means they're already placed
+                is_placed = mongo.db.applications.find_one({
+                    'student_id': ObjectId(student_id),
+                    'status': 'selected',
+                    'job_id': {'$in': JobService._cycle_job_ids(cycle['_id'])}
+                }) is not None
             
-            # Check program eligibility
-            # student_program = student.get('program', student.get('degree', ''))
-            # if student_program not in eligibility.get('programs', []):
-            #     return False
-                
+            return JobService._is_eligible(job, student, cycle, is_placed)
             
+        except Exception as e:
+            print(f"Error checking eligibility: {str(e)}")
+            return False
+    
+    @staticmethod
+    def annotate_jobs_for_student(jobs, student_id):
+        """
+        Set hasApplied and isEligible on a page of jobs for one student.
+        
+        The student, the cycles of the jobs and the student's relevant
+        applications are each read once, so the page costs the same number of
+        queries however many jobs it holds.
+        
+        Args:
+            jobs: Job documents of the page (modified in place)
+            student_id: The user ID of the student
             
-            # Check CGPA requirement
-            try:
-                student_cgpa = float(student.get('cgpa', 0))
-                
-                if eligibility.get('uniformCgpa', True):
-                    # If uniform CGPA is required, check against the single CGPA value
-                    min_cgpa = float(eligibility.get('cgpa', 0))
-                    if student_cgpa < min_cgpa:
-                        return False
-                else:
-                    # If non-uniform CGPA, check against branch-specific criteria
-                    cgpa_criteria = eligibility.get('cgpaCriteria', {})
-                    if student_branch in cgpa_criteria:
-                        
-                        branch_min_cgpa = (cgpa_criteria.get(student_branch, {}))
-                        prog_min_cgpa = float(branch_min_cgpa.get('btech', 0))
-                        if student_cgpa < prog_min_cgpa:
-                            return False
-                        
-       
-            except (ValueError, TypeError):
-                # If there's an error converting CGPA to float, consider student ineligible
-                return False
+        Returns:
+            The annotated jobs
+        """
+        for job in jobs:
+            job['hasApplied'] = False
+            job['isEligible'] = False
+        if not jobs:
+            return jobs
+        
+        try:
+            if isinstance(student_id, str):
+                student_id = ObjectId(student_id)
             
-            # Check cycle eligibility (e.g., if student is already placed)
-            cycle = mongo.db.placement_cycles.find_one({'_id': ObjectId(job.get('cycleId'))})
-            if cycle and cycle.get('type') == 'placement':
-                # Check if student is already placed
-                placed_applications = mongo.db.applications.find({
-                    'studentId': student_id,
-                    'status': 'selected'
-                })
-                
-                # If student has any selected application, they're already placed
-                if placed_applications.count() > 0:
-                    return False
+            student = mongo.db.student.find_one({'user_id': student_id})
             
-            return True
+            cycle_ids = {ObjectId(job['cycleId']) for job in jobs if ObjectId.is_valid(job.get('cycleId'))}
+            cycles = {
+                str(cycle['_id']): cycle
+                for cycle in mongo.db.placement_cycles.find({'_id': {'$in': list(cycle_ids)}}, {'type': 1})
+            }
             
+            # Applications to this page's jobs, plus any selection marking the student as placed
+            applied_job_ids = set()
+            selected_job_ids = []
+            for application in mongo.db.applications.find(
+                {
+                    'student_id': student_id,
+                    '$or': [
+                        {'job_id': {'$in': [job['_id'] for job in jobs]}},
+                        {'status': 'selected'}
+                    ]
+                },
+                {'job_id': 1, 'status': 1}
+            ):
+                applied_job_ids.add(application.get('job_id'))
+                if application.get('status') == 'selected':
+                    selected_job_ids.append(application.get('job_id'))
+            
+            # A selection only places the student within the cycle of the selecting job
+            placed_cycle_ids = set()
+            if selected_job_ids:
+                placed_cycle_ids = {
+                    str(job.get('cycleId'))
+                    for job in mongo.db.jobs.find({'_id': {'$in': selected_job_ids}}, {'cycleId': 1})
+                    if job.get('cycleId')
+                }
+            
+            for job in jobs:
+                job['hasApplied'] = job['_id'] in applied_job_ids
+                if student:
+                    job['isEligible'] = JobService._is_eligible(
+                        job, student, cycles.get(str(job.get('cycleId'))),
+                        str(job.get('cycleId')) in placed_cycle_ids
+                    )
         except Exception as e:
-            print(f"Error checking eligibility: {str(e)}")
-            return False
+            print(f"Error annotating jobs for student: {str(e)}")
+        
+        return jobs
     
     @staticmethod
     def has_student_applied(job_id, student_id):
@@ -258,132 +708,38 @@ class JobService:
         """
         Create a job application.
         
+        Reads only the student's precomputed ``is_verified`` flag (kept by
+        ``StudentService.refresh_verified_flag``). The insert is guarded by the
+        unique (job_id, student_id) index, so a repeated or concurrent request
+        returns the application that already exists instead of a duplicate.
+        
         Args:
             job_id: The ID of the job
             student_id: The user_id of the student
             data: Optional additional application data
             
         Returns:
-            The ID of the newly created application
+            The ID of the new (or already existing) application
         """
         try:
-            print(f"\n=== Starting job application process ===")
-            print(f"Job ID: {job_id}")
-            print(f"User ID: {student_id}")
-            
             # Convert string IDs to ObjectId if needed
             if isinstance(job_id, str):
                 job_id = ObjectId(job_id)
-                print(f"Converted job_id to ObjectId: {job_id}")
             if isinstance(student_id, str):
                 student_id = ObjectId(student_id)
-                print(f"Converted student_id to ObjectId: {student_id}")
             
-            # Get student details to check verification status
-            print("\nFetching student details...")
-            student = mongo.db.student.find_one({'user_id': student_id})
+            student = mongo.db.student.find_one(
+                {'user_id': student_id},
+                {'is_verified': 1, 'major': 1, 'gender': 1}
+            )
             if not student:
-                print("ERROR: Student not found")
                 raise Exception("Student not found")
-            
-            # Get the student's _id from the student document
-            student_db_id = student.get('_id')
-            if not student_db_id:
-                print("ERROR: Student _id not found in student document")
-                raise Exception("Student _id not found")
-                
-            print(f"Found student: {student.get('name')}")
-            print(f"Student _id from document: {student_db_id}")
-            print(f"Student document: {student}")
-
-            # Check if student is fully verified
-            print("\nChecking verification status...")
-            verification = student.get('verification', {})
-            print(f"Raw verification data: {verification}")
-            
-            # Check basic info fields
-            print("\nChecking basic info fields...")
-            basic_fields = ['name', 'email', 'phone', 'date_of_birth', 'gender', 
-                          'address', 'major', 'student_id', 'enrollment_year', 
-                          'expected_graduation_year', 'passport_image']
-            
-            for field in basic_fields:
-                status = verification.get(field, {}).get('status')
-                print(f"Field: {field}, Status: {status}")
-            
-            basic_fields_verified = all(
-                verification.get(field, {}).get('status') == 'verified'
-                for field in basic_fields
-            )
-            print(f"Basic fields verified: {basic_fields_verified}")
-
-            # Check education items for this specific student
-            print("\nChecking education items...")
-            print(f"Querying education with student _id: {student_db_id}")
-            education_items = list(mongo.db.education.find({'student_id': student_db_id}))
-            print(f"Found {len(education_items)} education items for student")
-            print(f"Education items: {education_items}")
-            for i, edu in enumerate(education_items):
-                print(f"Education {i+1} verified: {edu.get('is_verified', False)}")
-            education_verified = all(
-                edu.get('is_verified', False)
-                for edu in education_items
-            )
-            print(f"All education items verified: {education_verified}")
-
-            # Check experience items for this specific student
-            print("\nChecking experience items...")
-            print(f"Querying experience with student _id: {student_db_id}")
-            experience_items = list(mongo.db.experience.find({'student_id': student_db_id}))
-            print(f"Found {len(experience_items)} experience items for student")
-            print(f"Experience items: {experience_items}")
-            for i, exp in enumerate(experience_items):
-                print(f"Experience {i+1} verified: {exp.get('is_verified', False)}")
-            experience_verified = all(
-                exp.get('is_verified', False)
-                for exp in experience_items
-            )
-            print(f"All experience items verified: {experience_verified}")
-
-            # Check positions items for this specific student
-            print("\nChecking positions items...")
-            print(f"Querying positions with student _id: {student_db_id}")
-            positions_items = list(mongo.db.positions.find({'student_id': student_db_id}))
-            print(f"Found {len(positions_items)} positions items for student")
-            print(f"Positions items: {positions_items}")
-            for i, pos in enumerate(positions_items):
-                print(f"Position {i+1} verified: {pos.get('is_verified', False)}")
-            positions_verified = all(
-                pos.get('is_verified', False)
-                for pos in positions_items
-            )
-            print(f"All positions items verified: {positions_verified}")
-
-            # Check projects items for this specific student
-            print("\nChecking projects items...")
-            print(f"Querying projects with student _id: {student_db_id}")
-            projects_items = list(mongo.db.projects.find({'student_id': student_db_id}))
-            print(f"Found {len(projects_items)} projects items for student")
-            print(f"Projects items: {projects_items}")
-            for i, proj in enumerate(projects_items):
-                print(f"Project {i+1} verified: {proj.get('is_verified', False)}")
-            projects_verified = all(
-                proj.get('is_verified', False)
-                for proj in projects_items
-            )
-            print(f"All projects items verified: {projects_verified}")
-
-            # Final verification check
-            is_fully_verified = (basic_fields_verified and education_verified and 
-                               experience_verified and positions_verified and projects_verified)
-            print(f"\nFinal verification status: {is_fully_verified}")
-
-            # If any verification check fails, raise an exception
-            if not is_fully_verified:
-                print("ERROR: Student profile is not fully verified")
+            # Students saved before the flag existed get it computed once here
+            if 'is_verified' not in student:
+                student['is_verified'] = StudentService.refresh_verified_flag(student['_id'])
+            if not student.get('is_verified'):
                 raise Exception("Student profile is not fully verified. Please complete verification before applying.")
-
-            print("\nCreating application...")
+            
             # Create base application
             application = {
                 'job_id': job_id,
@@ -393,37 +749,44 @@ class JobService:
                 'created_at': datetime.utcnow(),
                 'updated_at': datetime.utcnow()
             }
-
+            
             # Add additional data if provided
             if data:
-                print("Adding additional application data...")
                 if 'resumeId' in data:
                     resume_id = data['resumeId']
                     if isinstance(resume_id, str):
                         resume_id = ObjectId(resume_id)
                     application['resume_id'] = resume_id
-                    print(f"Added resume ID: {resume_id}")
                 if 'coverLetter' in data:
                     application['cover_letter'] = data['coverLetter']
-                    print("Added cover letter")
                 if 'answers' in data:
                     application['answers'] = data['answers']
-                    print("Added application answers")
-
-            result = mongo.db.applications.insert_one(application)
-            print(f"Application created with ID: {result.inserted_id}")
+            
+            try:
+                result = mongo.db.applications.insert_one(application)
+            except DuplicateKeyError:
+                existing = mongo.db.applications.find_one(
+                    {'job_id': job_id, 'student_id': student_id},
+                    {'_id': 1}
+                )
+                return str(existing['_id'])
             
             # Update job applications count
             mongo.db.jobs.update_one(
                 {'_id': job_id},
                 {'$inc': {'applications_count': 1}}
             )
-            print("Updated job applications count")
             
-            print("=== Job application process completed successfully ===\n")
+            try:
+                application['_id'] = result.inserted_id
+                CycleStatsService.record_application(application, student=student)
+                JobService.invalidate_job_statistics(job_id)
+            except Exception as e:
+                print(f"Error updating cycle statistics: {str(e)}")
+            
             return str(result.inserted_id)
         except Exception as e:
-            print(f"\nERROR in create_application: {str(e)}")
+            print(f"Error creating application: {str(e)}")
             return None
     
     @staticmethod
@@ -444,44 +807,55 @@ class JobService:
             return None
     
     @staticmethod
-    def get_applications_by_job(job_id, page=1, per_page=25, status=None):
+    def get_applications_by_job(job_id, page=1, per_page=25, status=None, cursor=None):
         """
         Get applications for a specific job with pagination.
         
+        Applications are listed newest first. The page, the total and the
+        per-status counts come from a single aggregation. Passing a cursor (an
+        empty string for the first page) switches to keyset pagination.
+        
         Args:
             job_id: The ID of the job
-            page: Page number
+            page: Page number (ignored when a cursor is given)
             per_page: Items per page
             status: Optional status filter
+            cursor: Cursor returned with the previous page, for keyset pagination
             
         Returns:
-            List of application documents and total count
+            Dictionary with applicants, total, statusCounts, page, per_page and
+            nextCursor (None on the last page)
         """
+        result = {
+            'applicants': [],
+            'total': 0,
+            'statusCounts': {},
+            'page': page,
+            'per_page': per_page,
+            'nextCursor': None
+        }
         try:
-            query = {'job_id': ObjectId(job_id)}
-            
+            page_query = {}
             if status:
-                query['status'] = status
-            
-            # Get total count
-            total = mongo.db.applications.count_documents(query)
-            
-            # Load student data for each application
-            # Aggregation pipeline to fetch student details
-            pipeline = [
-                {'$match': query},
-                {'$sort': {'createdAt': -1}},
-                {'$skip': (page - 1) * per_page},
-                {'$limit': per_page},
+                page_query['status'] = status
+            if cursor:
+                page_query.update(keyset_filter(APPLICANT_SORT, decode_cursor(cursor, APPLICANT_SORT)))
+            
+            page_stages = [{'$match': page_query}] if page_query else []
+            if cursor is None and page > 1:
+                page_stages.append({'$skip': (page - 1) * per_page})
+            page_stages += [
+                {'$limit': per_page + 1},
+                # Load student data for each application on the page
                 {'$lookup': {
                     'from': 'student',
-                    'localField': 'student_id',  # Ensure this matches applications schema
-                    'foreignField': 'user_id',  # Matches student schema
+                    'localField': 'student_id',
+                    'foreignField': 'user_id',
                     'as': 'student'
                 }},
-                {'$unwind': '$student'},
+                {'$unwind': {'path': '$student', 'preserveNullAndEmptyArrays': True}},
                 {'$project': {
-                    '_id': '$student.user_id',
+                    '_id': {'$ifNull': ['$student.user_id', None]},
                     'applicationId': '$_id',
                     'name': '$student.name',
                     'email': '$student.email',
@@ -496,16 +870,38 @@ class JobService:
                     'passportImage': '$student.passportImage',
                     'cgpa':'$student.cgpa',
                     'status': 1,
-                    'currentStage': '$current_stage'
+                    'currentStage': '$current_stage',
+                    'created_at': 1
                 }}
             ]
             
-            students = list(mongo.db.applications.aggregate(pipeline))
-            
-            return students, total
+            # Sorting before the facet walks the (job_id, created_at, _id) index
+            facet = list(mongo.db.applications.aggregate([
+                {'$match': {'job_id': ObjectId(job_id)}},
+                {'$sort': dict(APPLICANT_SORT)},
+                {'$facet': {
+                    'statusCounts': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+                    'applicants': page_stages
+                }}
+            ]))[0]
+            
+            status_counts = {(row['_id'] or 'applied'): row['count'] for row in facet['statusCounts']}
+            applicants = facet['applicants']
+            
+            # The cursor is built from the application's own sort keys
+            cursor_keys = [{'created_at': row.get('created_at'), '_id': row.get('applicationId')} for row in applicants]
+            result['nextCursor'] = next_cursor(cursor_keys, APPLICANT_SORT, per_page)
+            
+            # Applications whose student no longer exists are left out of the page
+            result['applicants'] = [row for row in applicants[:per_page] if row.get('_id') is not None]
+            result['statusCounts'] = status_counts
+            result['total'] = status_counts.get(status, 0) if status else sum(status_counts.values())
+            return result
+        except InvalidCursor:
+            raise
         except Exception as e:
             print(f"Error retrieving applications: {str(e)}")
-            return [], 0
+            return result
     
     @staticmethod
     def get_student_applications(student_id, status=None):
@@ -586,27 +982,153 @@ class JobService:
         try:
             update_data = {
                 'status': status,
-                'updatedAt': datetime.utcnow()
+                'updatedAt': datetime.utcnow(),
+                'updated_at': datetime.utcnow()
             }
             
             if current_stage:
                 update_data['currentStage'] = current_stage
             
-            result = mongo.db.applications.update_one(
+            previous = mongo.db.applications.find_one_and_update(
                 {'_id': ObjectId(application_id)},
-                {'$set': update_data}
+                {'$set': update_data},
+                projection={'job_id': 1, 'student_id': 1, 'status': 1},
+                return_document=ReturnDocument.BEFORE
             )
+            if not previous:
+                return False
             
-            return result.modified_count > 0
+            try:
+                CycleStatsService.record_status_change(previous, previous.get('status'), status)
+                JobService.invalidate_job_statistics(previous.get('job_id'))
+            except Exception as e:
+                print(f"Error updating cycle statistics: {str(e)}")
+            
+            return True
         except Exception as e:
             print(f"Error updating application status: {str(e)}")
             return False
     
+    @staticmethod
+    def bulk_update_application_status(status, current_stage=None, application_ids=None,
+                                       job_id=None, current_status=None, batch_size=BULK_STATUS_BATCH_SIZE):
+        """
+        Update the status of many applications at once.
+        
+        Applications are given by ID, or selected by job (and optionally their
+        current status). They are written with ordered ``bulk_write`` batches;
+        each write only applies if the application still has the status it was
+        read with, so a concurrent change is reported instead of overwritten.
+        Cycle statistics are updated once per batch and the affected jobs'
+        cached statistics are invalidated.
+        
+        Args:
+            status: The new status
+            current_stage: The new current stage
+            application_ids: IDs of the applications to update
+            job_id: Update the applications of this job (when no IDs are given)
+            current_status: Only update applications of the job with this status
+            batch_size: Number of applications written per bulk_write
+            
+        Returns:
+            Dictionary with the number of applications updated and a result
+            ('updated', 'not_found', 'conflict' or 'invalid') per application
+        """
+        results = []
+        if application_ids is None:
+            query = {'job_id': ObjectId(job_id)}
+            if current_status:
+                query['status'] = current_status
+            ids = [application['_id'] for application in mongo.db.applications.find(query, {'_id': 1}).sort('_id', 1)]
+        else:
+            ids = []
+            for application_id in dict.fromkeys(application_ids):
+                if ObjectId.is_valid(application_id):
+                    ids.append(ObjectId(application_id))
+                else:
+                    results.append({'id': str(application_id), 'result': 'invalid'})
+        
+        update_data = {'status': status}
+        if current_stage:
+            update_data['currentStage'] = current_stage
+        
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            previous = {
+                application['_id']: application for application in mongo.db.applications.find(
+                    {'_id': {'$in': batch}},
+                    {'job_id': 1, 'student_id': 1, 'status': 1}
+                )
+            }
+            
+            # The timestamp marks this batch's writes, to tell them apart from concurrent ones
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {'_id': application_id, 'status': application.get('status')},
+                    {'$set': {**update_data, 'updatedAt': now, 'updated_at': now}}
+                )
+                for application_id, application in previous.items()
+            ]
+            applied = set()
+            if operations:
+                result = mongo.db.applications.bulk_write(operations, ordered=True)
+                if result.matched_count == len(operations):
+                    applied = set(previous)
+                else:
+                    applied = set(mongo.db.applications.distinct(
+                        '_id', {'_id': {'$in': list(previous)}, 'updated_at': now, 'status': status}
+                    ))
+            
+            for application_id in batch:
+                if application_id not in previous:
+                    outcome = 'not_found'
+                elif application_id in applied:
+                    outcome = 'updated'
+                else:
+                    outcome = 'conflict'
+                results.append({'id': str(application_id), 'result': outcome})
+            updated += len(applied)
+            
+            try:
+                CycleStatsService.record_status_changes([
+                    (previous[application_id], previous[application_id].get('status'), status)
+                    for application_id in applied
+                ])
+                for changed_job_id in {previous[application_id].get('job_id') for application_id in applied}:
+                    JobService.invalidate_job_statistics(changed_job_id)
+            except Exception as e:
+                print(f"Error updating cycle statistics: {str(e)}")
+        
+        return {'updated': updated, 'results': results}
+    
+    @staticmethod
+    def invalidate_job_statistics(job_id):
+        """
+        Drop a job's cached statistics after its applications change.
+        
+        The version counter makes a computation that started before the
+        change discard its (stale) result instead of caching it.
+        
+        Args:
+            job_id: The ID of the job
+        """
+        mongo.db.job_stats.update_one(
+            {'_id': str(job_id)},
+            {'$inc': {'version': 1}, '$unset': {'stats': ''}},
+            upsert=True
+        )
+    
     @staticmethod
     def get_job_statistics(job_id):
         """
         Get statistics for a specific job.
         
+        Status, branch and gender distributions are computed in one pass over
+        the job's applications and cached in ``job_stats`` until an
+        application for the job is created or changes status.
+        
         Args:
             job_id: The ID of the job
             
@@ -614,71 +1136,59 @@ class JobService:
             Dictionary of job statistics
         """
         try:
-            # Get application counts by status
-            pipeline = [
-                {'$match': {'jobId': job_id}},
-                {'$group': {
-                    '_id': '$status',
-                    'count': {'$sum': 1}
-                }}
-            ]
+            cached = mongo.db.job_stats.find_one({'_id': str(job_id)}) or {}
+            if cached.get('stats'):
+                return cached['stats']
             
-            status_counts = {item['_id']: item['count'] 
-                            for item in mongo.db.applications.aggregate(pipeline)}
+            job = mongo.db.jobs.find_one({'_id': ObjectId(job_id)}, {'company': 1, 'role': 1})
+            if not job:
+                return {}
             
-            # Get branch distribution
-            pipeline = [
-                {'$match': {'jobId': job_id}},
+            result = list(mongo.db.applications.aggregate([
+                {'$match': {'job_id': job['_id']}},
                 {'$lookup': {
-                    'from': 'students',
-                    'localField': 'studentId',
-                    'foreignField': '_id',
-                    'as': 'student'
-                }},
-                {'$unwind': '$student'},
-                {'$group': {
-                    '_id': '$student.branch',
-                    'count': {'$sum': 1}
-                }}
-            ]
-            
-            branch_distribution = {item['_id']: item['count'] 
-                                for item in mongo.db.applications.aggregate(pipeline)}
-            
-            # Get gender distribution
-            pipeline = [
-                {'$match': {'jobId': job_id}},
-                {'$lookup': {
-                    'from': 'students',
-                    'localField': 'studentId',
-                    'foreignField': '_id',
+                    'from': 'student',
+                    'localField': 'student_id',
+                    'foreignField': 'user_id',
                     'as': 'student'
                 }},
-                {'$unwind': '$student'},
-                {'$group': {
-                    '_id': '$student.gender',
-                    'count': {'$sum': 1}
+                {'$unwind': {'path': '$student', 'preserveNullAndEmptyArrays': True}},
+                {'$facet': {
+                    'statusCounts': [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}],
+                    'branchDistribution': [
+                        {'$match': {'student': {'$exists': True}}},
+                        {'$group': {'_id': '$student.major', 'count': {'$sum': 1}}}
+                    ],
+                    'genderDistribution': [
+                        {'$match': {'student': {'$exists': True}}},
+                        {'$group': {'_id': '$student.gender', 'count': {'$sum': 1}}}
+                    ]
                 }}
-            ]
+            ]))[0]
             
-            gender_distribution = {item['_id']: item['count'] 
-                                 for item in mongo.db.applications.aggregate(pipeline)}
-            
-            # Get total applications
-            total_applications = sum(status_counts.values())
-            
-            # Get job details
-            job = JobService.get_job_by_id(job_id)
-            
-            return {
-                'jobId': job_id,
+            status_counts = {stats_key(item['_id']): item['count'] for item in result['statusCounts']}
+            stats = {
+                'jobId': str(job_id),
                 'company': job.get('company', ''),
                 'role': job.get('role', ''),
-                'totalApplications': total_applications,
+                'totalApplications': sum(status_counts.values()),
                 'statusCounts': status_counts,
-                'branchDistribution': branch_distribution,
-                'genderDistribution': gender_distribution
+                'branchDistribution': {stats_key(item['_id']): item['count'] for item in result['branchDistribution']},
+                'genderDistribution': {stats_key(item['_id']): item['count'] for item in result['genderDistribution']}
             }
+            
+            # Only cache if no application changed while this was computed
+            try:
+                mongo.db.job_stats.update_one(
+                    {'_id': str(job_id), 'version': cached.get('version', 0)},
+                    {'$set': {'stats': stats, 'version': cached.get('version', 0), 'computedAt': datetime.utcnow()}},
+                    upsert=True
+                )
+            except DuplicateKeyError:
+                # The version moved on; the next read recomputes
+                pass
+            
+            return stats
         except Exception as e:
             print(f"Error retrieving job statistics: {str(e)}")
             return {}
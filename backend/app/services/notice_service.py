@@ -3,11 +3,20 @@ from bson.objectid import ObjectId
 from datetime import datetime
 import logging
 from app.utils.cloudinary_config import delete_file
+from app.utils.pagination import InvalidCursor, keyset_filter, decode_cursor, next_cursor, cached_count
 import re
 
 logger = logging.getLogger(__name__)
 
+# Sort keys of the notice list, newest first
+NOTICE_SORT = [('createdAt', -1), ('_id', -1)]
+
 class NoticeService:
+    @staticmethod
+    def ensure_indexes():
+        """Create the index used to page through notices."""
+        mongo.db.notices.create_index(NOTICE_SORT)
+
     @staticmethod
     def create_notice(data, user_id):
         try:
@@ -43,7 +52,7 @@ class NoticeService:
             return None
 
     @staticmethod
-    def get_notices(page=1, per_page=10, notice_type=None, company=None):
+    def get_notices(page=1, per_page=10, notice_type=None, company=None, cursor=None, include_total=True):
         try:
             # Build query
             query = {}
@@ -53,13 +62,19 @@ class NoticeService:
                 query['company'] = company
 
             # Get total count
-            total = mongo.db.notices.count_documents(query)
+            total = cached_count(mongo.db.notices, query) if include_total else None
+
+            # A cursor (empty for the first page) pages by sort keys instead of page number
+            page_query = query
+            if cursor:
+                page_query = {'$and': [query, keyset_filter(NOTICE_SORT, decode_cursor(cursor, NOTICE_SORT))]}
 
             # Get notices with pagination
-            notices = list(mongo.db.notices.find(query)
-                        .sort('createdAt', -1)
-                        .skip((page-1)*per_page)
-                        .limit(per_page))
+            notices = list(mongo.db.notices.find(page_query)
+                        .sort(NOTICE_SORT)
+                        .skip(0 if cursor is not None else (page-1)*per_page)
+                        .limit(per_page + 1))
+            next_page = next_cursor(notices, NOTICE_SORT, per_page)
 
             # Convert ObjectId to string for JSON serialization
             for notice in notices:
@@ -67,8 +82,10 @@ class NoticeService:
                 if 'createdBy' in notice:
                     notice['createdBy'] = str(notice['createdBy'])
 
-            return notices, total
+            return notices, total, next_page
 
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Error fetching notices: {str(e)}", exc_info=True)
             raise Exception(f"Failed to fetch notices: {str(e)}")
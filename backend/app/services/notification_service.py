@@ -19,33 +19,27 @@ class NotificationService:
     def get_student_notifications(self, email: str) -> dict:
         """Get notifications for a student based on their email (batch and program)"""
         try:
-            # Extract batch and program from email
-            batch = email[:4]  # First 4 characters are batch year
-            program_match = email.split('cs')[1][0]  # Get the character after 'cs'
-            program = 'btech' if program_match == 'b' else 'mtech'
+            # Batch and program are stored on the user when the account is created
+            user = mongo.db.users.find_one({"email": email}, {"batch": 1, "program": 1}) or {}
+            batch, program = user.get("batch"), user.get("program")
 
             print(f"Looking for cycle with batch: {batch} and program: {program}")
 
-            # First get all active cycles
-            active_cycles = list(mongo.db.placement_cycles.find({"status": "active"}))
-            
-            # Convert ObjectId to string and print cycle details for debugging
-            for cycle in active_cycles:
-                cycle['_id'] = str(cycle['_id'])
-                print(f"Found cycle: {cycle}")
-
-            # Find cycle matching student's batch and program
+            # Find the active cycle matching student's batch and program
             matching_cycle = None
-            for cycle in active_cycles:
-                if cycle.get('batch') == batch and program in cycle.get('eligiblePrograms', []):
-                    matching_cycle = cycle
-                    break
+            if batch and program:
+                matching_cycle = mongo.db.placement_cycles.find_one({
+                    "status": "active",
+                    "batch": batch,
+                    "eligiblePrograms": program
+                })
 
             if not matching_cycle:
                 return {
                     "error": "No active placement cycle found for your batch and program",
                     "notifications": []
                 }
+            matching_cycle['_id'] = str(matching_cycle['_id'])
 
             # Get notifications for the matching cycle
             notifications = list(mongo.db.notifications.find(
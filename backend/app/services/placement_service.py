@@ -1,6 +1,9 @@
 from app import mongo
+from app.services.cycle_stats_service import CycleStatsService
+from app.utils.compensation import COMPENSATION_FIELDS, job_package_value, job_stipend_value
 from bson.objectid import ObjectId
 from datetime import datetime
+from pymongo import UpdateOne
 
 class PlacementService:
     @staticmethod
@@ -17,6 +20,45 @@ class PlacementService:
         query = filters or {}
         return list(mongo.db.placement_cycles.find(query).sort('startDate', -1))
     
+    @staticmethod
+    def get_cycle_counts(cycles):
+        """
+        Count the jobs and eligible students of several placement cycles.
+        
+        Uses one grouped aggregation over jobs and one over students, however
+        many cycles are listed.
+        
+        Args:
+            cycles: Placement cycle documents
+            
+        Returns:
+            Dictionary mapping cycle ID to a dictionary with jobs and students
+        """
+        from app.services.student_service import StudentService
+        
+        cycle_ids = [str(cycle['_id']) for cycle in cycles]
+        jobs = {
+            row['_id']: row['count']
+            for row in mongo.db.jobs.aggregate([
+                {'$match': {'cycleId': {'$in': cycle_ids}}},
+                {'$group': {'_id': '$cycleId', 'count': {'$sum': 1}}}
+            ])
+        }
+        
+        batches = {cycle.get('batch') for cycle in cycles if cycle.get('batch')}
+        students = StudentService.count_students_by_cohort(batches) if batches else {}
+        
+        return {
+            str(cycle['_id']): {
+                'jobs': jobs.get(str(cycle['_id']), 0),
+                'students': sum(
+                    students.get((cycle.get('batch'), program), 0)
+                    for program in set(cycle.get('eligiblePrograms') or [])
+                )
+            }
+            for cycle in cycles
+        }
+    
     @staticmethod
     def get_placement_cycle_by_id(cycle_id):
         """
@@ -115,6 +157,7 @@ class PlacementService:
             
             # Delete the cycle itself
             result = mongo.db.placement_cycles.delete_one({'_id': ObjectId(cycle_id)})
+            CycleStatsService.delete(cycle_id)
             return result.deleted_count > 0
         except Exception:
             return False
@@ -165,6 +208,7 @@ class PlacementService:
             'company': data['company'],
             'role': data['role'],
             'package': data['package'],
+            'packageValue': job_package_value(data),
             'location': data['location'],
             'deadline': data['deadline'],
             'accommodation': data.get('accommodation', False),
@@ -187,6 +231,12 @@ class PlacementService:
             'jobDescriptionFilePublicId': data.get('jobDescriptionFilePublicId', '')
         }
         result = mongo.db.jobs.insert_one(job)
+        
+        try:
+            CycleStatsService.record_job(cycle_id, job['company'])
+        except Exception as e:
+            print(f"Error updating cycle statistics: {str(e)}")
+        
         return str(result.inserted_id)
 
     
@@ -207,67 +257,47 @@ class PlacementService:
             if not cycle:
                 return None
             
-            # Get all jobs in this cycle
-            jobs = list(mongo.db.jobs.find({'cycleId': cycle_id}))
-            job_ids = [str(job['_id']) for job in jobs]
-            
-            # Count applications and selected students
-            applications = list(mongo.db.applications.find({'jobId': {'$in': job_ids}}))
-            selected_applications = [app for app in applications if app['status'] == 'selected']
-            
-            # Get unique companies and students
-            companies = set(job['company'] for job in jobs)
-            student_ids = set(app['studentId'] for app in applications)
-            selected_student_ids = set(app['studentId'] for app in selected_applications)
-            
-            # Get gender-wise statistics if available
-            male_selected = 0
-            female_selected = 0
-            for student_id in selected_student_ids:
-                student = mongo.db.students.find_one({'_id': ObjectId(student_id)})
-                if student:
-                    if student.get('gender') == 'male':
-                        male_selected += 1
-                    elif student.get('gender') == 'female':
-                        female_selected += 1
+            # Counters are maintained incrementally in the cycle_stats collection
+            stats = CycleStatsService.get(cycle_id)
+            
+            companies = [name for name, counts in stats.get('company', {}).items() if counts.get('jobs', 0) > 0]
+            students_applied = stats.get('studentsApplied', 0)
+            students_selected = stats.get('studentsSelected', 0)
+            gender_stats = stats.get('gender', {})
             
             # Get branch-wise statistics
-            branch_stats = {}
-            for student_id in selected_student_ids:
-                student = mongo.db.students.find_one({'_id': ObjectId(student_id)})
-                if student and 'branch' in student:
-                    branch = student['branch']
-                    branch_stats[branch] = branch_stats.get(branch, 0) + 1
-            
-            # Calculate average and highest package/stipend
-            highest_package = 0
-            total_package = 0
-            package_count = 0
-            
-            for job in jobs:
-                if cycle['type'] == 'placement' and job.get('salary'):
-                    try:
-                        salary = float(job['salary'].replace('LPA', '').strip())
-                        highest_package = max(highest_package, salary)
-                        total_package += salary
-                        package_count += 1
-                    except (ValueError, AttributeError):
-                        pass
-            
-            avg_package = total_package / package_count if package_count > 0 else 0
+            branch_stats = {
+                branch: counts['studentsSelected']
+                for branch, counts in stats.get('branch', {}).items()
+                if counts.get('studentsSelected', 0) > 0
+            }
+            
+            # Calculate average and highest package
+            package_stats = []
+            if cycle['type'] == 'placement':
+                package_stats = list(mongo.db.jobs.aggregate([
+                    {'$match': {'cycleId': cycle_id, 'packageValue': {'$gt': 0}}},
+                    {'$group': {
+                        '_id': None,
+                        'highest': {'$max': '$packageValue'},
+                        'average': {'$avg': '$packageValue'}
+                    }}
+                ]))
+            highest_package = package_stats[0]['highest'] if package_stats else 0
+            avg_package = package_stats[0]['average'] if package_stats else 0
             
             return {
-                'totalJobs': len(jobs),
+                'totalJobs': stats.get('jobs', 0),
                 'totalCompanies': len(companies),
-                'totalApplications': len(applications),
-                'totalStudentsApplied': len(student_ids),
-                'totalSelected': len(selected_student_ids),
-                'maleSelected': male_selected,
-                'femaleSelected': female_selected,
+                'totalApplications': stats.get('totalApplications', 0),
+                'totalStudentsApplied': students_applied,
+                'totalSelected': students_selected,
+                'maleSelected': gender_stats.get('male', {}).get('studentsSelected', 0),
+                'femaleSelected': gender_stats.get('female', {}).get('studentsSelected', 0),
                 'branchStatistics': branch_stats,
                 'highestPackage': highest_package,
                 'averagePackage': avg_package,
-                'placementPercentage': (len(selected_student_ids) / len(student_ids) * 100) if len(student_ids) > 0 else 0
+                'placementPercentage': (students_selected / students_applied * 100) if students_applied > 0 else 0
             }
         except Exception as e:
             print(f"Error in get_cycle_statistics: {str(e)}")
@@ -349,6 +379,12 @@ class PlacementService:
                 update_data['role'] = data['role']
             if 'package' in data:
                 update_data['package'] = data['package']
+                # Salary and stipend fields of the stored job still apply
+                stored = mongo.db.jobs.find_one(
+                    {'_id': ObjectId(job_id)},
+                    {field: 1 for field in COMPENSATION_FIELDS}
+                ) or {}
+                update_data['packageValue'] = job_package_value({**stored, 'package': data['package']})
             if 'location' in data:
                 update_data['location'] = data['location']
             if 'deadline' in data:
@@ -396,3 +432,36 @@ class PlacementService:
         except Exception as e:
             print(f"Error updating job: {str(e)}")
             return False
+
+    @staticmethod
+    def backfill_package_values(batch_size=500, recompute=False):
+        """
+        Store the numeric package and stipend on jobs created before they were recorded.
+        
+        Args:
+            batch_size: Number of updates sent per bulk write
+            recompute: Whether to also recompute jobs that already have a value
+            
+        Returns:
+            Number of jobs updated
+        """
+        updated = 0
+        operations = []
+        jobs = mongo.db.jobs.find(
+            {} if recompute else {'packageValue': {'$exists': False}},
+            {field: 1 for field in COMPENSATION_FIELDS}
+        ).batch_size(batch_size)
+        
+        for job in jobs:
+            operations.append(UpdateOne(
+                {'_id': job['_id']},
+                {'$set': {'packageValue': job_package_value(job), 'stipendValue': job_stipend_value(job)}}
+            ))
+            if len(operations) == batch_size:
+                updated += mongo.db.jobs.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        
+        if operations:
+            updated += mongo.db.jobs.bulk_write(operations, ordered=False).modified_count
+        
+        return updated
@@ -0,0 +1,180 @@
+# app/services/report_pdf_service.py
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import threading
+import tempfile
+import json
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from app.services.report_service import ReportService
+from app.services.report_queue_service import _init_worker_process
+from app.utils.blob_store import get_report_store
+
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 12 * mm
+FONT = 'Helvetica'
+FONT_BOLD = 'Helvetica-Bold'
+FONT_SIZE = 7
+ROW_HEIGHT = 12
+HEADER_HEIGHT = 16
+
+TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT, FONT_SIZE),
+    ('FONT', (0, 0), (-1, 0), FONT_BOLD, FONT_SIZE),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')]),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#d1d5db')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+
+def _fit(value, width, font=FONT):
+    """Render a value as text truncated to fit a column of the given width."""
+    if value is None:
+        text = ''
+    elif isinstance(value, (list, dict)):
+        text = json.dumps(value, default=str)
+    else:
+        text = str(value)
+
+    available = width - 6
+    # No Helvetica glyph is narrower than 0.19em, so longer text can never fit
+    text = ' '.join(text.split())[:int(available / (FONT_SIZE * 0.19)) + 1]
+    if stringWidth(text, font, FONT_SIZE) <= available:
+        return text
+
+    while text and stringWidth(text + '...', font, FONT_SIZE) > available:
+        text = text[:-1]
+    return text + '...'
+
+
+def _heading(column):
+    """Turn a camelCase report key into a column heading."""
+    heading = ''.join(f' {char}' if char.isupper() else char for char in column)
+    return heading.strip().capitalize()
+
+
+def render_report_pdf(data_key, export_key, title, columns=None):
+    """
+    Render a stored report to PDF, one page at a time, and save it to the report store.
+
+    Each page is drawn as its own table flowable and written out before the
+    next page's rows are read, so only a single page of rows is held in
+    memory. Cell text is truncated to the column width to keep rows a fixed
+    height. Runs in a report worker process, which has its own app context.
+
+    Args:
+        data_key: Store prefix of the report data
+        export_key: Name of the PDF in the report store
+        title: Title printed at the top of every page
+        columns: Report columns, in output order (read from the data when omitted)
+
+    Returns:
+        The name of the rendered PDF in the report store
+    """
+    if columns is None:
+        columns = ReportService._report_columns(data_key)
+
+    page_width, page_height = PAGE_SIZE
+    table_width = page_width - 2 * MARGIN
+    column_width = table_width / max(len(columns), 1)
+    table_top = page_height - MARGIN - 18
+    rows_per_page = max(int((table_top - MARGIN - 14 - HEADER_HEIGHT) // ROW_HEIGHT), 1)
+
+    header = [_fit(_heading(column), column_width, FONT_BOLD) for column in columns]
+    generated_on = datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
+
+    output = tempfile.TemporaryFile()
+    pdf = canvas.Canvas(output, pagesize=PAGE_SIZE)
+    pdf.setTitle(title)
+
+    def draw_page(page_rows, page_number):
+        pdf.setFont(FONT_BOLD, 12)
+        pdf.drawString(MARGIN, page_height - MARGIN - 10, title)
+        pdf.setFont(FONT, 7)
+        pdf.drawRightString(page_width - MARGIN, page_height - MARGIN - 10, f"Generated {generated_on}")
+        pdf.drawRightString(page_width - MARGIN, MARGIN - 4, f"Page {page_number}")
+
+        if not columns:
+            pdf.drawString(MARGIN, table_top - ROW_HEIGHT, "No data for this report")
+            pdf.showPage()
+            return
+
+        table = Table(
+            [header] + page_rows,
+            colWidths=[column_width] * len(columns),
+            rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * len(page_rows)
+        )
+        table.setStyle(TABLE_STYLE)
+        _, height = table.wrapOn(pdf, table_width, table_top - MARGIN)
+        table.drawOn(pdf, MARGIN, table_top - height)
+        pdf.showPage()
+
+    page_rows = []
+    page_number = 1
+    for row in ReportService.iter_report_rows(data_key):
+        page_rows.append([_fit(row.get(column), column_width) for column in columns])
+        if len(page_rows) == rows_per_page:
+            draw_page(page_rows, page_number)
+            page_rows = []
+            page_number += 1
+
+    if page_rows or page_number == 1:
+        draw_page(page_rows, page_number)
+
+    pdf.save()
+    with output:
+        output.seek(0)
+        get_report_store().put(export_key, output)
+    return export_key
+
+
+class ReportPdfService:
+    """Renders report PDFs in a process pool and keeps them in the report store."""
+    _executor = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls, max_workers):
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker_process
+                )
+            return cls._executor
+
+    @classmethod
+    def get_pdf(cls, data_key, title, max_workers=2, timeout=None):
+        """
+        Get the PDF for a report, rendering it only if it is not stored yet.
+
+        Args:
+            data_key: Store prefix of the report data
+            title: Title printed on each page
+            max_workers: Size of the rendering process pool
+            timeout: Seconds to wait for the render before giving up
+
+        Returns:
+            The name of the PDF in the report store
+        """
+        export_key = f"{data_key}/export.pdf"
+
+        # Completed report data never changes, so a rendered file stays valid
+        if ReportService._is_export_current(data_key, export_key):
+            return export_key
+
+        future = cls._get_executor(max_workers).submit(
+            render_report_pdf, data_key, export_key, title
+        )
+        return future.result(timeout=timeout)
@@ -0,0 +1,430 @@
+# app/services/report_queue_service.py
+from app import mongo
+from app.config import Config
+from app.services.database import to_object_id
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+import socket
+import uuid
+import os
+import time
+
+from pymongo import ReturnDocument
+
+
+class WorkerConfig(Config):
+    """Configuration used by report worker processes (they never dispatch or schedule jobs themselves)."""
+    REPORT_QUEUE_ENABLED = False
+    REPORT_SCHEDULER_ENABLED = False
+
+
+# Flask app owned by a report worker process, created once by the pool initializer
+_worker_app = None
+
+
+def _init_worker_process():
+    """Create an app context inside a freshly spawned report worker process."""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app(WorkerConfig)
+    _worker_app.app_context().push()
+
+
+def _run_report_job(report_id):
+    """
+    Run a claimed report inside a worker process.
+
+    Args:
+        report_id: The ID of the report to generate
+
+    Returns:
+        The final status of the report
+    """
+    from app.services.report_service import ReportService
+    return ReportService.run_report(
+        report_id,
+        should_cancel=lambda: ReportQueueService.is_cancel_requested(report_id)
+    )
+
+
+class ReportQueueService:
+    """
+    Persistent report job queue stored in the ``reports`` collection.
+
+    Reports are enqueued with status ``queued``. A dispatcher thread in each
+    app process claims them with a time-limited lease and runs them in a
+    process pool; leases are renewed while a job runs, so jobs orphaned by a
+    dead process are picked up again once their lease expires. If a worker
+    process dies, the pool is replaced and its jobs are put back in the queue.
+    """
+    _executor = None
+    _pool_broken = False
+    _dispatcher = None
+    _worker_id = None
+    _in_flight = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enqueue(report_type, filters):
+        """
+        Add a report to the queue, or join an identical report already queued or running.
+
+        Args:
+            report_type: Type of report to generate
+            filters: Dictionary of filter criteria
+
+        Returns:
+            The ID of the queued report
+        """
+        from app.services.report_service import ReportService
+
+        def start(report_id):
+            ReportQueueService._insert(report_id, report_type, filters, ReportService._cache_key(report_type, filters))
+
+        report_id, _ = ReportService.start_or_join(report_type, filters, start)
+        return report_id
+
+    @staticmethod
+    def _insert(report_id, report_type, filters, cache_key):
+        """Insert a queued report record."""
+        report = {
+            '_id': report_id,
+            'type': report_type,
+            'filters': filters,
+            'status': 'queued',
+            'progress': 0,
+            'attempts': 0,
+            'cancelRequested': False,
+            'cacheKey': cache_key,
+            'createdAt': datetime.utcnow(),
+            'updatedAt': datetime.utcnow()
+        }
+
+        mongo.db.reports.insert_one(report)
+
+    @staticmethod
+    def claim_next(worker_id, lease_seconds, max_attempts=3):
+        """
+        Atomically claim the oldest runnable report.
+
+        A report is runnable when it is queued, or when it is still marked as
+        processing but its lease has expired.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: Length of the lease in seconds
+            max_attempts: Number of claims after which a report is no longer retried
+
+        Returns:
+            The claimed report document or None if the queue is empty
+        """
+        now = datetime.utcnow()
+        return mongo.db.reports.find_one_and_update(
+            {
+                'cancelRequested': {'$ne': True},
+                'attempts': {'$lt': max_attempts},
+                '$or': [
+                    {'status': 'queued'},
+                    {'status': 'processing', 'leaseExpiresAt': {'$lt': now}}
+                ]
+            },
+            {
+                '$set': {
+                    'status': 'processing',
+                    'leaseOwner': worker_id,
+                    'leaseExpiresAt': now + timedelta(seconds=lease_seconds),
+                    'startedAt': now,
+                    'updatedAt': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('createdAt', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def fail_abandoned(max_attempts):
+        """
+        Move reports whose workers repeatedly died without finishing into error.
+
+        Args:
+            max_attempts: Number of claims after which a report is no longer retried
+
+        Returns:
+            Number of reports marked as failed
+        """
+        result = mongo.db.reports.update_many(
+            {
+                'status': 'processing',
+                'leaseExpiresAt': {'$lt': datetime.utcnow()},
+                'attempts': {'$gte': max_attempts}
+            },
+            {'$set': {
+                'status': 'error',
+                'errorMessage': 'Report worker stopped responding',
+                'updatedAt': datetime.utcnow()
+            }}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def cancel_abandoned():
+        """
+        Move reports cancelled while their worker died into cancelled.
+
+        Cancelled reports are never claimed again, so without this they would
+        stay processing once their lease expires.
+
+        Returns:
+            Number of reports marked as cancelled
+        """
+        result = mongo.db.reports.update_many(
+            {
+                'status': 'processing',
+                'leaseExpiresAt': {'$lt': datetime.utcnow()},
+                'cancelRequested': True
+            },
+            {'$set': {'status': 'cancelled', 'updatedAt': datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    @staticmethod
+    def release(report_id, worker_id, max_attempts, refund=False):
+        """
+        Put a claimed report back in the queue after its worker process was lost.
+
+        Args:
+            report_id: The ID of the report
+            worker_id: Identifier of the worker holding the lease
+            max_attempts: Number of claims after which a report is no longer retried
+            refund: Whether to give back the attempt charged by the claim (the
+                report never started)
+        """
+        object_id = to_object_id(report_id)
+        owned = {'_id': object_id, 'status': 'processing', 'leaseOwner': worker_id}
+        now = datetime.utcnow()
+
+        mongo.db.reports.update_one(
+            {**owned, 'cancelRequested': True},
+            {'$set': {'status': 'cancelled', 'updatedAt': now}}
+        )
+        update = {
+            '$set': {'status': 'queued', 'updatedAt': now},
+            '$unset': {'leaseOwner': '', 'leaseExpiresAt': ''}
+        }
+        if refund:
+            update['$inc'] = {'attempts': -1}
+            mongo.db.reports.update_one(owned, update)
+            return
+        mongo.db.reports.update_one({**owned, 'attempts': {'$lt': max_attempts}}, update)
+        mongo.db.reports.update_one(owned, {'$set': {
+            'status': 'error',
+            'errorMessage': 'Report worker stopped responding',
+            'updatedAt': now
+        }})
+
+    @classmethod
+    def _new_executor(cls, app):
+        """Create the process pool that runs report jobs."""
+        return ProcessPoolExecutor(
+            max_workers=app.config.get('REPORT_WORKER_PROCESSES', 2),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker_process
+        )
+
+    @classmethod
+    def _replace_executor(cls, app):
+        """Shut down a broken process pool and start a fresh one."""
+        with cls._lock:
+            broken, cls._executor = cls._executor, cls._new_executor(app)
+            cls._pool_broken = False
+        broken.shutdown(wait=False, cancel_futures=True)
+        print("Report worker pool was broken and has been replaced")
+
+    @staticmethod
+    def renew_lease(report_id, worker_id, lease_seconds):
+        """
+        Extend the lease on a report this worker is running.
+
+        Args:
+            report_id: The ID of the report
+            worker_id: Identifier of the worker holding the lease
+            lease_seconds: Length of the renewed lease in seconds
+
+        Returns:
+            True if the lease is still held by this worker, False otherwise
+        """
+        result = mongo.db.reports.update_one(
+            {'_id': to_object_id(report_id), 'status': 'processing', 'leaseOwner': worker_id},
+            {'$set': {'leaseExpiresAt': datetime.utcnow() + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count > 0
+
+    @staticmethod
+    def request_cancel(report_id):
+        """
+        Cancel a report.
+
+        Queued reports are cancelled immediately; running reports are flagged
+        and stop at their next checkpoint.
+
+        Args:
+            report_id: The ID of the report
+
+        Returns:
+            True if the report could be cancelled, False if it already finished or does not exist
+        """
+        object_id = to_object_id(report_id)
+        if not object_id:
+            return False
+
+        result = mongo.db.reports.update_one(
+            {'_id': object_id, 'status': 'queued'},
+            {'$set': {'status': 'cancelled', 'cancelRequested': True, 'updatedAt': datetime.utcnow()}}
+        )
+        if result.matched_count > 0:
+            return True
+
+        result = mongo.db.reports.update_one(
+            {'_id': object_id, 'status': 'processing'},
+            {'$set': {'cancelRequested': True, 'updatedAt': datetime.utcnow()}}
+        )
+        return result.matched_count > 0
+
+    @staticmethod
+    def is_cancel_requested(report_id):
+        """
+        Check whether cancellation was requested for a report.
+
+        Args:
+            report_id: The ID of the report
+
+        Returns:
+            True if the report should stop, False otherwise
+        """
+        report = mongo.db.reports.find_one(
+            {'_id': to_object_id(report_id)},
+            {'cancelRequested': 1}
+        )
+        return bool(report and report.get('cancelRequested'))
+
+    @classmethod
+    def start(cls, app):
+        """
+        Start the dispatcher thread and process pool for this app process.
+
+        Args:
+            app: The Flask application
+        """
+        with cls._lock:
+            if cls._dispatcher is not None:
+                return
+
+            with app.app_context():
+                mongo.db.reports.create_index([('status', 1), ('createdAt', 1)])
+
+            cls._worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            cls._executor = cls._new_executor(app)
+            cls._dispatcher = threading.Thread(
+                target=cls._dispatch_loop,
+                args=(app,),
+                name='report-queue-dispatcher',
+                daemon=True
+            )
+            cls._dispatcher.start()
+
+    @classmethod
+    def _dispatch_loop(cls, app):
+        """Claim queued reports and hand them to the process pool until the process exits."""
+        max_workers = app.config.get('REPORT_WORKER_PROCESSES', 2)
+        lease_seconds = app.config.get('REPORT_LEASE_SECONDS', 120)
+        poll_interval = app.config.get('REPORT_POLL_INTERVAL', 2)
+        max_attempts = app.config.get('REPORT_MAX_ATTEMPTS', 3)
+        cleanup_interval = app.config.get('REPORT_CLEANUP_INTERVAL', 3600)
+        last_cleanup = 0
+
+        with app.app_context():
+            while True:
+                try:
+                    # Expired report artifacts are removed by whichever node gets here first
+                    if cleanup_interval and time.time() - last_cleanup >= cleanup_interval:
+                        from app.services.report_service import ReportService
+                        ReportService.cleanup_expired_reports()
+                        last_cleanup = time.time()
+
+                    # Keep leases alive for jobs still running in the pool
+                    with cls._lock:
+                        running = list(cls._in_flight.keys())
+                    for report_id in running:
+                        cls.renew_lease(report_id, cls._worker_id, lease_seconds)
+                    cls.fail_abandoned(max_attempts)
+                    cls.cancel_abandoned()
+
+                    if cls._pool_broken:
+                        cls._replace_executor(app)
+
+                    while len(running) < max_workers:
+                        report = cls.claim_next(cls._worker_id, lease_seconds, max_attempts)
+                        if not report:
+                            break
+
+                        report_id = str(report['_id'])
+                        executor = cls._executor
+                        try:
+                            future = executor.submit(_run_report_job, report_id)
+                        except BrokenProcessPool:
+                            # The job never started, so it goes back without using up an attempt
+                            cls.release(report_id, cls._worker_id, max_attempts, refund=True)
+                            cls._replace_executor(app)
+                            break
+
+                        with cls._lock:
+                            cls._in_flight[report_id] = future
+                        future.add_done_callback(
+                            lambda f, report_id=report_id, executor=executor:
+                                cls._on_job_done(app, report_id, f, executor)
+                        )
+                        running.append(report_id)
+                except Exception as e:
+                    print(f"Error in report queue dispatcher: {str(e)}")
+
+                time.sleep(poll_interval)
+
+    @classmethod
+    def _on_job_done(cls, app, report_id, future, executor=None):
+        """Release a finished job and record crashes of the worker process."""
+        with cls._lock:
+            cls._in_flight.pop(report_id, None)
+
+        if future.cancelled():
+            # Shutting down a broken pool cancels the jobs it had not started
+            error = BrokenProcessPool('Report worker pool was shut down')
+        else:
+            error = future.exception()
+        if error is None:
+            return
+
+        if isinstance(error, BrokenProcessPool):
+            # A worker process died; the dispatcher replaces the pool and the job is retried
+            print(f"Report worker process died while running {report_id}")
+            with cls._lock:
+                if executor is cls._executor:
+                    cls._pool_broken = True
+            with app.app_context():
+                cls.release(report_id, cls._worker_id, app.config.get('REPORT_MAX_ATTEMPTS', 3))
+            return
+
+        print(f"Report worker failed for {report_id}: {str(error)}")
+        with app.app_context():
+            mongo.db.reports.update_one(
+                {'_id': to_object_id(report_id), 'leaseOwner': cls._worker_id},
+                {'$set': {
+                    'status': 'error',
+                    'errorMessage': str(error),
+                    'updatedAt': datetime.utcnow()
+                }}
+            )
+
@@ -0,0 +1,166 @@
+# app/services/report_scheduler_service.py
+from app import mongo
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import threading
+import socket
+import uuid
+import os
+import time
+
+from croniter import croniter
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+LEADER_LEASE = 'report-scheduler'
+
+
+def next_run_at(schedule, after, tz_name='UTC'):
+    """
+    Compute the next time a cron schedule fires.
+
+    Args:
+        schedule: Cron expression, evaluated in the scheduler's time zone
+        after: Naive UTC datetime after which to look
+        tz_name: Time zone the cron expression is written in
+
+    Returns:
+        Naive UTC datetime of the next run
+    """
+    tz = ZoneInfo(tz_name)
+    local = after.replace(tzinfo=timezone.utc).astimezone(tz)
+    upcoming = croniter(schedule, local).get_next(datetime)
+    return upcoming.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ReportSchedulerService:
+    """
+    Runs report templates that carry a cron ``schedule``.
+
+    The scheduler thread runs in the report worker (``flask run-report-worker``);
+    when several workers run, only the one holding the leader lease in
+    ``scheduler_leases`` looks for due templates. Each run is
+    additionally claimed by advancing the template's ``nextRunAt`` with a
+    compare-and-set, so a run happens once even while leadership changes hands.
+    """
+    _thread = None
+    _owner = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def acquire_leadership(owner, lease_seconds):
+        """
+        Take or renew the scheduler leader lease.
+
+        Args:
+            owner: Identifier of this scheduler
+            lease_seconds: Length of the lease in seconds
+
+        Returns:
+            True if this scheduler is the leader, False otherwise
+        """
+        now = datetime.utcnow()
+        try:
+            lease = mongo.db.scheduler_leases.find_one_and_update(
+                {
+                    '_id': LEADER_LEASE,
+                    '$or': [{'owner': owner}, {'leaseExpiresAt': {'$lt': now}}]
+                },
+                {'$set': {'owner': owner, 'leaseExpiresAt': now + timedelta(seconds=lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The lease exists and is held by another live scheduler
+            return False
+        return lease is not None and lease.get('owner') == owner
+
+    @staticmethod
+    def run_due_templates(tz_name='UTC', queue_enabled=True):
+        """
+        Start the reports of every template whose next run is due.
+
+        Args:
+            tz_name: Time zone the cron expressions are written in
+            queue_enabled: Whether reports go through the background queue
+
+        Returns:
+            Number of reports started
+        """
+        from app.services.report_service import ReportService
+        from app.services.report_queue_service import ReportQueueService
+
+        now = datetime.utcnow()
+        started = 0
+        due = mongo.db.report_templates.find(
+            {'schedule': {'$nin': [None, '']}, 'nextRunAt': {'$lte': now}},
+            {'schedule': 1, 'nextRunAt': 1, 'reportType': 1, 'filters': 1}
+        )
+
+        for template in due:
+            try:
+                # Claim this run by moving nextRunAt forward; losing the race means it already ran
+                claimed = mongo.db.report_templates.find_one_and_update(
+                    {'_id': template['_id'], 'nextRunAt': template['nextRunAt']},
+                    {'$set': {
+                        'nextRunAt': next_run_at(template['schedule'], now, tz_name),
+                        'lastRunAt': now
+                    }}
+                )
+                if not claimed:
+                    continue
+
+                if queue_enabled:
+                    report_id = ReportQueueService.enqueue(template['reportType'], template['filters'])
+                else:
+                    report_id = ReportService.generate_report(template['reportType'], template['filters'])
+
+                mongo.db.report_templates.update_one(
+                    {'_id': template['_id']},
+                    {'$set': {'lastReportId': report_id}}
+                )
+                started += 1
+            except Exception as e:
+                print(f"Error running scheduled template {template['_id']}: {str(e)}")
+
+        return started
+
+    @classmethod
+    def start(cls, app):
+        """
+        Start the scheduler thread for this app process.
+
+        Args:
+            app: The Flask application
+        """
+        with cls._lock:
+            if cls._thread is not None:
+                return
+
+            cls._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            cls._thread = threading.Thread(
+                target=cls._run_loop,
+                args=(app,),
+                name='report-scheduler',
+                daemon=True
+            )
+            cls._thread.start()
+
+    @classmethod
+    def _run_loop(cls, app):
+        """Run due templates while holding the leader lease, until the process exits."""
+        interval = app.config.get('REPORT_SCHEDULER_INTERVAL', 60)
+        tz_name = app.config.get('REPORT_SCHEDULER_TIMEZONE', 'UTC')
+        queue_enabled = app.config.get('REPORT_QUEUE_ENABLED', False)
+
+        with app.app_context():
+            while True:
+                try:
+                    # The lease outlives a few missed ticks before another process takes over
+                    if cls.acquire_leadership(cls._owner, interval * 3):
+                        cls.run_due_templates(tz_name, queue_enabled)
+                except Exception as e:
+                    print(f"Error in report scheduler: {str(e)}")
+
+                time.sleep(interval)
@@ -1,13 +1,53 @@
 from app.services.database import to_object_id, serialize_id
 from app import mongo
+from app.services.cycle_stats_service import CycleStatsService, SELECTED_STATUSES, stats_key
+from app.utils.blob_store import get_report_store
 from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from openpyxl import Workbook
+import numpy as np
+import csv
+import gzip
+import io
+import tempfile
 import os
 import uuid
 from flask import current_app
+from datetime import timedelta
+import hashlib
 import json
 import logging
+import time
+
+# Reports whose rows for different branches never overlap, so they can be generated per branch
+BRANCH_PARTITIONED_REPORTS = ['placement_summary', 'student_placement_status', 'branch_wise_statistics']
+
+
+def _merge_partials(target, partial):
+    """
+    Merge one partition's raw aggregates into ``target``, key by key.
+    
+    Counts and sums are added, ``highest*`` and ``lowest*`` fields keep the
+    extreme value, and sets and lists of IDs or rows are combined.
+    """
+    for key, fields in partial.items():
+        merged = target.setdefault(key, {})
+        for field, value in fields.items():
+            if field not in merged:
+                merged[field] = value.copy() if isinstance(value, (set, list)) else value
+            elif isinstance(value, set):
+                merged[field] |= value
+            elif isinstance(value, list):
+                merged[field].extend(value)
+            elif field.startswith('highest'):
+                merged[field] = max(merged[field], value)
+            elif field.startswith('lowest'):
+                merged[field] = min(merged[field], value)
+            else:
+                merged[field] += value
+
 
 class ReportService:
     @staticmethod
@@ -56,6 +96,9 @@ class ReportService:
         """
         Generate a report based on type and filters.
         
+        Concurrent calls for the same type and filters share one generation:
+        only the first runs it, the others wait for it and get the same ID.
+        
         Args:
             report_type: Type of report to generate
             filters: Dictionary of filter criteria
@@ -63,59 +106,226 @@ class ReportService:
         Returns:
             The ID of the generated report
         """
-        # Create report record
-        report = {
-            'type': report_type,
-            'filters': filters,
-            'status': 'processing',
-            'createdAt': datetime.utcnow(),
-            'updatedAt': datetime.utcnow()
-        }
+        # Reuse a fresh result for the same report and filters
+        cached_id = ReportService.find_cached_report(report_type, filters)
+        if cached_id:
+            return cached_id
         
-        result = mongo.db.reports.insert_one(report)
-        report_id = str(result.inserted_id)
+        def start(report_id):
+            # Create report record
+            report = {
+                '_id': report_id,
+                'type': report_type,
+                'filters': filters,
+                'status': 'processing',
+                'progress': 0,
+                'cacheKey': ReportService._cache_key(report_type, filters),
+                'createdAt': datetime.utcnow(),
+                'updatedAt': datetime.utcnow()
+            }
+            mongo.db.reports.insert_one(report)
         
-        try:
-            # Generate report data based on type
-            if report_type == 'placement_summary':
-                data = ReportService._generate_placement_summary(filters)
-            elif report_type == 'student_placement_status':
-                data = ReportService._generate_student_placement_status(filters)
-            elif report_type == 'company_wise_recruitment':
-                data = ReportService._generate_company_wise_recruitment(filters)
-            elif report_type == 'branch_wise_statistics':
-                data = ReportService._generate_branch_wise_statistics(filters)
-            elif report_type == 'ctc_analysis':
-                data = ReportService._generate_ctc_analysis(filters)
-            elif report_type == 'job_applicants':
-                data = ReportService._generate_job_applicants(filters)
+        report_id, started = ReportService.start_or_join(report_type, filters, start)
+        if started:
+            ReportService.run_report(report_id)
+        else:
+            ReportService._wait_for_report(report_id)
+        return report_id
+    
+    @staticmethod
+    def start_or_join(report_type, filters, start):
+        """
+        Start a report generation, or join one already running for the same type and filters.
+        
+        A lease document in ``report_flights``, keyed by the report's cache
+        key, names the report currently being generated. Inserting it is the
+        single point of coordination between app processes: whoever inserts
+        (or takes over an expired or finished lease) creates the report,
+        everyone else gets its ID.
+        
+        Args:
+            report_type: Type of report
+            filters: Dictionary of filter criteria
+            start: Callable creating the report record with the given ObjectId
+            
+        Returns:
+            Tuple of (report ID, True if this call created the report)
+        """
+        key = ReportService._cache_key(report_type, filters)
+        lease_seconds = current_app.config.get('REPORT_FLIGHT_LEASE_SECONDS', 1800)
+        
+        for _ in range(5):
+            report_id = ObjectId()
+            lease = {
+                'reportId': str(report_id),
+                'leaseExpiresAt': datetime.utcnow() + timedelta(seconds=lease_seconds)
+            }
+            
+            try:
+                mongo.db.report_flights.insert_one({'_id': key, **lease})
+            except DuplicateKeyError:
+                pass
             else:
+                ReportService._start_flight(report_id, start)
+                return str(report_id), True
+            
+            flight = mongo.db.report_flights.find_one({'_id': key})
+            if not flight:
+                continue
+            
+            if flight['leaseExpiresAt'] > datetime.utcnow():
+                in_flight = ReportService._wait_for_record(flight['reportId'])
+                if in_flight and in_flight.get('status') in ('queued', 'processing'):
+                    return flight['reportId'], False
+            
+            # The previous generation finished or its owner died: take the lease over
+            taken = mongo.db.report_flights.find_one_and_update(
+                {'_id': key, 'reportId': flight['reportId']},
+                {'$set': lease}
+            )
+            if taken:
+                ReportService._start_flight(report_id, start)
+                return str(report_id), True
+        
+        raise RuntimeError("Could not start or join report generation")
+    
+    @staticmethod
+    def _start_flight(report_id, start):
+        """Create the report for a lease just acquired, releasing the lease if that fails."""
+        try:
+            start(report_id)
+        except Exception:
+            ReportService._end_flight(report_id)
+            raise
+    
+    @staticmethod
+    def _end_flight(report_id):
+        """Release the generation lease held by a report."""
+        mongo.db.report_flights.delete_one({'reportId': str(report_id)})
+    
+    @staticmethod
+    def _wait_for_record(report_id, timeout=2):
+        """
+        Get a report record, waiting briefly if its creator has not inserted it yet.
+        
+        Args:
+            report_id: The ID of the report
+            timeout: Seconds to wait for the record to appear
+            
+        Returns:
+            The report document, or None if it did not appear in time
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            report = mongo.db.reports.find_one({'_id': to_object_id(report_id)}, {'status': 1})
+            if report or time.monotonic() >= deadline:
+                return report
+            time.sleep(0.05)
+    
+    @staticmethod
+    def _wait_for_report(report_id):
+        """
+        Wait for a report generated by another process to finish.
+        
+        Args:
+            report_id: The ID of the report
+        """
+        deadline = time.monotonic() + current_app.config.get('REPORT_FLIGHT_WAIT_SECONDS', 300)
+        while time.monotonic() < deadline:
+            report = mongo.db.reports.find_one({'_id': to_object_id(report_id)}, {'status': 1})
+            if report and report.get('status') not in ('queued', 'processing'):
+                return
+            time.sleep(0.5)
+    
+    @staticmethod
+    def run_report(report_id, should_cancel=None):
+        """
+        Build the data for an existing report record and store the result.
+        
+        Args:
+            report_id: The ID of the report record to fill in
+            should_cancel: Optional callable returning True when the run should stop
+            
+        Returns:
+            The final status of the report
+        """
+        try:
+            return ReportService._run_report(report_id, should_cancel)
+        finally:
+            ReportService._end_flight(report_id)
+    
+    @staticmethod
+    def _run_report(report_id, should_cancel=None):
+        """Generate and store a report; see run_report."""
+        report = mongo.db.reports.find_one({'_id': to_object_id(report_id)})
+        if not report:
+            return None
+        
+        report_type = report.get('type')
+        filters = report.get('filters') or {}
+        
+        try:
+            generators = {
+                'placement_summary': ReportService._generate_placement_summary,
+                'student_placement_status': ReportService._generate_student_placement_status,
+                'company_wise_recruitment': ReportService._generate_company_wise_recruitment,
+                'branch_wise_statistics': ReportService._generate_branch_wise_statistics,
+                'ctc_analysis': ReportService._generate_ctc_analysis,
+                'job_applicants': ReportService._generate_job_applicants
+            }
+            
+            if report_type not in generators:
                 # Update report status to error
                 mongo.db.reports.update_one(
                     {'_id': to_object_id(report_id)},
                     {'$set': {'status': 'error', 'errorMessage': 'Invalid report type', 'updatedAt': datetime.utcnow()}}
                 )
-                return report_id
+                return 'error'
             
-            # Save report data
-            reports_dir = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), 'reports')
-            os.makedirs(reports_dir, exist_ok=True)
-            report_data_path = os.path.join(reports_dir, f"{report_id}.json")
+            if should_cancel and should_cancel():
+                ReportService._mark_cancelled(report_id)
+                return 'cancelled'
+            
+            # Snapshot the data watermark before reading, so writes made while
+            # the report runs leave it stale
+            watermark = ReportService._data_watermark(filters)
+            
+            ReportService.set_progress(report_id, 10)
+            data = ReportService._run_partitions(
+                report_id, report_type, generators[report_type], filters, should_cancel
+            )
             
-            with open(report_data_path, 'w') as f:
-                json.dump(data, f)
+            if data is None or (should_cancel and should_cancel()):
+                ReportService._mark_cancelled(report_id)
+                return 'cancelled'
+            
+            ReportService.set_progress(report_id, 80)
+            
+            # Save report data
+            data_key = f"reports/{report_id}"
+            manifest = ReportService._write_report_data(
+                data_key,
+                data,
+                chunk_rows=current_app.config.get('REPORT_CHUNK_ROWS', 1000)
+            )
             
             # Update report status to completed
             mongo.db.reports.update_one(
                 {'_id': to_object_id(report_id)},
                 {'$set': {
                     'status': 'completed',
-                    'dataPath': report_data_path,
+                    'progress': 100,
+                    'dataKey': data_key,
+                    'rowCount': manifest['rowCount'],
+                    'expiresAt': datetime.utcnow() + timedelta(seconds=current_app.config.get('REPORT_ARTIFACT_TTL', 7 * 24 * 3600)),
+                    'columns': manifest['columns'],
+                    'cacheKey': ReportService._cache_key(report_type, filters),
+                    'watermark': watermark,
                     'updatedAt': datetime.utcnow()
                 }}
             )
             
-            return report_id
+            return 'completed'
             
         except Exception as e:
             # Update report status to error
@@ -128,13 +338,297 @@ class ReportService:
                 }}
             )
             print(f"Error generating report: {str(e)}")
-            return report_id
+            return 'error'
+    
+    @staticmethod
+    def _partition_filters(report_type, filters):
+        """
+        Split a report's filters into independent partitions.
+        
+        Reports over several cycles (``cycleIds``) get one partition per
+        cycle. Row-level reports over several branches are further split per
+        branch, since each branch's rows are disjoint.
+        
+        Args:
+            report_type: Type of report
+            filters: Dictionary of filter criteria
+            
+        Returns:
+            List of filter dictionaries, one per partition
+        """
+        cycle_ids = filters.get('cycleIds') or ([filters['cycleId']] if filters.get('cycleId') else [None])
+        branches = filters.get('branches') or []
+        split_branches = report_type in BRANCH_PARTITIONED_REPORTS and len(branches) > 1
+        
+        partitions = []
+        for cycle_id in cycle_ids:
+            for branch_group in ([[branch] for branch in branches] if split_branches else [branches]):
+                partition = {key: value for key, value in filters.items() if key != 'cycleIds'}
+                if cycle_id:
+                    partition['cycleId'] = cycle_id
+                if branch_group:
+                    partition['branches'] = branch_group
+                partitions.append(partition)
+        return partitions
+    
+    @staticmethod
+    def _run_partitions(report_id, report_type, generator, filters, should_cancel=None):
+        """
+        Run a report generator over each partition of its filters and merge the rows.
+        
+        Partitions run concurrently in a thread pool, since generation mostly
+        waits on MongoDB. Aggregate reports produce raw sums and counts per
+        partition, which are merged by key before the final rows (averages,
+        percentages) are derived. Row-level reports are concatenated in
+        partition order and read lazily, so cursors returned by generators
+        are streamed to storage; when they cover several cycles each row is
+        tagged with its cycle. A failing partition fails the whole report.
+        
+        Args:
+            report_id: The ID of the report, for progress updates
+            report_type: Type of report
+            generator: Report generator taking a filters dictionary
+            filters: Dictionary of filter criteria
+            should_cancel: Optional callable returning True when the run should stop
+            
+        Returns:
+            Iterable of report rows, or None if the run was cancelled
+        """
+        partitions = ReportService._partition_filters(report_type, filters)
+        if len(partitions) == 1:
+            return generator(partitions[0])
+        
+        # Aggregate reports: (partial aggregates of one partition, rows from merged aggregates)
+        aggregate = {
+            'company_wise_recruitment': (ReportService._company_wise_partials, ReportService._company_wise_rows),
+            'branch_wise_statistics': (ReportService._branch_wise_partials, ReportService._branch_wise_rows),
+            'ctc_analysis': (ReportService._ctc_partials, ReportService._ctc_rows)
+        }.get(report_type)
+        partition_generator = aggregate[0] if aggregate else generator
+        
+        app = current_app._get_current_object()
+        
+        def run(partition):
+            with app.app_context():
+                return partition_generator(partition)
+        
+        results = [None] * len(partitions)
+        max_workers = min(current_app.config.get('REPORT_FANOUT_THREADS', 4), len(partitions))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-partition') as executor:
+            futures = {executor.submit(run, partition): index for index, partition in enumerate(partitions)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if should_cancel and should_cancel():
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                ReportService.set_progress(report_id, 10 + int(70 * done / len(partitions)))
+        
+        if aggregate:
+            merged = {}
+            for partial in results:
+                _merge_partials(merged, partial)
+            return aggregate[1](merged)
+        
+        tag_cycle = len(filters.get('cycleIds') or []) > 1
+        
+        def data():
+            for partition, rows in zip(partitions, results):
+                for row in rows:
+                    yield {'cycleId': partition['cycleId'], **row} if tag_cycle else row
+        
+        return data()
+    
+    @staticmethod
+    def find_cached_report(report_type, filters):
+        """
+        Find a completed report for the same type and filters whose source
+        data has not changed since it was generated.
+        
+        Args:
+            report_type: Type of report
+            filters: Dictionary of filter criteria
+            
+        Returns:
+            The ID of the cached report or None if there is no fresh result
+        """
+        try:
+            max_age = current_app.config.get('REPORT_CACHE_MAX_AGE', 6 * 3600)
+            if not max_age:
+                return None
+            
+            report = mongo.db.reports.find_one(
+                {
+                    'cacheKey': ReportService._cache_key(report_type, filters),
+                    'status': 'completed',
+                    'dataKey': {'$exists': True},
+                    'createdAt': {'$gte': datetime.utcnow() - timedelta(seconds=max_age)}
+                },
+                {'watermark': 1},
+                sort=[('createdAt', -1)]
+            )
+            if not report:
+                return None
+            
+            if report.get('watermark') != ReportService._data_watermark(filters):
+                return None
+            
+            return str(report['_id'])
+        except Exception as e:
+            print(f"Error looking up cached report: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _canonical_filters(filters):
+        """
+        Normalize filters so equivalent requests produce the same cache key.
+        
+        Empty values are dropped, list values are sorted and scalars are
+        compared as strings.
+        
+        Args:
+            filters: Dictionary of filter criteria
+            
+        Returns:
+            Normalized dictionary of filters
+        """
+        canonical = {}
+        for key, value in (filters or {}).items():
+            if value is None or value == '' or value == [] or value == {}:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                value = sorted(str(item) for item in value)
+            elif isinstance(value, dict):
+                value = ReportService._canonical_filters(value)
+            else:
+                value = str(value)
+            canonical[key] = value
+        return canonical
+    
+    @staticmethod
+    def _cache_key(report_type, filters):
+        """
+        Hash a report type and its canonical filters.
+        
+        Args:
+            report_type: Type of report
+            filters: Dictionary of filter criteria
+            
+        Returns:
+            Hex digest identifying the report request
+        """
+        payload = json.dumps(
+            [report_type, ReportService._canonical_filters(filters)],
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _data_watermark(filters):
+        """
+        Capture the latest modification times of the data a report reads.
+        
+        Covers jobs in the report's cycle (or the single job for job_applicants),
+        their applications and the profiles of the students in the batch and
+        programs of those jobs' cycles, so profile edits elsewhere leave the
+        cached report fresh. Job deletions are caught by the job count.
+        
+        Args:
+            filters: Dictionary of filter criteria
+            
+        Returns:
+            Dictionary describing the current state of the source data
+        """
+        if filters.get('jobId'):
+            job_query = {'_id': to_object_id(filters['jobId'])}
+        elif filters.get('cycleIds'):
+            job_query = {'cycleId': {'$in': filters['cycleIds']}}
+        else:
+            job_query = {'cycleId': filters.get('cycleId')}
+        
+        jobs = list(mongo.db.jobs.find(job_query, {'_id': 1, 'cycleId': 1}))
+        job_ids = [job['_id'] for job in jobs]
+        cycle_ids = {to_object_id(job['cycleId']) for job in jobs if ObjectId.is_valid(job.get('cycleId'))}
+        cohorts = [
+            {'batch': cycle['batch'], 'program': {'$in': cycle.get('eligiblePrograms', [])}}
+            for cycle in mongo.db.placement_cycles.find(
+                {'_id': {'$in': list(cycle_ids)}},
+                {'batch': 1, 'eligiblePrograms': 1}
+            )
+            if cycle.get('batch')
+        ]
+        
+        latest_job = mongo.db.jobs.find_one(job_query, {'updatedAt': 1}, sort=[('updatedAt', -1)])
+        latest_application = mongo.db.applications.find_one(
+            {'job_id': {'$in': job_ids}},
+            {'updated_at': 1},
+            sort=[('updated_at', -1)]
+        ) if job_ids else None
+        latest_student = mongo.db.student.find_one(
+            {'$or': cohorts},
+            {'updated_at': 1},
+            sort=[('updated_at', -1)]
+        ) if cohorts else None
+        
+        return {
+            'jobs': len(job_ids),
+            'jobsUpdatedAt': latest_job.get('updatedAt') if latest_job else None,
+            'applicationsUpdatedAt': latest_application.get('updated_at') if latest_application else None,
+            'studentsUpdatedAt': latest_student.get('updated_at') if latest_student else None
+        }
+    
+    @staticmethod
+    def ensure_indexes():
+        """Create the indexes used by report generation and the report cache."""
+        mongo.db.reports.create_index([('cacheKey', 1), ('createdAt', -1)])
+        mongo.db.reports.create_index([('status', 1), ('expiresAt', 1)])
+        mongo.db.report_flights.create_index('reportId')
+        mongo.db.report_templates.create_index('nextRunAt', sparse=True)
+        mongo.db.report_flights.create_index('leaseExpiresAt', expireAfterSeconds=0)
+        mongo.db.jobs.create_index([('cycleId', 1), ('updatedAt', -1)])
+        mongo.db.jobs.create_index([('cycleId', 1), ('packageValue', 1)])
+        mongo.db.applications.create_index([('job_id', 1), ('updated_at', -1)])
+        mongo.db.student.create_index([('updated_at', -1)])
+        mongo.db.student.create_index('user_id')
+        mongo.db.resumes.create_index([('student_id', 1), ('created_at', -1)])
+        CycleStatsService.ensure_indexes()
+    
+    @staticmethod
+    def set_progress(report_id, progress):
+        """
+        Record the completion percentage of a running report.
+        
+        Args:
+            report_id: The ID of the report
+            progress: Percentage between 0 and 100
+        """
+        mongo.db.reports.update_one(
+            {'_id': to_object_id(report_id)},
+            {'$set': {'progress': progress, 'updatedAt': datetime.utcnow()}}
+        )
+    
+    @staticmethod
+    def _mark_cancelled(report_id):
+        """
+        Mark a report as cancelled.
+        
+        Args:
+            report_id: The ID of the report
+        """
+        mongo.db.reports.update_one(
+            {'_id': to_object_id(report_id)},
+            {'$set': {'status': 'cancelled', 'updatedAt': datetime.utcnow()},
+             '$unset': {'leaseOwner': '', 'leaseExpiresAt': ''}}
+        )
     
     @staticmethod
     def get_report_by_id(report_id):
         """
         Get a report by ID.
         
+        Rows are inlined only for small reports; larger ones are read a page
+        at a time through get_report_rows.
+        
         Args:
             report_id: The ID of the report
             
@@ -144,55 +638,76 @@ class ReportService:
         try:
             report = mongo.db.reports.find_one({'_id': to_object_id(report_id)})
             
-            if report and report.get('status') == 'completed' and report.get('dataPath'):
-                # Load report data
-                with open(report['dataPath'], 'r') as f:
-                    report['data'] = json.load(f)
+            if report and report.get('status') == 'completed' and report.get('dataKey'):
+                row_count = report.get('rowCount', 0)
+                if row_count <= current_app.config.get('REPORT_INLINE_ROWS', 1000):
+                    # Load report data
+                    report['data'] = list(ReportService.iter_report_rows(report['dataKey']))
             
             return serialize_id(report) if report else None
         except Exception as e:
             print(f"Error retrieving report: {str(e)}")
             return None
     
+    @staticmethod
+    def _get_completed_report(report_id):
+        """Get a completed report whose data is still stored, or None."""
+        report = mongo.db.reports.find_one({'_id': to_object_id(report_id)})
+        if not report or report.get('status') != 'completed' or not report.get('dataKey'):
+            return None
+        return report
+    
     @staticmethod
     def get_report_file(report_id, format_type='excel'):
         """
         Get a report file in the specified format.
         
+        Exports are rendered once and kept in the report store next to the
+        report data. Rows are read from the stored report one chunk at a
+        time, so memory use does not grow with the size of the report.
+        
         Args:
             report_id: The ID of the report
             format_type: The format to generate ('excel' or 'pdf')
             
         Returns:
-            The path to the generated file or None if report not found
+            The name of the export in the report store, or None if report not found
         """
         try:
             # Get report document
-            report = mongo.db.reports.find_one({'_id': to_object_id(report_id)})
-            if not report or report.get('status') != 'completed' or not report.get('dataPath'):
+            report = ReportService._get_completed_report(report_id)
+            if not report:
                 return None
             
-            # Load report data
-            with open(report['dataPath'], 'r') as f:
-                data = json.load(f)
-            
-            # Convert data to DataFrame
-            df = pd.DataFrame(data)
-            
-            # Generate file path
-            exports_dir = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), 'reports', 'exports')
-            os.makedirs(exports_dir, exist_ok=True)
+            data_key = report['dataKey']
             
             if format_type == 'excel':
-                file_path = os.path.join(exports_dir, f"{report_id}.xlsx")
-                df.to_excel(file_path, index=False)
-                return file_path
+                export_key = f"{data_key}/export.xlsx"
+                if ReportService._is_export_current(data_key, export_key):
+                    return export_key
+                
+                columns = ReportService._report_columns(data_key)
+                
+                # Write-only workbooks flush rows to disk as they are appended
+                workbook = Workbook(write_only=True)
+                sheet = workbook.create_sheet()
+                sheet.append(columns)
+                for row in ReportService.iter_report_rows(data_key):
+                    sheet.append([ReportService._cell_value(row.get(column)) for column in columns])
+                
+                with tempfile.TemporaryFile() as f:
+                    workbook.save(f)
+                    f.seek(0)
+                    get_report_store().put(export_key, f)
+                return export_key
             elif format_type == 'pdf':
-                # For PDF generation, we'd typically use a library like reportlab
-                # or export to HTML and use wkhtmltopdf, but for simplicity:
-                file_path = os.path.join(exports_dir, f"{report_id}.csv")
-                df.to_csv(file_path, index=False)
-                return file_path
+                from app.services.report_pdf_service import ReportPdfService
+                return ReportPdfService.get_pdf(
+                    data_key,
+                    ReportService._report_title(report),
+                    max_workers=current_app.config.get('REPORT_PDF_PROCESSES', 2),
+                    timeout=current_app.config.get('REPORT_PDF_TIMEOUT', 300)
+                )
             else:
                 return None
         except Exception as e:
@@ -200,289 +715,665 @@ class ReportService:
             return None
     
     @staticmethod
-    def get_report_templates():
+    def _is_export_current(data_key, export_key):
         """
-        Get all report templates.
+        Check whether a rendered export exists and is newer than the report data.
         
+        Args:
+            data_key: Store prefix of the report data
+            export_key: Name of the export in the report store
+            
         Returns:
-            List of report template documents
+            True if the export can be served as is
         """
-        templates = list(mongo.db.report_templates.find())
-        return [serialize_id(template) for template in templates]
+        store = get_report_store()
+        export = store.stat(export_key)
+        manifest = store.stat(f"{data_key}/manifest.json")
+        return bool(export and manifest and export['modified'] >= manifest['modified'])
     
     @staticmethod
-    def get_template_by_id(template_id):
+    def _report_title(report):
         """
-        Get a report template by ID.
+        Build the title printed on exported report files.
         
         Args:
-            template_id: The ID of the template
+            report: The report document
             
         Returns:
-            The template document or None if not found
+            Title string
         """
-        try:
-            template = mongo.db.report_templates.find_one({'_id': to_object_id(template_id)})
-            return serialize_id(template) if template else None
-        except Exception:
-            return None
+        report_type = report.get('type', 'report')
+        title = report_type.replace('_', ' ').title()
+        created_at = report.get('createdAt')
+        if isinstance(created_at, datetime):
+            title += f" ({created_at.strftime('%Y-%m-%d')})"
+        return title
     
     @staticmethod
-    def create_template(data):
+    def stream_report_csv(report_id):
         """
-        Create a new report template.
+        Stream a report as CSV.
         
         Args:
-            data: Dictionary containing template data
+            report_id: The ID of the report
             
         Returns:
-            The ID of the newly created template
+            A generator of CSV text chunks, or None if the report is not available
         """
-        template = {
-            'name': data['name'],
-            'description': data.get('description', ''),
-            'columns': data['columns'],
-            'createdAt': datetime.utcnow(),
-            'updatedAt': datetime.utcnow()
-        }
-        
-        if 'createdBy' in data:
-            template['createdBy'] = data['createdBy']
+        report = ReportService._get_completed_report(report_id)
+        if not report:
+            return None
         
-        result = mongo.db.report_templates.insert_one(template)
-        return str(result.inserted_id)
+        data_key = report['dataKey']
+        return ReportService._csv_chunks(data_key, ReportService._report_columns(data_key))
     
     @staticmethod
-    def update_template(template_id, data):
+    def get_report_rows(report_id, offset=0, limit=100, sort=None, descending=False):
         """
-        Update a report template.
+        Read one page of a report's rows.
         
         Args:
-            template_id: The ID of the template to update
-            data: Dictionary containing updated template data
+            report_id: The ID of the report
+            offset: Index of the first row to return
+            limit: Maximum number of rows to return
+            sort: Optional column to order rows by
+            descending: Whether to sort in descending order
             
         Returns:
-            True if update was successful, False otherwise
-        """
-        try:
-            update_data = {
-                'name': data['name'],
-                'description': data.get('description', ''),
-                'columns': data['columns'],
-                'updatedAt': datetime.utcnow()
-            }
+            Dictionary with the rows and paging details, or None if the report is not available
             
-            result = mongo.db.report_templates.update_one(
-                {'_id': to_object_id(template_id)},
-                {'$set': update_data}
-            )
-            return result.modified_count > 0
-        except Exception as e:
-            print(f"Error updating template: {str(e)}")
-            return False
+        Raises:
+            ValueError: If the sort column is not part of the report
+        """
+        report = ReportService._get_completed_report(report_id)
+        if not report:
+            return None
+        
+        data_key = report['dataKey']
+        columns = ReportService._report_columns(data_key)
+        if sort and sort not in columns:
+            raise ValueError(f"Unknown sort column: {sort}")
+        
+        rows, total = ReportService.read_report_rows(data_key, offset, limit, sort, descending)
+        return {
+            'rows': rows,
+            'columns': columns,
+            'offset': offset,
+            'limit': limit,
+            'total': total
+        }
     
     @staticmethod
-    def delete_template(template_id):
+    def _write_report_data(data_key, rows, chunk_rows=1000):
         """
-        Delete a report template.
+        Store report rows as gzip-compressed NDJSON chunks.
+        
+        The report store holds numbered chunks of ``chunk_rows`` rows each
+        under ``data_key``, followed by a manifest. A page of rows can then be
+        read by decompressing only the chunks it falls in, and readers never
+        see a report whose manifest is missing.
         
         Args:
-            template_id: The ID of the template to delete
+            data_key: Store prefix for the report data
+            rows: Iterable of report rows
+            chunk_rows: Number of rows per chunk
             
         Returns:
-            True if deletion was successful, False otherwise
+            The manifest describing the stored report
         """
-        try:
-            result = mongo.db.report_templates.delete_one({'_id': to_object_id(template_id)})
-            return result.deleted_count > 0
-        except Exception as e:
-            print(f"Error deleting template: {str(e)}")
-            return False
+        store = get_report_store()
+        store.delete_prefix(f"{data_key}/")
+        
+        def flush(index, lines):
+            store.put(f"{data_key}/{ReportService._chunk_name(index)}", gzip.compress(''.join(lines).encode('utf-8')))
+        
+        columns = {}
+        row_count = 0
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(row, default=str) + '\n')
+            for key in row:
+                columns.setdefault(key, None)
+            row_count += 1
+            if len(lines) == chunk_rows:
+                flush(row_count // chunk_rows - 1, lines)
+                lines = []
+        if lines:
+            flush(row_count // chunk_rows, lines)
+        
+        manifest = {
+            'format': 'ndjson.gz',
+            'rowCount': row_count,
+            'chunkRows': chunk_rows,
+            'chunks': -(-row_count // chunk_rows),
+            'columns': list(columns)
+        }
+        store.put(f"{data_key}/manifest.json", json.dumps(manifest).encode('utf-8'))
+        return manifest
+    
+    @staticmethod
+    def _chunk_name(index):
+        """File name of a report data chunk."""
+        return f"part-{index:05d}.ndjson.gz"
+    
+    @staticmethod
+    def _read_blob(name):
+        """Read a whole blob from the report store."""
+        blob = get_report_store().open(name)
+        if blob is None:
+            raise FileNotFoundError(f"Report artifact not found: {name}")
+        try:
+            return blob.read()
+        finally:
+            blob.close()
+    
+    @staticmethod
+    def _read_manifest(data_key):
+        """Read the manifest of a stored report."""
+        return json.loads(ReportService._read_blob(f"{data_key}/manifest.json"))
+    
+    @staticmethod
+    def _read_chunk(data_key, index):
+        """Read all rows of one report data chunk."""
+        text = gzip.decompress(ReportService._read_blob(f"{data_key}/{ReportService._chunk_name(index)}"))
+        return [json.loads(line) for line in text.decode('utf-8').splitlines() if line.strip()]
+    
+    @staticmethod
+    def iter_report_rows(data_key):
+        """
+        Read report rows one chunk at a time from a stored report.
+        
+        Args:
+            data_key: Store prefix of the report data
             
+        Yields:
+            Report rows as dictionaries
+        """
+        manifest = ReportService._read_manifest(data_key)
+        for index in range(manifest['chunks']):
+            for row in ReportService._read_chunk(data_key, index):
+                yield row
+    
     @staticmethod
-    def _generate_placement_summary(filters):
+    def read_report_rows(data_key, offset=0, limit=100, sort=None, descending=False):
         """
-        Generate a placement summary report.
+        Read a slice of a stored report, optionally ordered by a column.
+        
+        Unsorted pages decompress only the chunks covering the slice. Sorted
+        pages use a row order computed once per column and kept next to the
+        report data.
         
         Args:
-            filters: Dictionary containing filter criteria
+            data_key: Store prefix of the report data
+            offset: Index of the first row to return
+            limit: Maximum number of rows to return
+            sort: Optional column to order rows by
+            descending: Whether to sort in descending order
             
         Returns:
-            List of report data items
+            Tuple of (rows, total row count)
+        """
+        manifest = ReportService._read_manifest(data_key)
+        total = manifest['rowCount']
+        chunk_rows = manifest['chunkRows']
+        
+        if not sort:
+            rows = []
+            first, last = offset // chunk_rows, (min(offset + limit, total) - 1) // chunk_rows
+            for index in range(first, last + 1):
+                rows.extend(ReportService._read_chunk(data_key, index))
+            start = offset - first * chunk_rows
+            return rows[start:start + limit], total
+        
+        order, empty = ReportService._sort_order(data_key, sort)
+        if descending:
+            # Rows without a value stay at the end in both directions
+            order = np.concatenate([order[:len(order) - empty][::-1], order[len(order) - empty:]])
+        
+        chunks = {}
+        rows = []
+        for row_index in order[offset:offset + limit]:
+            index = int(row_index) // chunk_rows
+            if index not in chunks:
+                chunks[index] = ReportService._read_chunk(data_key, index)
+            rows.append(chunks[index][int(row_index) % chunk_rows])
+        return rows, total
+    
+    @staticmethod
+    def _sort_order(data_key, column):
+        """
+        Get the ascending row order of a stored report for one column.
+        
+        Args:
+            data_key: Store prefix of the report data
+            column: Column to order by
+            
+        Returns:
+            Tuple of (NumPy array of row indices, number of trailing rows without a value)
+        """
+        store = get_report_store()
+        order_key = f"{data_key}/sort-{hashlib.sha1(column.encode('utf-8')).hexdigest()[:12]}.npz"
+        
+        blob = store.open(order_key)
+        if blob is not None:
+            try:
+                with np.load(io.BytesIO(blob.read())) as stored:
+                    return stored['order'], int(stored['empty'])
+            finally:
+                blob.close()
+        
+        keys = [ReportService._sort_key(row.get(column)) for row in ReportService.iter_report_rows(data_key)]
+        order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+        empty = sum(1 for key in keys if key[0] == 2)
+        
+        buffer = io.BytesIO()
+        np.savez(buffer, order=order, empty=empty)
+        store.put(order_key, buffer.getvalue())
+        return order, empty
+    
+    @staticmethod
+    def _sort_key(value):
+        """
+        Sort key placing numbers (including values like "12.50 LPA" or "40%") before text.
+        
+        Args:
+            value: A report cell value
+            
+        Returns:
+            Tuple usable as a sort key
         """
+        if value is None or value == '':
+            return (2, 0, '')
+        if isinstance(value, bool):
+            return (1, 0, str(value).lower())
+        if isinstance(value, (int, float)):
+            return (0, value, '')
+        
+        text = str(value).strip()
+        number = text.replace('LPA', '').replace('%', '').strip()
         try:
-            cycle_id = filters.get('cycleId')
-            if not cycle_id:
-                return []
+            return (0, float(number), '')
+        except ValueError:
+            return (1, 0, text.lower())
+    
+    @staticmethod
+    def _report_columns(data_key):
+        """
+        Get the column names of a stored report in first-seen order.
+        
+        Args:
+            data_key: Store prefix of the report data
             
-            # Get all jobs from the cycle
-            job_query = {'cycleId': cycle_id}
+        Returns:
+            List of column names
+        """
+        return ReportService._read_manifest(data_key)['columns']
+    
+    @staticmethod
+    def _cell_value(value):
+        """Convert a report value into something a spreadsheet cell can hold."""
+        if value is None:
+            return ''
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, default=str)
+        return value
+    
+    @staticmethod
+    def _csv_chunks(data_key, columns, rows_per_chunk=500):
+        """
+        Render a stored report as CSV text in chunks.
+        
+        Args:
+            data_key: Store prefix of the report data
+            columns: Column names, in output order
+            rows_per_chunk: Number of rows buffered before a chunk is emitted
             
-            # Apply additional filters
-            if 'status' in filters and filters['status']:
-                job_query['status'] = filters['status']
-                
-            jobs = list(mongo.db.jobs.find(job_query))
-            job_ids = [str(job['_id']) for job in jobs]
-            
-            # Get all applications for these jobs
-            applications = []
-            if job_ids:
-                # Try multiple field names for jobId in applications collection
-                for field_name in ['jobId', 'job_id', 'job']:
-                    app_query = {field_name: {'$in': job_ids}}
-                    applications = list(mongo.db.applications.find(app_query))
-                    if applications:
-                        print(f"Found applications using field '{field_name}'")
-                        break
+        Yields:
+            CSV text chunks, starting with the header row
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        
+        count = 0
+        for row in ReportService.iter_report_rows(data_key):
+            writer.writerow([ReportService._cell_value(row.get(column)) for column in columns])
+            count += 1
+            if count % rows_per_chunk == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        yield buffer.getvalue()
+    
+    @staticmethod
+    def cleanup_expired_reports():
+        """
+        Delete the stored data and exports of expired reports.
+        
+        Expired reports stay in the collection with status ``expired`` so
+        their IDs still resolve.
+        
+        Returns:
+            Number of reports cleaned up
+        """
+        store = get_report_store()
+        now = datetime.utcnow()
+        count = 0
+        
+        expired = mongo.db.reports.find(
+            {'status': 'completed', 'expiresAt': {'$lt': now}},
+            {'dataKey': 1}
+        )
+        for report in expired:
+            try:
+                if report.get('dataKey'):
+                    store.delete_prefix(f"{report['dataKey']}/")
+                mongo.db.reports.update_one(
+                    {'_id': report['_id']},
+                    {'$set': {'status': 'expired', 'updatedAt': now}, '$unset': {'dataKey': ''}}
+                )
+                count += 1
+            except Exception as e:
+                print(f"Error cleaning up report {report['_id']}: {str(e)}")
+        
+        return count
+    
+    @staticmethod
+    def get_report_templates():
+        """
+        Get all report templates.
+        
+        Returns:
+            List of report template documents
+        """
+        templates = list(mongo.db.report_templates.find())
+        return [serialize_id(template) for template in templates]
+    
+    @staticmethod
+    def get_template_by_id(template_id):
+        """
+        Get a report template by ID.
+        
+        Args:
+            template_id: The ID of the template
             
-            # Get unique student IDs from applications
-            student_ids = []
-            for app in applications:
-                # Try multiple field names for studentId
-                for field_name in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                    if field_name in app:
-                        student_ids.append(app[field_name])
-                        break
-
-            student_ids = list(set(str(sid) for sid in student_ids if sid))
-            
-            # Get student details
-            students = {}
-            if student_ids:
-                for student_id in student_ids:
-                    try:
-                        # Try different ways to look up students
-                        student = None
-                        for collection_name in ['students', 'student']:
-                            collection = getattr(mongo.db, collection_name, None)
-                            if not collection:
-                                continue
-                                
-                            # Try with ObjectId
-                            try:
-                                student = collection.find_one({'_id': to_object_id(student_id)})
-                                if student:
-                                    break
-                            except:
-                                pass
-                                
-                            # Try with string ID in various fields
-                            for id_field in ['_id', 'id', 'studentId', 'student_id', 'userId', 'user_id']:
-                                try:
-                                    student = collection.find_one({id_field: student_id})
-                                    if student:
-                                        break
-                                except:
-                                    pass
-                                    
-                        if student:
-                            students[student_id] = student
-                    except Exception as e:
-                        print(f"Error finding student {student_id}: {e}")
-            
-            # Create summary data
-            summary_data = []
-            
-            for app in applications:
-                # Extract job_id and student_id from app using various field names
-                job_id = None
-                for job_field in ['jobId', 'job_id', 'job']:
-                    if job_field in app:
-                        job_id = str(app[job_field])
-                        break
-                        
-                student_id = None
-                for student_field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                    if student_field in app:
-                        student_id = str(app[student_field])
-                        break
-                
-                if not job_id or not student_id:
-                    continue
-                    
-                # Find corresponding job and student
-                job = next((j for j in jobs if str(j['_id']) == job_id), None)
-                student = students.get(student_id)
-                
-                if job and student:
-                    # Extract student fields with fallbacks
-                    student_major = None
-                    for field in ['major', 'branch', 'department']:
-                        if field in student and student[field]:
-                            student_major = student[field]
-                            break
-                    
-                    # Apply branch filter if specified
-                    if 'branches' in filters and filters['branches'] and student_major not in filters['branches']:
-                        continue
-                        
-                    # Apply company filter if specified
-                    if 'companies' in filters and filters['companies'] and job.get('company') not in filters['companies']:
-                        continue
-                        
-                    # Apply package range filter if specified
-                    package_value = job.get('package', '0')
-                    if isinstance(package_value, str):
-                        package = float(package_value.replace('LPA', '').strip())
-                    else:
-                        package = float(package_value)
-                        
-                    if 'minPackage' in filters and filters['minPackage'] and package < float(filters['minPackage']):
-                        continue
-                    if 'maxPackage' in filters and filters['maxPackage'] and package > float(filters['maxPackage']):
-                        continue
-                    
-                    # Get application status with fallbacks
-                    app_status = None
-                    for status_field in ['status', 'applicationStatus', 'app_status']:
-                        if status_field in app and app[status_field]:
-                            app_status = app[status_field]
-                            break
-                    
-                    # Get current stage with fallbacks
-                    current_stage = None
-                    for stage_field in ['currentStage', 'current_stage', 'stage']:
-                        if stage_field in app and app[stage_field]:
-                            current_stage = app[stage_field]
-                            break
-                    
-                    # Get created date with fallbacks
-                    created_date = ''
-                    for date_field in ['createdAt', 'created_at', 'dateCreated', 'date_created', 'appliedDate']:
-                        if date_field in app:
-                            date_value = app[date_field]
-                            if isinstance(date_value, datetime):
-                                created_date = date_value.strftime('%Y-%m-%d')
-                                break
-                            elif isinstance(date_value, str):
-                                created_date = date_value
-                                break
-                    
-                    # Get student ID with fallbacks
-                    display_student_id = student.get('studentId') or student.get('student_id') or student.get('roll_number') or student_id
-                    
-                    summary_data.append({
-                        'studentId': display_student_id,
-                        'studentName': student.get('name', ''),
-                        'email': student.get('email', ''),
-                        'major': student_major or 'Unknown',
-                        'company': job.get('company', ''),
-                        'role': job.get('role', ''),
-                        'package': job.get('package', ''),
-                        'location': job.get('location', ''),
-                        'status': app_status or 'Unknown',
-                        'currentStage': current_stage or 'Unknown',
-                        'appliedDate': created_date
-                    })
-            
-            return summary_data
+        Returns:
+            The template document or None if not found
+        """
+        try:
+            template = mongo.db.report_templates.find_one({'_id': to_object_id(template_id)})
+            return serialize_id(template) if template else None
+        except Exception:
+            return None
+    
+    @staticmethod
+    def create_template(data):
+        """
+        Create a new report template.
+        
+        Args:
+            data: Dictionary containing template data
             
+        Returns:
+            The ID of the newly created template
+        """
+        template = {
+            'name': data['name'],
+            'description': data.get('description', ''),
+            'columns': data['columns'],
+            'createdAt': datetime.utcnow(),
+            'updatedAt': datetime.utcnow()
+        }
+        
+        if 'createdBy' in data:
+            template['createdBy'] = data['createdBy']
+        
+        template.update(ReportService._template_schedule_fields(data))
+        
+        result = mongo.db.report_templates.insert_one(template)
+        return str(result.inserted_id)
+    
+    @staticmethod
+    def update_template(template_id, data):
+        """
+        Update a report template.
+        
+        Args:
+            template_id: The ID of the template to update
+            data: Dictionary containing updated template data
+            
+        Returns:
+            True if update was successful, False otherwise
+        """
+        try:
+            # Only the fields sent are changed, so a rename keeps the schedule and filters
+            update_data = {
+                field: data[field]
+                for field in ('name', 'description', 'columns', 'reportType')
+                if field in data
+            }
+            if 'filters' in data:
+                update_data['filters'] = data['filters'] or {}
+            if 'schedule' in data:
+                update_data.update(ReportService._schedule_fields(data['schedule']))
+            update_data['updatedAt'] = datetime.utcnow()
+            
+            result = mongo.db.report_templates.update_one(
+                {'_id': to_object_id(template_id)},
+                {'$set': update_data}
+            )
+            return result.modified_count > 0
         except Exception as e:
-            print(f"Error generating placement summary: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+            print(f"Error updating template: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _template_schedule_fields(data):
+        """
+        Build the fields that let a template be generated on a schedule.
+        
+        Args:
+            data: Dictionary containing template data
+            
+        Returns:
+            Dictionary with reportType, filters, schedule and the computed nextRunAt
+        """
+        return {
+            'reportType': data.get('reportType'),
+            'filters': data.get('filters') or {},
+            **ReportService._schedule_fields(data.get('schedule'))
+        }
+    
+    @staticmethod
+    def _schedule_fields(schedule):
+        """
+        Build a template's schedule and the time it next runs.
+        
+        Args:
+            schedule: Cron expression, or empty to stop scheduled runs
+            
+        Returns:
+            Dictionary with schedule and nextRunAt
+        """
+        from app.services.report_scheduler_service import next_run_at
+        
+        schedule = schedule or None
+        return {
+            'schedule': schedule,
+            'nextRunAt': next_run_at(
+                schedule,
+                datetime.utcnow(),
+                current_app.config.get('REPORT_SCHEDULER_TIMEZONE', 'UTC')
+            ) if schedule else None
+        }
+    
+    @staticmethod
+    def get_latest_template_report(template_id):
+        """
+        Get the newest completed report for a template's type and filters.
+        
+        Scheduled templates keep this snapshot fresh, so it can be shown
+        without waiting for a generation.
+        
+        Args:
+            template_id: The ID of the template
+            
+        Returns:
+            The report document or None if the template has not been generated yet
+        """
+        try:
+            template = mongo.db.report_templates.find_one({'_id': to_object_id(template_id)})
+            if not template or not template.get('reportType'):
+                return None
+            
+            report = mongo.db.reports.find_one(
+                {
+                    'cacheKey': ReportService._cache_key(template['reportType'], template.get('filters') or {}),
+                    'status': 'completed',
+                    'dataKey': {'$exists': True}
+                },
+                {'_id': 1},
+                sort=[('createdAt', -1)]
+            )
+            return ReportService.get_report_by_id(report['_id']) if report else None
+        except Exception as e:
+            print(f"Error retrieving latest template report: {str(e)}")
+            return None
+    
+    @staticmethod
+    def delete_template(template_id):
+        """
+        Delete a report template.
+        
+        Args:
+            template_id: The ID of the template to delete
+            
+        Returns:
+            True if deletion was successful, False otherwise
+        """
+        try:
+            result = mongo.db.report_templates.delete_one({'_id': to_object_id(template_id)})
+            return result.deleted_count > 0
+        except Exception as e:
+            print(f"Error deleting template: {str(e)}")
+            return False
+            
+    @staticmethod
+    def _cursor_batch_size():
+        """
+        Get the cursor batch size used when streaming report aggregations.
+        
+        Returns:
+            Number of documents fetched per round trip
+        """
+        return current_app.config.get('REPORT_CURSOR_BATCH_SIZE', 500)
+    
+    @staticmethod
+    def _package_range_query(filters):
+        """
+        Build a query on the numeric job package from the minPackage and
+        maxPackage filters.
+        
+        Args:
+            filters: Dictionary containing filter criteria
+            
+        Returns:
+            Query condition for packageValue, or None if no range is given
+        """
+        package_range = {}
+        if 'minPackage' in filters and filters['minPackage']:
+            package_range['$gte'] = float(filters['minPackage'])
+        if 'maxPackage' in filters and filters['maxPackage']:
+            package_range['$lte'] = float(filters['maxPackage'])
+        return package_range or None
+    
+    @staticmethod
+    def _generate_placement_summary(filters):
+        """
+        Generate a placement summary report.
+        
+        The report is computed by a single aggregation over the cycle's jobs,
+        joining applications and students on the server, so only the final
+        rows are streamed back in batches.
+        
+        Args:
+            filters: Dictionary containing filter criteria
+            
+        Returns:
+            Iterable of report data items (the aggregation cursor, read lazily)
+        """
+        cycle_id = filters.get('cycleId')
+        if not cycle_id:
             return []
+        
+        # Jobs from the cycle
+        job_query = {'cycleId': cycle_id}
+        
+        if 'status' in filters and filters['status']:
+            job_query['status'] = filters['status']
+        if 'companies' in filters and filters['companies']:
+            job_query['company'] = {'$in': filters['companies']}
+        
+        # Apply package range filter if specified
+        package_range = ReportService._package_range_query(filters)
+        if package_range:
+            job_query['packageValue'] = package_range
+        
+        pipeline = [
+            {'$match': job_query},
+            # Join applications for each job ($lookup + $unwind are coalesced by the server)
+            {'$lookup': {
+                'from': 'applications',
+                'localField': '_id',
+                'foreignField': 'job_id',
+                'as': 'application'
+            }},
+            {'$unwind': '$application'},
+            # Join the applicant's student profile
+            {'$lookup': {
+                'from': 'student',
+                'localField': 'application.student_id',
+                'foreignField': 'user_id',
+                'as': 'student'
+            }},
+            {'$unwind': '$student'},
+            {'$addFields': {
+                'major': {'$ifNull': ['$student.major', {'$ifNull': ['$student.branch', '$student.department']}]}
+            }}
+        ]
+        
+        # Apply branch filter if specified
+        if 'branches' in filters and filters['branches']:
+            pipeline.append({'$match': {'major': {'$in': filters['branches']}}})
+        
+        pipeline.append({'$project': {
+            '_id': 0,
+            'studentId': {'$toString': {'$ifNull': [
+                '$student.student_id',
+                {'$ifNull': ['$student.roll_number', '$application.student_id']}
+            ]}},
+            'studentName': {'$ifNull': ['$student.name', '']},
+            'email': {'$ifNull': ['$student.email', '']},
+            'major': {'$ifNull': ['$major', 'Unknown']},
+            'company': {'$ifNull': ['$company', '']},
+            'role': {'$ifNull': ['$role', '']},
+            'package': {'$ifNull': ['$package', '']},
+            'location': {'$ifNull': ['$location', '']},
+            'status': {'$ifNull': ['$application.status', 'Unknown']},
+            'currentStage': {'$ifNull': ['$application.current_stage', 'Unknown']},
+            'appliedDate': {'$dateToString': {
+                'format': '%Y-%m-%d',
+                'date': '$application.created_at',
+                'onNull': ''
+            }}
+        }})
+        
+        return mongo.db.jobs.aggregate(
+            pipeline,
+            allowDiskUse=True,
+            batchSize=ReportService._cursor_batch_size()
+        )
     
     @staticmethod
     def _generate_student_placement_status(filters):
@@ -495,249 +1386,221 @@ class ReportService:
         Returns:
             List of report data items
         """
-        try:
-            cycle_id = filters.get('cycleId')
-            if not cycle_id:
-                return []
-            
-            # Get all students
-            student_query = {}
-            
-            # Try to identify which collection and fields to use for students
-            student_collections_to_try = ['students', 'student']
-            branch_fields_to_try = ['major', 'branch', 'department']
-            
-            # Find the correct collection and branch field
-            students = []
-            collection_name = None
-            branch_field = None
-            
-            for coll_name in student_collections_to_try:
-                collection = getattr(mongo.db, coll_name, None)
-                if not collection:
-                    continue
-                    
-                # Check which branch field is available
-                for field in branch_fields_to_try:
-                    # Try to find one document with this field
-                    sample = collection.find_one({field: {"$exists": True}})
-                    if sample:
-                        collection_name = coll_name
-                        branch_field = field
-                        break
-                        
-                if collection_name and branch_field:
-                    break
-                
-            if not collection_name or not branch_field:
-                print(f"Could not determine student collection or branch field")
-                return []
-            
-            print(f"Using collection '{collection_name}' with branch field '{branch_field}'")
-            collection = getattr(mongo.db, collection_name)
-            
-            # Apply branch filter if specified
-            if 'branches' in filters and filters['branches']:
-                student_query[branch_field] = {'$in': filters['branches']}
+        cycle_id = filters.get('cycleId')
+        if not cycle_id:
+            return []
+        
+        # Get all students
+        student_query = {}
+        
+        # Try to identify which collection and fields to use for students
+        student_collections_to_try = ['students', 'student']
+        branch_fields_to_try = ['major', 'branch', 'department']
+        
+        # Find the correct collection and branch field
+        students = []
+        collection_name = None
+        branch_field = None
+        
+        for coll_name in student_collections_to_try:
+            collection = getattr(mongo.db, coll_name, None)
+            if collection is None:
+                continue
                 
-            students = list(collection.find(student_query))
-            student_ids = [str(student['_id']) for student in students]
+            # Check which branch field is available
+            for field in branch_fields_to_try:
+                # Try to find one document with this field
+                sample = collection.find_one({field: {"$exists": True}})
+                if sample:
+                    collection_name = coll_name
+                    branch_field = field
+                    break
+                    
+            if collection_name and branch_field:
+                break
             
-            # Get all jobs from the cycle
-            job_query = {'cycleId': cycle_id}
+        if not collection_name or not branch_field:
+            print(f"Could not determine student collection or branch field")
+            return []
+        
+        print(f"Using collection '{collection_name}' with branch field '{branch_field}'")
+        collection = getattr(mongo.db, collection_name)
+        
+        # Apply branch filter if specified
+        if 'branches' in filters and filters['branches']:
+            student_query[branch_field] = {'$in': filters['branches']}
             
-            # Apply company filter if specified
-            if 'companies' in filters and filters['companies']:
-                job_query['company'] = {'$in': filters['companies']}
-                
-            # Apply package range filter if specified
-            if 'minPackage' in filters and filters['minPackage']:
-                try:
-                    min_package = float(filters['minPackage'])
-                    job_query['$where'] = f"function() {{ return parseFloat(this.package.replace('LPA', '').trim()) >= {min_package}; }}"
-                except:
-                    pass
-                
-            if 'maxPackage' in filters and filters['maxPackage']:
-                try:
-                    max_package = float(filters['maxPackage'])
-                    if '$where' in job_query:
-                        job_query['$where'] = f"function() {{ return parseFloat(this.package.replace('LPA', '').trim()) >= {min_package} && parseFloat(this.package.replace('LPA', '').trim()) <= {max_package}; }}"
-                    else:
-                        job_query['$where'] = f"function() {{ return parseFloat(this.package.replace('LPA', '').trim()) <= {max_package}; }}"
-                except:
-                    pass
-            
-            jobs = list(mongo.db.jobs.find(job_query))
-            job_ids = [str(job['_id']) for job in jobs]
-            
-            # Get all applications
-            applications = []
-            
-            # Try different field names for applications
-            job_field_name = None
-            student_field_name = None
-            
-            if job_ids and student_ids:
-                # First, find which field names are used in the applications collection
-                for job_field in ['jobId', 'job_id', 'job']:
-                    for student_field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                        # Test query with these field names
-                        test_query = {
-                            job_field: {'$in': job_ids[:1]},
-                            student_field: {'$in': student_ids[:1]}
-                        }
-                        
-                        test_results = list(mongo.db.applications.find(test_query, {'_id': 1}).limit(1))
-                        if test_results:
-                            job_field_name = job_field
-                            student_field_name = student_field
-                            print(f"Found applications using fields '{job_field}' and '{student_field}'")
-                            break
-                            
-                    if job_field_name and student_field_name:
-                        break
-                
-                if job_field_name and student_field_name:
-                    # Now build the full query
-                    app_query = {
-                        job_field_name: {'$in': job_ids},
-                        student_field_name: {'$in': student_ids}
+        students = list(collection.find(student_query))
+        student_ids = [str(student['_id']) for student in students]
+        
+        # Get all jobs from the cycle
+        job_query = {'cycleId': cycle_id}
+        
+        # Apply company filter if specified
+        if 'companies' in filters and filters['companies']:
+            job_query['company'] = {'$in': filters['companies']}
+            
+        # Apply package range filter if specified
+        package_range = ReportService._package_range_query(filters)
+        if package_range:
+            job_query['packageValue'] = package_range
+        
+        jobs = list(mongo.db.jobs.find(job_query))
+        job_ids = [str(job['_id']) for job in jobs]
+        
+        # Get all applications
+        applications = []
+        
+        # Try different field names for applications
+        job_field_name = None
+        student_field_name = None
+        
+        if job_ids and student_ids:
+            # First, find which field names are used in the applications collection
+            for job_field in ['jobId', 'job_id', 'job']:
+                for student_field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
+                    # Test query with these field names
+                    test_query = {
+                        job_field: {'$in': job_ids[:1]},
+                        student_field: {'$in': student_ids[:1]}
                     }
                     
-                    # Apply status filter if specified
-                    if 'status' in filters and filters['status']:
-                        app_query['status'] = {'$in': filters['status']}
+                    test_results = list(mongo.db.applications.find(test_query, {'_id': 1}).limit(1))
+                    if test_results:
+                        job_field_name = job_field
+                        student_field_name = student_field
+                        print(f"Found applications using fields '{job_field}' and '{student_field}'")
+                        break
                         
-                    applications = list(mongo.db.applications.find(app_query))
-                    print(f"Found {len(applications)} applications")
-                else:
-                    print("Could not determine application field names")
-            
-            # Create status data
-            status_data = []
-            
-            # Map for quick lookups
-            student_map = {str(student['_id']): student for student in students}
-            job_map = {str(job['_id']): job for job in jobs}
-            
-            # Group applications by student
-            student_applications = {}
-            for app in applications:
-                student_id = None
-                # Extract student ID using the field name we found
-                if student_field_name:
-                    student_id = str(app.get(student_field_name))
-                else:
-                    # Try multiple fields if not found earlier
-                    for field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                        if field in app:
-                            student_id = str(app[field])
-                            break
-                            
-                if student_id not in student_applications:
-                    student_applications[student_id] = []
-                    
-                student_applications[student_id].append(app)
+                if job_field_name and student_field_name:
+                    break
             
-            # Generate report data
-            for student_id, apps in student_applications.items():
-                student = student_map.get(student_id)
-                if not student:
-                    continue
-                
-                # Count application statuses
-                total_apps = len(apps)
-                pending_apps = 0
-                rejected_apps = 0
-                selected_apps = 0
-                
-                for app in apps:
-                    status = app.get('status', '').lower()
-                    if status in ['applied', 'pending', 'shortlisted', 'in process', 'in progress']:
-                        pending_apps += 1
-                    elif status in ['rejected', 'not selected']:
-                        rejected_apps += 1
-                    elif status in ['selected', 'offered', 'placed', 'accepted']:
-                        selected_apps += 1
-                
-                # Get best offer if any
-                best_offer = None
-                highest_package = 0
-                
-                for app in apps:
-                    if app.get('status', '').lower() in ['selected', 'offered', 'placed', 'accepted']:
-                        job_id = None
-                        # Extract job ID using field name we found earlier
-                        if job_field_name:
-                            job_id = str(app.get(job_field_name))
-                        else:
-                            # Try multiple fields if not found earlier
-                            for field in ['jobId', 'job_id', 'job']:
-                                if field in app:
-                                    job_id = str(app[field])
-                                    break
-                                    
-                        if job_id and job_id in job_map:
-                            job = job_map[job_id]
-                            try:
-                                package_str = job.get('package', '0')
-                                if isinstance(package_str, str):
-                                    package = float(package_str.replace('LPA', '').strip())
-                                else:
-                                    package = float(package_str)
-                                    
-                                if package > highest_package:
-                                    highest_package = package
-                                    best_offer = job
-                            except Exception as e:
-                                print(f"Error parsing package: {e}")
+            if job_field_name and student_field_name:
+                # Now build the full query
+                app_query = {
+                    job_field_name: {'$in': job_ids},
+                    student_field_name: {'$in': student_ids}
+                }
                 
-                placement_status = 'Unplaced'
-                if selected_apps > 0:
-                    placement_status = 'Placed'
-                elif total_apps == 0:
-                    placement_status = 'Not Applied'
-                elif pending_apps > 0:
-                    placement_status = 'In Process'
-                
-                # Skip records based on status filter
-                if 'status' in filters and filters['status'] and placement_status not in filters['status']:
-                    continue
-                
-                # Get student's major/branch
-                student_major = None
-                for field in branch_fields_to_try:
-                    if field in student and student[field]:
-                        student_major = student[field]
+                # Apply status filter if specified
+                if 'status' in filters and filters['status']:
+                    app_query['status'] = {'$in': filters['status']}
+                    
+                applications = list(mongo.db.applications.find(app_query))
+                print(f"Found {len(applications)} applications")
+            else:
+                print("Could not determine application field names")
+        
+        # Create status data
+        status_data = []
+        
+        # Map for quick lookups
+        student_map = {str(student['_id']): student for student in students}
+        job_map = {str(job['_id']): job for job in jobs}
+        
+        # Group applications by student
+        student_applications = {}
+        for app in applications:
+            student_id = None
+            # Extract student ID using the field name we found
+            if student_field_name:
+                student_id = str(app.get(student_field_name))
+            else:
+                # Try multiple fields if not found earlier
+                for field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
+                    if field in app:
+                        student_id = str(app[field])
                         break
+                        
+            if student_id not in student_applications:
+                student_applications[student_id] = []
                 
-                # Get student ID and other fields with fallbacks
-                display_student_id = student.get('studentId') or student.get('student_id') or student.get('roll_number') or student_id
-                
-                status_data.append({
-                    'studentId': display_student_id,
-                    'studentName': student.get('name', ''),
-                    'email': student.get('email', ''),
-                    'major': student_major or 'Unknown',
-                    'gender': student.get('gender', ''),
-                    'totalApplications': total_apps,
-                    'pendingApplications': pending_apps,
-                    'rejectedApplications': rejected_apps,
-                    'selectedApplications': selected_apps,
-                    'placementStatus': placement_status,
-                    'bestOfferCompany': best_offer.get('company', '') if best_offer else '',
-                    'bestOfferRole': best_offer.get('role', '') if best_offer else '',
-                    'bestOfferPackage': best_offer.get('package', '') if best_offer else ''
-                })
-            
-            return status_data
+            student_applications[student_id].append(app)
+        
+        # Generate report data
+        for student_id, apps in student_applications.items():
+            student = student_map.get(student_id)
+            if not student:
+                continue
+            
+            # Count application statuses
+            total_apps = len(apps)
+            pending_apps = 0
+            rejected_apps = 0
+            selected_apps = 0
+            
+            for app in apps:
+                status = app.get('status', '').lower()
+                if status in ['applied', 'pending', 'shortlisted', 'in process', 'in progress']:
+                    pending_apps += 1
+                elif status in ['rejected', 'not selected']:
+                    rejected_apps += 1
+                elif status in ['selected', 'offered', 'placed', 'accepted']:
+                    selected_apps += 1
+            
+            # Get best offer if any
+            best_offer = None
+            highest_package = 0
+            
+            for app in apps:
+                if app.get('status', '').lower() in ['selected', 'offered', 'placed', 'accepted']:
+                    job_id = None
+                    # Extract job ID using field name we found earlier
+                    if job_field_name:
+                        job_id = str(app.get(job_field_name))
+                    else:
+                        # Try multiple fields if not found earlier
+                        for field in ['jobId', 'job_id', 'job']:
+                            if field in app:
+                                job_id = str(app[field])
+                                break
+                                
+                    if job_id and job_id in job_map:
+                        job = job_map[job_id]
+                        package = job.get('packageValue') or 0
+                        if package > highest_package:
+                            highest_package = package
+                            best_offer = job
+            
+            placement_status = 'Unplaced'
+            if selected_apps > 0:
+                placement_status = 'Placed'
+            elif total_apps == 0:
+                placement_status = 'Not Applied'
+            elif pending_apps > 0:
+                placement_status = 'In Process'
+            
+            # Skip records based on status filter
+            if 'status' in filters and filters['status'] and placement_status not in filters['status']:
+                continue
+            
+            # Get student's major/branch
+            student_major = None
+            for field in branch_fields_to_try:
+                if field in student and student[field]:
+                    student_major = student[field]
+                    break
             
-        except Exception as e:
-            print(f"Error generating student placement status: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return []
+            # Get student ID and other fields with fallbacks
+            display_student_id = student.get('studentId') or student.get('student_id') or student.get('roll_number') or student_id
+            
+            status_data.append({
+                'studentId': display_student_id,
+                'studentName': student.get('name', ''),
+                'email': student.get('email', ''),
+                'major': student_major or 'Unknown',
+                'gender': student.get('gender', ''),
+                'totalApplications': total_apps,
+                'pendingApplications': pending_apps,
+                'rejectedApplications': rejected_apps,
+                'selectedApplications': selected_apps,
+                'placementStatus': placement_status,
+                'bestOfferCompany': best_offer.get('company', '') if best_offer else '',
+                'bestOfferRole': best_offer.get('role', '') if best_offer else '',
+                'bestOfferPackage': best_offer.get('package', '') if best_offer else ''
+            })
+        
+        return status_data
     
     @staticmethod
     def _generate_company_wise_recruitment(filters):
@@ -750,111 +1613,114 @@ class ReportService:
         Returns:
             List of report data items
         """
-        try:
-            cycle_id = filters.get('cycleId')
-            if not cycle_id:
-                return []
-            
-            # Get all jobs from the cycle
-            job_query = {'cycleId': cycle_id}
+        return ReportService._company_wise_rows(ReportService._company_wise_partials(filters))
+    
+    @staticmethod
+    def _company_wise_partials(filters):
+        """
+        Collect the raw per-company sums and counts of one cycle.
+        
+        Args:
+            filters: Dictionary containing filter criteria
             
-            # Apply company filter if specified
-            if 'companies' in filters and filters['companies']:
-                job_query['company'] = {'$in': filters['companies']}
-                
-            jobs = list(mongo.db.jobs.find(job_query))
-            job_ids = [str(job['_id']) for job in jobs]
-            
-            # Get all applications for these jobs
-            applications = []
-            if job_ids:
-                applications = list(mongo.db.applications.find({'jobId': {'$in': job_ids}}))
-            
-            # Group by company
-            company_data = {}
-            
-            for job in jobs:
-                company = job.get('company')
-                if company not in company_data:
-                    company_data[company] = {
-                        'company': company,
-                        'jobsPosted': 0,
-                        'totalApplications': 0,
-                        'selected': 0,
-                        'rejected': 0,
-                        'inProcess': 0,
-                        'roles': set(),
-                        'highestPackage': 0,
-                        'lowestPackage': float('inf'),
-                        'totalPackage': 0,
-                        'packageCount': 0
-                    }
-                
-                company_data[company]['jobsPosted'] += 1
-                company_data[company]['roles'].add(job.get('role', ''))
-                
-                # Process package information
-                try:
-                    package = float(job.get('package', '0').replace('LPA', '').strip())
-                    if package > 0:
-                        company_data[company]['highestPackage'] = max(company_data[company]['highestPackage'], package)
-                        company_data[company]['lowestPackage'] = min(company_data[company]['lowestPackage'], package)
-                        company_data[company]['totalPackage'] += package
-                        company_data[company]['packageCount'] += 1
-                except:
-                    pass
-            
-            # Process applications
-            for app in applications:
-                job_id = app.get('jobId')
-                job = next((j for j in jobs if str(j['_id']) == job_id), None)
-                
-                if job:
-                    company = job.get('company')
-                    if company in company_data:
-                        company_data[company]['totalApplications'] += 1
-                        
-                        status = app.get('status', '')
-                        if status == 'selected':
-                            company_data[company]['selected'] += 1
-                        elif status == 'rejected':
-                            company_data[company]['rejected'] += 1
-                        else:
-                            company_data[company]['inProcess'] += 1
-            
-            # Format final data
-            report_data = []
-            for company, data in company_data.items():
-                # Calculate average package
-                avg_package = 0
-                if data['packageCount'] > 0:
-                    avg_package = data['totalPackage'] / data['packageCount']
-                
-                # Handle case where no packages were found
-                if data['lowestPackage'] == float('inf'):
-                    data['lowestPackage'] = 0
-                
-                report_data.append({
-                    'company': company,
-                    'jobsPosted': data['jobsPosted'],
-                    'rolesOffered': ', '.join(data['roles']),
-                    'totalApplications': data['totalApplications'],
-                    'selectedCandidates': data['selected'],
-                    'rejectedCandidates': data['rejected'],
-                    'inProcessCandidates': data['inProcess'],
-                    'highestPackage': f"{data['highestPackage']} LPA",
-                    'lowestPackage': f"{data['lowestPackage']} LPA",
-                    'averagePackage': f"{avg_package:.2f} LPA",
-                    'selectionRate': f"{(data['selected'] / data['totalApplications'] * 100):.2f}%" if data['totalApplications'] > 0 else "0%"
-                })
+        Returns:
+            Dictionary mapping company to its partial aggregates
+        """
+        cycle_id = filters.get('cycleId')
+        if not cycle_id:
+            return {}
+        
+        # Get all jobs from the cycle
+        job_query = {'cycleId': cycle_id}
+        
+        # Apply company filter if specified
+        if 'companies' in filters and filters['companies']:
+            job_query['company'] = {'$in': filters['companies']}
             
-            # Sort by selected candidates count (descending)
-            report_data.sort(key=lambda x: x['selectedCandidates'], reverse=True)
-            return report_data
+        jobs = list(mongo.db.jobs.find(job_query))
+        
+        # Application counters per company are maintained in cycle_stats
+        company_stats = CycleStatsService.get(cycle_id).get('company', {})
+        
+        # Group by company
+        company_data = {}
+        
+        for job in jobs:
+            company = job.get('company')
+            if company not in company_data:
+                company_data[company] = {
+                    'jobsPosted': 0,
+                    'totalApplications': 0,
+                    'selected': 0,
+                    'rejected': 0,
+                    'inProcess': 0,
+                    'roles': set(),
+                    'highestPackage': 0,
+                    'lowestPackage': float('inf'),
+                    'totalPackage': 0,
+                    'packageCount': 0
+                }
+            
+            company_data[company]['jobsPosted'] += 1
+            company_data[company]['roles'].add(job.get('role', ''))
+            
+            # Process package information
+            package = job.get('packageValue') or 0
+            if package > 0:
+                company_data[company]['highestPackage'] = max(company_data[company]['highestPackage'], package)
+                company_data[company]['lowestPackage'] = min(company_data[company]['lowestPackage'], package)
+                company_data[company]['totalPackage'] += package
+                company_data[company]['packageCount'] += 1
+        
+        # Add application counts
+        for company, data in company_data.items():
+            counts = company_stats.get(stats_key(company), {})
+            data['totalApplications'] = counts.get('applications', 0)
+            data['selected'] = counts.get('selected', 0)
+            data['rejected'] = counts.get('rejected', 0)
+            data['inProcess'] = counts.get('inProcess', 0)
+        
+        return company_data
+    
+    @staticmethod
+    def _company_wise_rows(company_data):
+        """
+        Turn merged per-company aggregates into report rows.
+        
+        Args:
+            company_data: Dictionary mapping company to its aggregates
             
-        except Exception as e:
-            print(f"Error generating company-wise recruitment: {str(e)}")
-            return []
+        Returns:
+            List of report data items
+        """
+        report_data = []
+        for company, data in company_data.items():
+            # Calculate average package
+            avg_package = 0
+            if data['packageCount'] > 0:
+                avg_package = data['totalPackage'] / data['packageCount']
+            
+            # Handle case where no packages were found
+            if data['lowestPackage'] == float('inf'):
+                data['lowestPackage'] = 0
+            
+            report_data.append({
+                'company': company,
+                'jobsPosted': data['jobsPosted'],
+                'rolesOffered': ', '.join(data['roles']),
+                'totalApplications': data['totalApplications'],
+                'selectedCandidates': data['selected'],
+                'rejectedCandidates': data['rejected'],
+                'inProcessCandidates': data['inProcess'],
+                'highestPackage': f"{data['highestPackage']} LPA",
+                'lowestPackage': f"{data['lowestPackage']} LPA",
+                'averagePackage': f"{avg_package:.2f} LPA",
+                'selectionRate': f"{(data['selected'] / data['totalApplications'] * 100):.2f}%" if data['totalApplications'] > 0 else "0%"
+            })
+        
+        # Sort by selected candidates count (descending)
+        report_data.sort(key=lambda x: x['selectedCandidates'], reverse=True)
+        return report_data
     
     @staticmethod
     def _generate_branch_wise_statistics(filters):
@@ -867,758 +1733,427 @@ class ReportService:
         Returns:
             List of report data items
         """
-        try:
-            cycle_id = filters.get('cycleId')
-            if not cycle_id:
-                return []
-            
-            # Get all jobs from the cycle
-            job_query = {'cycleId': cycle_id}
-            
-            # Apply company filter if specified
-            if 'companies' in filters and filters['companies']:
-                job_query['company'] = {'$in': filters['companies']}
-                
-            jobs = list(mongo.db.jobs.find(job_query))
-            job_ids = [str(job['_id']) for job in jobs]
-            
-            # Get all applications for these jobs
-            applications = []
-            if job_ids:
-                # Try multiple field names for jobId in applications collection
-                for field_name in ['jobId', 'job_id', 'job']:
-                    app_query = {field_name: {'$in': job_ids}}
-                    applications = list(mongo.db.applications.find(app_query))
-                    if applications:
-                        print(f"Found {len(applications)} applications using field '{field_name}'")
-                        break
-            
-            # Get student IDs from applications
-            student_ids = []
-            for app in applications:
-                # Try multiple field names for studentId
-                for field_name in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                    if field_name in app:
-                        student_ids.append(str(app[field_name]))
-                        break
-            
-            # Identify student collection and branch field
-            student_collections_to_try = ['students', 'student']
-            branch_fields_to_try = ['major', 'branch', 'department']
-            
-            collection_name = None
-            branch_field = None
-            
-            for coll_name in student_collections_to_try:
-                collection = getattr(mongo.db, coll_name, None)
-                if not collection:
-                    continue
-                    
-                # Check which branch field is available
-                for field in branch_fields_to_try:
-                    # Try to find one document with this field
-                    sample = collection.find_one({field: {"$exists": True}})
-                    if sample:
-                        collection_name = coll_name
-                        branch_field = field
-                        break
-                        
-                if collection_name and branch_field:
-                    break
-                
-            if not collection_name or not branch_field:
-                print(f"Could not determine student collection or branch field")
-                return []
-            
-            print(f"Using collection '{collection_name}' with branch field '{branch_field}'")
-            collection = getattr(mongo.db, collection_name)
-            
-            # Get student details
-            students = {}
-            for student_id in student_ids:
-                try:
-                    # Try with ObjectId
-                    try:
-                        student = collection.find_one({'_id': to_object_id(student_id)})
-                        if student:
-                            students[student_id] = student
-                            continue
-                    except:
-                        pass
-                        
-                    # Try with string ID in various fields
-                    for id_field in ['_id', 'id', 'studentId', 'student_id', 'userId', 'user_id']:
-                        try:
-                            student = collection.find_one({id_field: student_id})
-                            if student:
-                                students[student_id] = student
-                                break
-                        except:
-                            pass
-                except Exception as e:
-                    print(f"Error finding student {student_id}: {e}")
-            
-            # Group by branch
-            branch_data = {}
-            
-            for app in applications:
-                # Extract fields from application
-                student_id = None
-                for student_field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                    if student_field in app:
-                        student_id = str(app[student_field])
-                        break
-                    
-                job_id = None
-                for job_field in ['jobId', 'job_id', 'job']:
-                    if job_field in app:
-                        job_id = str(app[job_field])
-                        break
-                
-                if not student_id or not job_id:
-                    continue
-                    
-                student = students.get(student_id)
-                
-                if not student:
-                    continue
-                
-                # Determine branch
-                branch = 'Unknown'
-                for field in branch_fields_to_try:
-                    if field in student and student[field]:
-                        branch = student[field]
-                        break
-                
-                # Apply branch filter if specified
-                if 'branches' in filters and filters['branches'] and branch not in filters['branches']:
-                    continue
-                
-                if branch not in branch_data:
-                    branch_data[branch] = {
-                        'branch': branch,
-                        'totalStudents': 0,
-                        'studentsApplied': set(),
-                        'studentsSelected': set(),
-                        'totalApplications': 0,
-                        'selectedApplications': 0,
-                        'highestPackage': 0,
-                        'totalPackage': 0,
-                        'packageCount': 0
-                    }
-                
-                job = next((j for j in jobs if str(j['_id']) == job_id), None)
-                
-                if not job:
-                    continue
-                
-                # Process application data
-                branch_data[branch]['totalApplications'] += 1
-                branch_data[branch]['studentsApplied'].add(student_id)
-                
-                # Check application status (support multiple status formats)
-                status = app.get('status', '').lower()
-                if status in ['selected', 'offered', 'placed', 'accepted']:
-                    branch_data[branch]['selectedApplications'] += 1
-                    branch_data[branch]['studentsSelected'].add(student_id)
-                    
-                    # Process package information
-                    try:
-                        package_str = job.get('package', '0')
-                        if isinstance(package_str, str):
-                            package = float(package_str.replace('LPA', '').strip())
-                        else:
-                            package = float(package_str)
-                            
-                        if package > 0:
-                            branch_data[branch]['highestPackage'] = max(branch_data[branch]['highestPackage'], package)
-                            branch_data[branch]['totalPackage'] += package
-                            branch_data[branch]['packageCount'] += 1
-                    except Exception as e:
-                        print(f"Error parsing package: {e}")
-            
-            # Get total students by branch from the database
-            branch_counts = {}
-            try:
-                for branch in branch_data.keys():
-                    count = collection.count_documents({branch_field: branch})
-                    branch_counts[branch] = count
-            except Exception as e:
-                print(f"Error counting students by branch: {str(e)}")
+        return ReportService._branch_wise_rows(ReportService._branch_wise_partials(filters))
+    
+    @staticmethod
+    def _branch_wise_partials(filters):
+        """
+        Collect the raw per-branch sums and counts of one cycle.
+        
+        Args:
+            filters: Dictionary containing filter criteria
             
-            # Format final data
-            report_data = []
-            for branch, data in branch_data.items():
-                # Get total student count for this branch
-                data['totalStudents'] = branch_counts.get(branch, 0)
-                
-                # Calculate average package
-                avg_package = 0
-                if data['packageCount'] > 0:
-                    avg_package = data['totalPackage'] / data['packageCount']
-                
-                report_data.append({
-                    'branch': branch,
-                    'totalStudents': data['totalStudents'],
-                    'studentsApplied': len(data['studentsApplied']),
-                    'studentsPlaced': len(data['studentsSelected']),
-                    'totalApplications': data['totalApplications'],
-                    'successfulApplications': data['selectedApplications'],
-                    'highestPackage': f"{data['highestPackage']} LPA",
-                    'averagePackage': f"{avg_package:.2f} LPA",
-                    'placementPercentage': f"{(len(data['studentsSelected']) / data['totalStudents'] * 100):.2f}%" if data['totalStudents'] > 0 else "0%",
-                    'applicationSuccessRate': f"{(data['selectedApplications'] / data['totalApplications'] * 100):.2f}%" if data['totalApplications'] > 0 else "0%"
-                })
+        Returns:
+            Dictionary mapping branch to its partial aggregates
+        """
+        cycle_id = filters.get('cycleId')
+        if not cycle_id:
+            return {}
+        
+        # Without a company filter the maintained cycle statistics hold every count
+        if not filters.get('companies'):
+            return ReportService._branch_partials_from_stats(cycle_id, filters)
+        
+        job_query = {'cycleId': cycle_id, 'company': {'$in': filters['companies']}}
+        selected = {'$in': ['$status', SELECTED_STATUSES]}
+        has_package = {'$and': [selected, {'$gt': ['$package', 0]}]}
+        
+        # Applications of the companies' jobs joined with each applicant's branch, grouped per branch
+        pipeline = [
+            {'$match': job_query},
+            {'$lookup': {
+                'from': 'applications',
+                'localField': '_id',
+                'foreignField': 'job_id',
+                'as': 'application'
+            }},
+            {'$unwind': '$application'},
+            {'$lookup': {
+                'from': 'student',
+                'let': {'userId': '$application.student_id'},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$user_id', '$$userId']}}},
+                    {'$limit': 1},
+                    {'$project': {'_id': 0, 'major': 1}}
+                ],
+                'as': 'student'
+            }},
+            {'$unwind': '$student'},
+            {'$project': {
+                '_id': 0,
+                'studentId': '$application.student_id',
+                'status': {'$toLower': {'$ifNull': ['$application.status', '']}},
+                'package': {'$ifNull': ['$packageValue', 0]},
+                'branch': {'$cond': [
+                    {'$in': [{'$ifNull': ['$student.major', '']}, ['']]},
+                    'Unknown',
+                    '$student.major'
+                ]}
+            }}
+        ]
+        if filters.get('branches'):
+            pipeline.append({'$match': {'branch': {'$in': filters['branches']}}})
+        pipeline.append({'$group': {
+            '_id': '$branch',
+            'studentsApplied': {'$addToSet': '$studentId'},
+            'studentsSelected': {'$addToSet': {'$cond': [selected, '$studentId', None]}},
+            'totalApplications': {'$sum': 1},
+            'selectedApplications': {'$sum': {'$cond': [selected, 1, 0]}},
+            'highestPackage': {'$max': {'$cond': [has_package, '$package', 0]}},
+            'totalPackage': {'$sum': {'$cond': [has_package, '$package', 0]}},
+            'packageCount': {'$sum': {'$cond': [has_package, 1, 0]}}
+        }})
+        
+        branch_data = {}
+        for row in mongo.db.jobs.aggregate(pipeline, allowDiskUse=True):
+            branch = row.pop('_id')
+            row['studentsApplied'] = {str(student_id) for student_id in row['studentsApplied']}
+            row['studentsSelected'] = {
+                str(student_id) for student_id in row['studentsSelected'] if student_id is not None
+            }
+            branch_data[branch] = row
+        
+        return branch_data
+    
+    @staticmethod
+    def _branch_partials_from_stats(cycle_id, filters):
+        """
+        Read the per-branch aggregates of a cycle from its maintained counters.
+        
+        Args:
+            cycle_id: The ID of the placement cycle
+            filters: Dictionary containing filter criteria
             
-            # Sort by placement percentage (descending)
-            report_data.sort(key=lambda x: float(x['placementPercentage'].replace('%', '')) if '%' in x['placementPercentage'] else 0, reverse=True)
-            return report_data
+        Returns:
+            Dictionary mapping branch to its partial aggregates
+        """
+        branch_stats = CycleStatsService.get(cycle_id).get('branch', {})
+        wanted = None
+        if filters.get('branches'):
+            wanted = {stats_key(branch) for branch in filters['branches']}
+            branch_stats = {branch: counts for branch, counts in branch_stats.items() if branch in wanted}
+        
+        # Distinct students as ID sets, so merging cycles does not count a student twice
+        students = CycleStatsService.get_students(cycle_id, wanted)
+        empty = {'applied': set(), 'selected': set()}
+        
+        return {
+            branch: {
+                'studentsApplied': students.get(branch, empty)['applied'],
+                'studentsSelected': students.get(branch, empty)['selected'],
+                'totalApplications': counts.get('applications', 0),
+                'selectedApplications': counts.get('selected', 0),
+                'highestPackage': counts.get('highestPackage', 0),
+                'totalPackage': counts.get('packageTotal', 0),
+                'packageCount': counts.get('packageCount', 0)
+            }
+            for branch, counts in branch_stats.items()
+        }
+    
+    @staticmethod
+    def _branch_wise_rows(branch_data):
+        """
+        Turn merged per-branch aggregates into report rows.
+        
+        Distinct students are sets of IDs, so a student active in several
+        merged cycles is counted once.
+        
+        Args:
+            branch_data: Dictionary mapping branch to its aggregates
             
-        except Exception as e:
-            print(f"Error generating branch-wise statistics: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-            return []
+        Returns:
+            List of report data items
+        """
+        # Get total students by branch from the database
+        branch_counts = {}
+        if branch_data:
+            branch_counts = {
+                stats_key(row['_id']): row['count']
+                for row in mongo.db.student.aggregate([
+                    {'$group': {'_id': '$major', 'count': {'$sum': 1}}}
+                ])
+            }
+        
+        report_data = []
+        for branch, data in branch_data.items():
+            total_students = branch_counts.get(stats_key(branch), 0)
+            students_applied = len(data.get('studentsApplied', ()))
+            students_selected = len(data.get('studentsSelected', ()))
+            applications = data.get('totalApplications', 0)
+            selected = data.get('selectedApplications', 0)
+            package_count = data.get('packageCount', 0)
+            avg_package = data.get('totalPackage', 0) / package_count if package_count > 0 else 0
+            
+            report_data.append({
+                'branch': branch,
+                'totalStudents': total_students,
+                'studentsApplied': students_applied,
+                'studentsPlaced': students_selected,
+                'totalApplications': applications,
+                'successfulApplications': selected,
+                'highestPackage': f"{data.get('highestPackage', 0)} LPA",
+                'averagePackage': f"{avg_package:.2f} LPA",
+                'placementPercentage': f"{(students_selected / total_students * 100):.2f}%" if total_students > 0 else "0%",
+                'applicationSuccessRate': f"{(selected / applications * 100):.2f}%" if applications > 0 else "0%"
+            })
+        
+        # Sort by placement percentage (descending)
+        report_data.sort(key=lambda x: float(x['placementPercentage'].replace('%', '')), reverse=True)
+        return report_data
     
     @staticmethod
     def _generate_ctc_analysis(filters):
         """
         Generate a CTC (package) analysis report.
         
+        Selected applications are joined with their job's numeric package and
+        the student's branch in one aggregation; bucketing and summary
+        statistics are then computed with vectorized NumPy operations.
+        
         Args:
             filters: Dictionary containing filter criteria
             
         Returns:
             List of report data items
         """
-        try:
-            cycle_id = filters.get('cycleId')
-            if not cycle_id:
-                return []
-            
-            # Get all jobs from the cycle
-            job_query = {'cycleId': cycle_id}
-            
-            # Apply company filter if specified
-            if 'companies' in filters and filters['companies']:
-                job_query['company'] = {'$in': filters['companies']}
-                
-            # Apply package range filter
-            # We'll handle package filtering in memory since we need to parse strings
-            
-            jobs = list(mongo.db.jobs.find(job_query))
-            
-            # Filter jobs based on package if specified
-            filtered_jobs = []
-            min_package = None
-            max_package = None
-            
-            if 'minPackage' in filters and filters['minPackage']:
-                try:
-                    min_package = float(filters['minPackage'])
-                except:
-                    pass
-                    
-            if 'maxPackage' in filters and filters['maxPackage']:
-                try:
-                    max_package = float(filters['maxPackage'])
-                except:
-                    pass
-            
-            for job in jobs:
-                try:
-                    package_str = job.get('package', '0')
-                    if isinstance(package_str, str):
-                        package = float(package_str.replace('LPA', '').strip())
-                    else:
-                        package = float(package_str)
-                        
-                    # Apply package filters
-                    if min_package is not None and package < min_package:
-                        continue
-                    if max_package is not None and package > max_package:
-                        continue
-                        
-                    filtered_jobs.append(job)
-                except:
-                    # If we can't parse the package, include the job anyway
-                    filtered_jobs.append(job)
-            
-            jobs = filtered_jobs
-            job_ids = [str(job['_id']) for job in jobs]
-            
-            print(f"Found {len(jobs)} jobs after filtering")
-            
-            # Get all successful applications for these jobs
-            applications = []
-            if job_ids:
-                # Try multiple field names for jobId in applications collection
-                for job_field in ['jobId', 'job_id', 'job']:
-                    # First try with 'selected' status
-                    for status_value in ['selected', 'placed', 'offered', 'accepted']:
-                        app_query = {
-                            job_field: {'$in': job_ids},
-                            'status': status_value
-                        }
-                        apps = list(mongo.db.applications.find(app_query))
-                        if apps:
-                            print(f"Found {len(apps)} applications with status '{status_value}' using field '{job_field}'")
-                            applications.extend(apps)
-            
-            # If no applications found, try without status filter
-            if not applications:
-                for job_field in ['jobId', 'job_id', 'job']:
-                    app_query = {job_field: {'$in': job_ids}}
-                    apps = list(mongo.db.applications.find(app_query))
-                    if apps:
-                        print(f"Found {len(apps)} applications (any status) using field '{job_field}'")
-                        # Filter for selected applications manually
-                        selected_apps = [
-                            app for app in apps 
-                            if app.get('status', '').lower() in ['selected', 'placed', 'offered', 'accepted']
-                        ]
-                        if selected_apps:
-                            print(f"Filtered to {len(selected_apps)} selected applications")
-                            applications.extend(selected_apps)
-            
-            print(f"Total applications after filtering: {len(applications)}")
-            
-            # Identify student collection and branch field
-            student_collections_to_try = ['students', 'student']
-            branch_fields_to_try = ['major', 'branch', 'department']
-            
-            collection_name = None
-            branch_field = None
-            
-            for coll_name in student_collections_to_try:
-                collection = getattr(mongo.db, coll_name, None)
-                if not collection:
-                    continue
-                    
-                # Check which branch field is available
-                for field in branch_fields_to_try:
-                    # Try to find one document with this field
-                    sample = collection.find_one({field: {"$exists": True}})
-                    if sample:
-                        collection_name = coll_name
-                        branch_field = field
-                        break
-                        
-                if collection_name and branch_field:
-                    break
-                
-            if not collection_name or not branch_field:
-                print(f"Could not determine student collection or branch field")
-                return []
-            
-            print(f"Using collection '{collection_name}' with branch field '{branch_field}'")
-            collection = getattr(mongo.db, collection_name)
-            
-            # Get student IDs from applications
-            student_ids = []
-            for app in applications:
-                # Try multiple field names for studentId
-                for field_name in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                    if field_name in app:
-                        student_ids.append(str(app[field_name]))
-                        break
+        return ReportService._ctc_rows(ReportService._ctc_partials(filters))
+    
+    @staticmethod
+    def _ctc_partials(filters):
+        """
+        Collect the offers (selected applications with their package) of one cycle.
+        
+        Args:
+            filters: Dictionary containing filter criteria
             
-            # Get student details
-            students = {}
-            for student_id in student_ids:
-                try:
-                    # Try with ObjectId
-                    try:
-                        student = collection.find_one({'_id': to_object_id(student_id)})
-                        if student:
-                            students[student_id] = student
-                            continue
-                    except:
-                        pass
-                        
-                    # Try with string ID in various fields
-                    for id_field in ['_id', 'id', 'studentId', 'student_id', 'userId', 'user_id']:
-                        try:
-                            student = collection.find_one({id_field: student_id})
-                            if student:
-                                students[student_id] = student
-                                break
-                        except:
-                            pass
-                except Exception as e:
-                    print(f"Error finding student {student_id}: {e}")
-            
-            # Create package ranges
-            ranges = [
-                {'min': 0, 'max': 5, 'label': '0-5 LPA', 'count': 0, 'students': []},
-                {'min': 5, 'max': 10, 'label': '5-10 LPA', 'count': 0, 'students': []},
-                {'min': 10, 'max': 15, 'label': '10-15 LPA', 'count': 0, 'students': []},
-                {'min': 15, 'max': 20, 'label': '15-20 LPA', 'count': 0, 'students': []},
-                {'min': 20, 'max': 30, 'label': '20-30 LPA', 'count': 0, 'students': []},
-                {'min': 30, 'max': float('inf'), 'label': '30+ LPA', 'count': 0, 'students': []}
-            ]
-            
-            # Process job offers
-            for app in applications:
-                # Extract fields from application
-                student_id = None
-                for student_field in ['studentId', 'student_id', 'student', 'userId', 'user_id']:
-                    if student_field in app:
-                        student_id = str(app[student_field])
-                        break
-                    
-                job_id = None
-                for job_field in ['jobId', 'job_id', 'job']:
-                    if job_field in app:
-                        job_id = str(app[job_field])
-                        break
-                
-                if not student_id or not job_id:
-                    continue
-                    
-                student = students.get(student_id)
-                
-                if not student:
-                    print(f"No student found for ID {student_id}")
-                    continue
-                
-                # Determine branch
-                branch = 'Unknown'
-                for field in branch_fields_to_try:
-                    if field in student and student[field]:
-                        branch = student[field]
-                        break
-                
-                # Apply branch filter if specified
-                if 'branches' in filters and filters['branches'] and branch not in filters['branches']:
-                    continue
-                
-                job = next((j for j in jobs if str(j['_id']) == job_id), None)
-                
-                if not job:
-                    print(f"No job found for ID {job_id}")
-                    continue
-                
-                # Process package information
-                try:
-                    package_str = job.get('package', '0')
-                    if isinstance(package_str, str):
-                        package = float(package_str.replace('LPA', '').strip())
-                    else:
-                        package = float(package_str)
-                    
-                    # Find appropriate range
-                    for range_info in ranges:
-                        if range_info['min'] <= package < range_info['max']:
-                            range_info['count'] += 1
-                            
-                            # Get student ID and name with fallbacks
-                            display_student_id = student.get('studentId') or student.get('student_id') or student.get('roll_number') or student_id
-                            student_name = student.get('name', 'Unknown')
-                            
-                            range_info['students'].append({
-                                'studentId': display_student_id,
-                                'studentName': student_name,
-                                'branch': branch,
-                                'company': job.get('company', ''),
-                                'role': job.get('role', ''),
-                                'package': package_str if isinstance(package_str, str) else f"{package_str} LPA"
-                            })
-                            break
-                except Exception as e:
-                    print(f"Error processing package for job {job_id}: {e}")
-            
-            # Format final data
-            report_data = []
-            
-            # Add range-based summary
-            for range_info in ranges:
-                if range_info['count'] > 0:
-                    report_data.append({
-                        'packageRange': range_info['label'],
-                        'count': range_info['count'],
-                        'percentage': f"{(range_info['count'] / len(applications) * 100):.2f}%" if applications else "0%"
-                    })
-            
-            # Add individual student records for detailed view
-            for range_info in ranges:
-                for student in range_info['students']:
-                    report_data.append({
-                        'packageRange': range_info['label'],
-                        'studentId': student['studentId'],
-                        'studentName': student['studentName'],
-                        'branch': student['branch'],
-                        'company': student['company'],
-                        'role': student['role'],
-                        'package': student['package']
-                    })
-            
-            return report_data
+        Returns:
+            Dictionary with the offers under ``all``
+        """
+        cycle_id = filters.get('cycleId')
+        if not cycle_id:
+            return {}
+        
+        # Get all jobs from the cycle with a known package
+        job_query = {'cycleId': cycle_id, 'packageValue': {'$ne': None}}
+        
+        # Apply company filter if specified
+        if 'companies' in filters and filters['companies']:
+            job_query['company'] = {'$in': filters['companies']}
+        
+        # Apply package range filter if specified
+        package_range = ReportService._package_range_query(filters)
+        if package_range:
+            job_query['packageValue'] = package_range
+        
+        pipeline = [
+            {'$match': job_query},
+            {'$lookup': {
+                'from': 'applications',
+                'localField': '_id',
+                'foreignField': 'job_id',
+                'as': 'application'
+            }},
+            {'$unwind': '$application'},
+            {'$match': {'application.status': {'$in': ['selected', 'placed', 'offered', 'accepted']}}},
+            {'$lookup': {
+                'from': 'student',
+                'localField': 'application.student_id',
+                'foreignField': 'user_id',
+                'as': 'student'
+            }},
+            {'$unwind': '$student'},
+            {'$addFields': {
+                'branch': {'$ifNull': ['$student.major', {'$ifNull': ['$student.branch', 'Unknown']}]}
+            }}
+        ]
+        
+        # Apply branch filter if specified
+        if 'branches' in filters and filters['branches']:
+            pipeline.append({'$match': {'branch': {'$in': filters['branches']}}})
+        
+        pipeline.append({'$project': {
+            '_id': 0,
+            'studentId': {'$toString': {'$ifNull': [
+                '$student.student_id',
+                {'$ifNull': ['$student.roll_number', '$application.student_id']}
+            ]}},
+            'studentName': {'$ifNull': ['$student.name', 'Unknown']},
+            'branch': 1,
+            'company': {'$ifNull': ['$company', '']},
+            'role': {'$ifNull': ['$role', '']},
+            'package': {'$ifNull': ['$package', '']},
+            'packageValue': 1
+        }})
+        
+        offers = list(mongo.db.jobs.aggregate(
+            pipeline,
+            allowDiskUse=True,
+            batchSize=ReportService._cursor_batch_size()
+        ))
+        return {'all': {'offers': offers}}
+    
+    @staticmethod
+    def _ctc_rows(partials):
+        """
+        Bucket merged offers by package and compute the summary statistics.
+        
+        Args:
+            partials: Dictionary with the offers under ``all``
             
-        except Exception as e:
-            print(f"Error generating CTC analysis: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
+        Returns:
+            List of report data items
+        """
+        offers = partials.get('all', {}).get('offers', [])
+        if not offers:
             return []
+        
+        packages = np.fromiter((offer['packageValue'] for offer in offers), dtype=float, count=len(offers))
+        
+        # Package ranges: [0, 5), [5, 10), ... [30, inf)
+        edges = np.array([5, 10, 15, 20, 30])
+        labels = ['0-5 LPA', '5-10 LPA', '10-15 LPA', '15-20 LPA', '20-30 LPA', '30+ LPA']
+        buckets = np.digitize(packages, edges)
+        counts = np.bincount(buckets, minlength=len(labels))
+        
+        # Format final data
+        report_data = []
+        
+        # Add range-based summary
+        for index, label in enumerate(labels):
+            if counts[index] > 0:
+                report_data.append({
+                    'packageRange': label,
+                    'count': int(counts[index]),
+                    'percentage': f"{(counts[index] / len(offers) * 100):.2f}%"
+                })
+        
+        # Add overall statistics
+        p25, median, p75, p90 = np.percentile(packages, [25, 50, 75, 90])
+        report_data.append({
+            'packageRange': 'All',
+            'count': len(offers),
+            'percentage': '100.00%',
+            'lowestPackage': f"{packages.min():.2f} LPA",
+            'highestPackage': f"{packages.max():.2f} LPA",
+            'meanPackage': f"{packages.mean():.2f} LPA",
+            'medianPackage': f"{median:.2f} LPA",
+            'p25Package': f"{p25:.2f} LPA",
+            'p75Package': f"{p75:.2f} LPA",
+            'p90Package': f"{p90:.2f} LPA"
+        })
+        
+        # Add individual student records for detailed view, grouped by range
+        for index in np.argsort(buckets, kind='stable'):
+            offer = offers[index]
+            package = offer['package']
+            report_data.append({
+                'packageRange': labels[buckets[index]],
+                'studentId': offer['studentId'],
+                'studentName': offer['studentName'],
+                'branch': offer['branch'],
+                'company': offer['company'],
+                'role': offer['role'],
+                'package': package if isinstance(package, str) else f"{package} LPA"
+            })
+        
+        return report_data
     
     @staticmethod
     def _generate_job_applicants(filters):
         """
         Generate a report of job applicants with resume links.
-        """
-        try:
-            logger = current_app.logger
-            logger.info(f"JOB APPLICANTS REPORT - Starting generation with filters: {filters}")
-            job_id = filters.get('jobId')
-            if not job_id:
-                logger.warning("JOB APPLICANTS REPORT - No jobId provided in filters")
-                return []
-            
-            logger.info(f"JOB APPLICANTS REPORT - Processing job ID: {job_id}")
-            
-            # Build query to get applications for this job
-            try:
-                object_job_id = to_object_id(job_id)
-                app_query = {'job_id': object_job_id}
-                logger.info(f"JOB APPLICANTS REPORT - Successfully converted job_id to ObjectId")
-            except Exception as e:
-                logger.error(f"JOB APPLICANTS REPORT - Failed to convert job_id to ObjectId: {e}")
-                app_query = {'job_id': job_id}  # Try with string version
-            
-            # Apply student filter if specified
-            if 'studentIds' in filters and filters['studentIds']:
-                logger.info(f"JOB APPLICANTS REPORT - Filtering by student IDs: {filters['studentIds']}")
-                try:
-                    student_ids = [to_object_id(id) for id in filters['studentIds']]
-                    app_query['student_id'] = {'$in': student_ids}
-                except Exception as e:
-                    logger.error(f"JOB APPLICANTS REPORT - Error converting student IDs: {e}")
-            
-            # Apply status filter if specified
-            if 'status' in filters and filters['status']:
-                logger.info(f"JOB APPLICANTS REPORT - Filtering by status: {filters['status']}")
-                app_query['status'] = filters['status']
-            
-            # Get applications
-            logger.info(f"JOB APPLICANTS REPORT - Query for applications: {app_query}")
-            applications = list(mongo.db.applications.find(app_query))
-            logger.info(f"JOB APPLICANTS REPORT - Found {len(applications)} applications")
-            
-            # Check collection names and document count
-            collection_names = mongo.db.list_collection_names()
-            logger.info(f"JOB APPLICANTS REPORT - Available collections: {collection_names}")
-            logger.info(f"JOB APPLICANTS REPORT - Applications count: {mongo.db.applications.count_documents({})}")
-            
-            # If no applications found, dump a sample application to see structure
-            if mongo.db.applications.count_documents({}) > 0:
-                sample_app = mongo.db.applications.find_one({})
-                logger.info(f"JOB APPLICANTS REPORT - Sample application structure: {sample_app}")
-                logger.info(f"JOB APPLICANTS REPORT - Sample application fields: {list(sample_app.keys())}")
-            
-            # Try different field names if nothing found
-            if not applications:
-                logger.warning("JOB APPLICANTS REPORT - No applications found, trying alternate field names")
-                alt_queries = [
-                    {'jobId': object_job_id},
-                    {'jobId': job_id},
-                    {'job': object_job_id},
-                    {'job': job_id}
-                ]
-                
-                for idx, query in enumerate(alt_queries):
-                    logger.info(f"JOB APPLICANTS REPORT - Trying alternate query {idx+1}: {query}")
-                    alt_applications = list(mongo.db.applications.find(query))
-                    if alt_applications:
-                        logger.info(f"JOB APPLICANTS REPORT - Found {len(alt_applications)} applications with alternate query {idx+1}")
-                        applications = alt_applications
-                        break
-            
-            # If still no applications found, check a sample job ID
-            if not applications and mongo.db.jobs.count_documents({}) > 0:
-                sample_job = mongo.db.jobs.find_one({})
-                if sample_job:
-                    sample_job_id = sample_job.get('_id')
-                    logger.info(f"JOB APPLICANTS REPORT - Sample job ID for testing: {sample_job_id}")
-                    test_applications = list(mongo.db.applications.find({'job_id': sample_job_id}))
-                    logger.info(f"JOB APPLICANTS REPORT - Applications for sample job: {len(test_applications)}")
-                    
-                    # Check if any applications exist at all
-                    all_applications = list(mongo.db.applications.find({}))
-                    logger.info(f"JOB APPLICANTS REPORT - Total applications in DB: {len(all_applications)}")
-                    if all_applications:
-                        sample_app = all_applications[0]
-                        logger.info(f"JOB APPLICANTS REPORT - Sample application: {sample_app}")
-                        logger.info(f"JOB APPLICANTS REPORT - Application job_id field name and type: {sample_app.get('job_id')} {type(sample_app.get('job_id'))}")
-            
-            # Get job details
-            try:
-                job = mongo.db.jobs.find_one({'_id': object_job_id})
-                if not job:
-                    logger.warning(f"JOB APPLICANTS REPORT - Job not found with ObjectId: {object_job_id}")
-                    job = mongo.db.jobs.find_one({'_id': job_id})  # Try string ID
-                    
-                if not job:
-                    # Try different field names
-                    logger.warning("JOB APPLICANTS REPORT - Job not found with standard queries, trying alternative fields")
-                    alt_queries = [
-                        {'id': job_id},
-                        {'jobId': job_id}
-                    ]
-                    
-                    for idx, query in enumerate(alt_queries):
-                        logger.info(f"JOB APPLICANTS REPORT - Trying alternate job query {idx+1}: {query}")
-                        alt_job = mongo.db.jobs.find_one(query)
-                        if alt_job:
-                            logger.info(f"JOB APPLICANTS REPORT - Found job with alternate query {idx+1}")
-                            job = alt_job
-                            break
-                
-                if job:
-                    logger.info(f"JOB APPLICANTS REPORT - Job found: {job.get('role', 'Unknown')} at {job.get('company', 'Unknown')}")
-                else:
-                    logger.error(f"JOB APPLICANTS REPORT - Job still not found after all queries, job count: {mongo.db.jobs.count_documents({})}")
-                    # Log a sample job from database
-                    sample_job = mongo.db.jobs.find_one({})
-                    if sample_job:
-                        logger.info(f"JOB APPLICANTS REPORT - Sample job structure: {sample_job}")
-                        logger.info(f"JOB APPLICANTS REPORT - Sample job fields: {list(sample_job.keys())}")
-                    return []
-            except Exception as e:
-                logger.error(f"JOB APPLICANTS REPORT - Error fetching job: {e}")
-                return []
-            
-            # Get unique student IDs
-            if not applications:
-                logger.warning("JOB APPLICANTS REPORT - No applications to process")
-                return []
-            
-            student_ids = []
-            for app in applications:
-                try:
-                    student_id = app.get('student_id')
-                    if student_id:
-                        student_ids.append(student_id)
-                    else:
-                        # Check for alternative field names
-                        for field in ['studentId', 'student', 'userId', 'user_id']:
-                            if field in app:
-                                logger.info(f"JOB APPLICANTS REPORT - Found student ID in field '{field}': {app[field]}")
-                                student_ids.append(app[field])
-                                break
-                        else:
-                            logger.warning(f"JOB APPLICANTS REPORT - No student ID field found in application: {app}")
-                except Exception as e:
-                    logger.error(f"JOB APPLICANTS REPORT - Error extracting student ID: {e}")
-            
-            student_ids = list(set([str(sid) for sid in student_ids if sid]))
-            logger.info(f"JOB APPLICANTS REPORT - Found {len(student_ids)} unique student IDs")
-            
-            # Get student details
-            students = {}
-            for student_id in student_ids:
-                try:
-                    object_id = to_object_id(student_id)
-                    
-                    # Try different field combinations
-                    queries = [
-                        {'user_id': object_id},
-                    ]
-                    
-                    for idx, query in enumerate(queries):
-                        student = mongo.db.student.find_one(query)
-                        if student:
-                            logger.info(f"JOB APPLICANTS REPORT - Found student with query {idx+1}: {student.get('name', 'Unknown')}")
-                            students[student_id] = student
-                            break
-                    else:
-                        logger.warning(f"JOB APPLICANTS REPORT - No student found for ID: {student_id}")
-                except Exception as e:
-                    logger.error(f"JOB APPLICANTS REPORT - Error finding student {student_id}: {e}")
-            
-            logger.info(f"JOB APPLICANTS REPORT - Found {len(students)} students out of {len(student_ids)} IDs")
-            
-            # Build report data
-            report_data = []
-            
-            for app in applications:
-                try:
-                    # Extract student_id from application using various field names
-                    student_id = None
-                    for field in ['student_id', 'studentId', 'student', 'userId', 'user_id']:
-                        if field in app:
-                            student_id = str(app[field])
-                            break
-                    
-                    if not student_id:
-                        logger.warning(f"JOB APPLICANTS REPORT - No student ID found in application: {app}")
-                        continue
-                    
-                    logger.info(f"JOB APPLICANTS REPORT - Processing application for student ID: {student_id}")
-                    
-                    student = students.get(student_id)
-                    if not student:
-                        logger.warning(f"JOB APPLICANTS REPORT - No student data found for ID: {student_id}")
-                        continue
-                    
-                    # Try to find a resume
-                    resume_link = ""
-                    resume_name = ""
-                    try:
-                        # Try various queries to find resume
-                        resume_queries = [
-                            {'student_id': student_id},
-                            {'user_id': student_id},
-                            {'student_id': to_object_id(student_id)},
-                            {'user_id': to_object_id(student_id)}
-                        ]
-                        
-                        for query in resume_queries:
-                            resumes = list(mongo.db.resumes.find(query))
-                            if resumes:
-                                # Sort by upload date if available
-                                sorted_resumes = sorted(
-                                    resumes,
-                                    key=lambda r: r.get('created_at', datetime.min),
-                                    reverse=True
-                                )
-                                latest_resume = sorted_resumes[0]
-                                resume_link = latest_resume.get('file_url', '')
-                                resume_name = latest_resume.get('resume_name', '')
-                                logger.info(f"JOB APPLICANTS REPORT - Found resume: {resume_name}")
-                                break
-                        else:
-                            logger.warning(f"JOB APPLICANTS REPORT - No resume found for student: {student_id}")
-                    except Exception as e:
-                        logger.error(f"JOB APPLICANTS REPORT - Error finding resume: {e}")
-                    
-                    # Add the data for this student
-                    student_data = {
-                        'applicationId': str(app.get('_id', '')),
-                        'studentId': student.get('student_id', ''),
-                        'studentName': student.get('name', ''),
-                        'email': student.get('email', ''),
-                        'phone': student.get('phone', ''),
-                        'major': student.get('major', ''),
-                        'program': student.get('program', ''),
-                        'cgpa': student.get('cgpa', ''),
-                        'status': app.get('status', ''),
-                        'currentStage': app.get('current_stage', ''),
-                        'appliedOn': app.get('created_at', '').strftime('%Y-%m-%d') if isinstance(app.get('created_at'), datetime) else '',
-                        'jobRole': job.get('role', ''),
-                        'company': job.get('company', ''),
-                        'resumeLink': resume_link,
-                        'resumeName': resume_name
-                    }
-                    report_data.append(student_data)
-                    logger.info(f"JOB APPLICANTS REPORT - Added data for student: {student_data['studentName']}")
-                except Exception as e:
-                    logger.error(f"JOB APPLICANTS REPORT - Error processing application: {e}")
-            
-            logger.info(f"JOB APPLICANTS REPORT - Completed with {len(report_data)} records")
-            return report_data
+        
+        Students and their latest resume are joined onto the job's
+        applications in a single aggregation, so the number of round trips
+        does not depend on the number of applicants.
+        
+        Args:
+            filters: Dictionary containing filter criteria
             
-        except Exception as e:
-            current_app.logger.error(f"JOB APPLICANTS REPORT - CRITICAL ERROR: {str(e)}")
-            import traceback
-            current_app.logger.error(traceback.format_exc())
+        Returns:
+            List of report data items
+        """
+        logger = current_app.logger
+        job_id = filters.get('jobId')
+        if not job_id:
+            logger.warning("JOB APPLICANTS REPORT - No jobId provided in filters")
+            return []
+        
+        object_job_id = to_object_id(job_id)
+        job = mongo.db.jobs.find_one({'_id': object_job_id}, {'role': 1, 'company': 1})
+        if not job:
+            logger.warning(f"JOB APPLICANTS REPORT - Job not found: {job_id}")
             return []
+        
+        app_query = {'job_id': object_job_id}
+        
+        # Apply student filter if specified
+        if 'studentIds' in filters and filters['studentIds']:
+            app_query['student_id'] = {'$in': [to_object_id(id) for id in filters['studentIds']]}
+        
+        # Apply status filter if specified
+        if 'status' in filters and filters['status']:
+            app_query['status'] = filters['status']
+        
+        pipeline = [
+            {'$match': app_query},
+            # Only the profile fields the report emits, not the student's section data
+            {'$lookup': {
+                'from': 'student',
+                'let': {'userId': '$student_id'},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$user_id', '$$userId']}}},
+                    {'$limit': 1},
+                    {'$project': {
+                        '_id': 0, 'student_id': 1, 'name': 1, 'email': 1,
+                        'phone': 1, 'major': 1, 'program': 1, 'cgpa': 1
+                    }}
+                ],
+                'as': 'student'
+            }},
+            {'$unwind': '$student'},
+            # Latest resume of each applicant
+            {'$lookup': {
+                'from': 'resumes',
+                'let': {'userId': '$student_id'},
+                'pipeline': [
+                    {'$match': {'$expr': {'$eq': ['$student_id', '$$userId']}}},
+                    {'$sort': {'created_at': -1}},
+                    {'$limit': 1},
+                    {'$project': {'file_url': 1, 'resume_name': 1}}
+                ],
+                'as': 'resume'
+            }},
+            {'$project': {
+                '_id': 0,
+                'applicationId': {'$toString': '$_id'},
+                'studentId': {'$ifNull': ['$student.student_id', '']},
+                'studentName': {'$ifNull': ['$student.name', '']},
+                'email': {'$ifNull': ['$student.email', '']},
+                'phone': {'$ifNull': ['$student.phone', '']},
+                'major': {'$ifNull': ['$student.major', '']},
+                'program': {'$ifNull': ['$student.program', '']},
+                'cgpa': {'$ifNull': ['$student.cgpa', '']},
+                'status': {'$ifNull': ['$status', '']},
+                'currentStage': {'$ifNull': ['$current_stage', '']},
+                'appliedOn': {'$cond': [
+                    {'$eq': [{'$type': '$created_at'}, 'date']},
+                    {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}},
+                    ''
+                ]},
+                'jobRole': {'$literal': job.get('role', '')},
+                'company': {'$literal': job.get('company', '')},
+                'resumeLink': {'$ifNull': [{'$first': '$resume.file_url'}, '']},
+                'resumeName': {'$ifNull': [{'$first': '$resume.resume_name'}, '']}
+            }}
+        ]
+        
+        cursor = mongo.db.applications.aggregate(
+            pipeline,
+            allowDiskUse=True,
+            batchSize=ReportService._cursor_batch_size()
+        )
+        report_data = list(cursor)
+        
+        logger.info(f"JOB APPLICANTS REPORT - Completed with {len(report_data)} records for job {job_id}")
+        return report_data
@@ -0,0 +1,403 @@
+# app/services/student_index_service.py
+from app import mongo
+from flask import current_app
+from datetime import datetime, timedelta
+import threading
+import time
+
+import numpy as np
+
+
+# Fields loaded into the index from each student document
+STUDENT_FIELDS = {
+    'user_id': 1, 'name': 1, 'email': 1, 'student_id': 1, 'major': 1,
+    'gender': 1, 'cgpa': 1, 'batch': 1, 'program': 1
+}
+
+# Refreshes re-read a little before the last one, for writes committed late
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+def _cgpa_value(student):
+    """Read a CGPA the way the eligibility check does: missing is 0, null or unreadable is NaN."""
+    try:
+        return float(student.get('cgpa', 0))
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def _placed_cycles(query):
+    """
+    Map students to the cycles in which they have a selected application.
+
+    Args:
+        query: Extra filter on the applications to read
+
+    Returns:
+        Dictionary mapping user ID to a frozenset of cycle IDs
+    """
+    selections = list(mongo.db.applications.find({**query, 'status': 'selected'}, {'student_id': 1, 'job_id': 1}))
+    job_ids = list({selection.get('job_id') for selection in selections})
+    job_cycles = {
+        job['_id']: str(job['cycleId'])
+        for job in mongo.db.jobs.find({'_id': {'$in': job_ids}}, {'cycleId': 1})
+        if job.get('cycleId')
+    }
+
+    placed = {}
+    for selection in selections:
+        cycle_id = job_cycles.get(selection.get('job_id'))
+        if cycle_id:
+            placed.setdefault(selection['student_id'], set()).add(cycle_id)
+    return {user_id: frozenset(cycles) for user_id, cycles in placed.items()}
+
+
+def _matches(column, codes):
+    """Boolean mask of the entries of a coded column that are one of the codes."""
+    if len(codes) == 1:
+        return column == codes[0]
+    return np.isin(column, codes)
+
+
+class _Snapshot:
+    """
+    One immutable, columnar copy of the student collection.
+
+    Categorical fields are stored as integer codes into per-field vocabularies.
+    A refresh builds a new snapshot and swaps it in, so readers never see a
+    half-applied update.
+    """
+
+    def __init__(self, students, placed):
+        self.vocab = {'branch': {}, 'gender': {}, 'batch': {}, 'program': {}}
+        self.rows = {}
+        self.user_rows = {}
+        self.students = []
+        columns = {'cgpa': [], 'branch': [], 'gender': [], 'batch': [], 'program': []}
+
+        for student in students:
+            self.rows[student['_id']] = self.user_rows[student.get('user_id')] = len(self.students)
+            self.students.append(self._summary(student))
+            for field, value in self._encode(student).items():
+                columns[field].append(value)
+
+        self.cgpa = np.array(columns['cgpa'], dtype=np.float64)
+        self.branch = np.array(columns['branch'], dtype=np.int32)
+        self.gender = np.array(columns['gender'], dtype=np.int32)
+        self.batch = np.array(columns['batch'], dtype=np.int32)
+        self.program = np.array(columns['program'], dtype=np.int32)
+        self.placed = dict(placed)
+
+    def code(self, field, value):
+        """Get the code of a categorical value, adding it to the vocabulary if new."""
+        vocab = self.vocab[field]
+        return vocab.setdefault(value, len(vocab))
+
+    def codes(self, field, values):
+        """Get the codes of the values already known to a vocabulary."""
+        vocab = self.vocab[field]
+        return [vocab[value] for value in values if value in vocab]
+
+    def _encode(self, student):
+        return {
+            'cgpa': _cgpa_value(student),
+            'branch': self.code('branch', student.get('major')),
+            'gender': self.code('gender', (student.get('gender') or '').lower()),
+            'batch': self.code('batch', student.get('batch')),
+            'program': self.code('program', student.get('program'))
+        }
+
+    @staticmethod
+    def _summary(student):
+        return {
+            'id': str(student['_id']),
+            'user_id': student.get('user_id'),
+            'name': student.get('name', ''),
+            'email': student.get('email', ''),
+            'rollNo': student.get('student_id', ''),
+            'branch': student.get('major', ''),
+            'cgpa': student.get('cgpa')
+        }
+
+    def placed_rows(self, cycle_id=None):
+        """
+        Get the rows of the students placed in a cycle.
+
+        Args:
+            cycle_id: The cycle to check, or None for students placed in any cycle
+
+        Returns:
+            List of row numbers
+        """
+        return [
+            self.user_rows[user_id]
+            for user_id, cycles in self.placed.items()
+            if user_id in self.user_rows and (cycle_id is None or str(cycle_id) in cycles)
+        ]
+
+    def updated(self, students, placed_changes):
+        """
+        Build a new snapshot with changed students and placed cycles applied.
+
+        Args:
+            students: Student documents that are new or changed
+            placed_changes: Dictionary mapping user ID to the cycles it is now placed in
+
+        Returns:
+            The new snapshot
+        """
+        snapshot = _Snapshot.__new__(_Snapshot)
+        snapshot.vocab = {field: dict(vocab) for field, vocab in self.vocab.items()}
+        snapshot.rows = dict(self.rows)
+        snapshot.user_rows = dict(self.user_rows)
+        snapshot.students = list(self.students)
+
+        columns = {
+            field: getattr(self, field).copy()
+            for field in ('cgpa', 'branch', 'gender', 'batch', 'program')
+        }
+        appended = {field: [] for field in columns}
+
+        for student in students:
+            summary = _Snapshot._summary(student)
+            encoded = snapshot._encode(student)
+            row = snapshot.rows.get(student['_id'])
+            if row is None:
+                snapshot.rows[student['_id']] = snapshot.user_rows[summary['user_id']] = len(snapshot.students)
+                snapshot.students.append(summary)
+                for field, value in encoded.items():
+                    appended[field].append(value)
+            else:
+                snapshot.user_rows[summary['user_id']] = row
+                snapshot.students[row] = summary
+                for field, value in encoded.items():
+                    columns[field][row] = value
+
+        for field, values in appended.items():
+            if values:
+                columns[field] = np.concatenate([columns[field], np.array(values, dtype=columns[field].dtype)])
+
+        snapshot.placed = dict(self.placed)
+        for user_id, cycles in placed_changes.items():
+            if cycles:
+                snapshot.placed[user_id] = cycles
+            else:
+                snapshot.placed.pop(user_id, None)
+
+        for field, values in columns.items():
+            setattr(snapshot, field, values)
+        return snapshot
+
+
+class StudentIndexService:
+    """
+    Per-process columnar index of students for eligibility what-if queries.
+
+    The index holds NumPy arrays of CGPA and coded branch, gender, batch and
+    program, plus the cycles each student is placed in. It is refreshed lazily: a query older than
+    STUDENT_INDEX_REFRESH_SECONDS first pulls students and applications
+    changed since the last refresh (by ``updated_at``), and a full reload every
+    STUDENT_INDEX_REBUILD_SECONDS drops deleted students. Writers of the
+    student fields above and of application statuses set ``updated_at``.
+
+    Full reloads after the first run in a background thread; queries keep
+    using the current index, refreshed incrementally, until it is swapped.
+    """
+    _snapshot = None
+    _watermark = None
+    _refreshed_at = 0
+    _rebuilt_at = 0
+    _rebuild_thread = None
+    _lock = threading.RLock()
+
+    @staticmethod
+    def ensure_indexes():
+        """Create the indexes used by incremental refreshes (students use ReportService's updated_at index)."""
+        mongo.db.applications.create_index('updated_at')
+
+    @classmethod
+    def rebuild(cls):
+        """Load every student into a fresh index."""
+        started = datetime.utcnow()
+        students = list(mongo.db.student.find({}, STUDENT_FIELDS))
+        snapshot = _Snapshot(students, _placed_cycles({}))
+
+        with cls._lock:
+            cls._snapshot = snapshot
+            cls._watermark = started - REFRESH_OVERLAP
+            cls._refreshed_at = cls._rebuilt_at = time.monotonic()
+
+    @classmethod
+    def _start_rebuild(cls, app):
+        """
+        Reload the index in a background thread, unless a reload is already running.
+
+        Args:
+            app: The Flask application
+        """
+        if cls._rebuild_thread is not None and cls._rebuild_thread.is_alive():
+            return
+
+        cls._rebuild_thread = threading.Thread(
+            target=cls._rebuild_in_background,
+            args=(app,),
+            name='student-index-rebuild',
+            daemon=True
+        )
+        cls._rebuild_thread.start()
+
+    @classmethod
+    def _rebuild_in_background(cls, app):
+        """Run one full reload with an app context; a failed reload is retried by the next query."""
+        with app.app_context():
+            try:
+                cls.rebuild()
+            except Exception as e:
+                print(f"Error rebuilding student index: {str(e)}")
+
+    @classmethod
+    def refresh(cls):
+        """Apply students and applications changed since the last refresh."""
+        started = datetime.utcnow()
+        students = list(mongo.db.student.find({'updated_at': {'$gte': cls._watermark}}, STUDENT_FIELDS))
+
+        # Students whose applications changed may have become (or stopped being) placed
+        changed = mongo.db.applications.distinct('student_id', {'updated_at': {'$gte': cls._watermark}})
+        placed_changes = {}
+        if changed:
+            placed = _placed_cycles({'student_id': {'$in': changed}})
+            placed_changes = {user_id: placed.get(user_id, frozenset()) for user_id in changed}
+
+        if students or placed_changes:
+            cls._snapshot = cls._snapshot.updated(students, placed_changes)
+        cls._watermark = started - REFRESH_OVERLAP
+        cls._refreshed_at = time.monotonic()
+
+    @classmethod
+    def get_snapshot(cls, refresh_seconds=5, rebuild_seconds=900):
+        """
+        Get the current index, refreshing it first when stale.
+
+        Only the first call loads the index in the request. Later full reloads
+        are started in the background and the current index is returned.
+
+        Args:
+            refresh_seconds: Maximum age before changed students are pulled in
+            rebuild_seconds: Maximum age before the index is reloaded entirely
+
+        Returns:
+            The current snapshot
+        """
+        now = time.monotonic()
+        if cls._snapshot is not None and now - cls._refreshed_at < refresh_seconds:
+            return cls._snapshot
+
+        with cls._lock:
+            if cls._snapshot is None:
+                cls.rebuild()
+                return cls._snapshot
+
+            now = time.monotonic()
+            if now - cls._rebuilt_at >= rebuild_seconds:
+                cls._start_rebuild(current_app._get_current_object())
+            if now - cls._refreshed_at >= refresh_seconds:
+                cls.refresh()
+            return cls._snapshot
+
+    @staticmethod
+    def eligible_mask(snapshot, eligibility, batch=None, programs=None, exclude_placed=False, cycle_id=None):
+        """
+        Evaluate eligibility rules against every student in a snapshot.
+
+        Uses the same rules as ``JobService._is_eligible``: a placed student
+        is one with a selected application to a job of the given cycle.
+
+        Args:
+            snapshot: Snapshot returned by get_snapshot
+            eligibility: Eligibility rules in the job format (branches, gender,
+                uniformCgpa, cgpa, cgpaCriteria)
+            batch: Only count students of this batch
+            programs: Only count students of these programs
+            exclude_placed: Whether students already placed are ineligible
+            cycle_id: Only students placed in this cycle are excluded (None for any cycle)
+
+        Returns:
+            Boolean NumPy array, one entry per student
+        """
+        eligibility = eligibility or {}
+        mask = _matches(snapshot.branch, snapshot.codes('branch', eligibility.get('branches', [])))
+
+        if batch is not None:
+            mask &= _matches(snapshot.batch, snapshot.codes('batch', [batch]))
+        if programs is not None:
+            mask &= _matches(snapshot.program, snapshot.codes('program', programs))
+
+        gender_req = (eligibility.get('gender') or '').lower()
+        if gender_req and gender_req != 'all':
+            mask &= _matches(snapshot.gender, snapshot.codes('gender', [gender_req]))
+
+        # NaN CGPAs compare False, so unreadable values are ineligible as in the per-student check
+        mask &= ~np.isnan(snapshot.cgpa)
+        if eligibility.get('uniformCgpa', True):
+            try:
+                mask &= snapshot.cgpa >= float(eligibility.get('cgpa', 0))
+            except (ValueError, TypeError):
+                mask[:] = False
+        else:
+            for branch, criteria in (eligibility.get('cgpaCriteria') or {}).items():
+                in_branch = _matches(snapshot.branch, snapshot.codes('branch', [branch]))
+                try:
+                    min_cgpa = float((criteria or {}).get('btech', 0))
+                except (ValueError, TypeError):
+                    mask &= ~in_branch
+                    continue
+                mask &= ~in_branch | (snapshot.cgpa >= min_cgpa)
+
+        if exclude_placed:
+            rows = snapshot.placed_rows(cycle_id)
+            if rows:
+                mask[rows] = False
+
+        return mask
+
+    @staticmethod
+    def simulate(eligibility, batch=None, programs=None, exclude_placed=False, limit=0,
+                 refresh_seconds=5, rebuild_seconds=900, cycle_id=None):
+        """
+        Count (and optionally list) the students admitted by eligibility rules.
+
+        Args:
+            eligibility: Eligibility rules in the job format
+            batch: Only count students of this batch
+            programs: Only count students of these programs
+            exclude_placed: Whether students already placed are ineligible
+            limit: Number of matching students to return (0 for counts only)
+            refresh_seconds: Maximum index age before changes are pulled in
+            rebuild_seconds: Maximum index age before a full reload
+            cycle_id: Only students placed in this cycle are excluded (None for any cycle)
+
+        Returns:
+            Dictionary with total, byBranch, students and the index size
+        """
+        snapshot = StudentIndexService.get_snapshot(refresh_seconds, rebuild_seconds)
+        mask = StudentIndexService.eligible_mask(snapshot, eligibility, batch, programs, exclude_placed, cycle_id)
+
+        branch_names = {code: name for name, code in snapshot.vocab['branch'].items()}
+        codes, counts = np.unique(snapshot.branch[mask], return_counts=True)
+
+        students = []
+        if limit:
+            for row in np.flatnonzero(mask)[:limit]:
+                summary = dict(snapshot.students[row])
+                summary.pop('user_id', None)
+                students.append(summary)
+
+        return {
+            'total': int(mask.sum()),
+            'byBranch': {
+                (branch_names.get(int(code)) or 'Unknown'): int(count)
+                for code, count in zip(codes, counts)
+            },
+            'students': students,
+            'indexedStudents': len(snapshot.students)
+        }
@@ -2,6 +2,26 @@ from venv import logger
 from app import mongo
 from bson.objectid import ObjectId
 from datetime import datetime
+from pymongo import UpdateOne
+from app.utils.cohort import parse_cohort
+from app.utils.pagination import InvalidCursor, keyset_filter, decode_cursor, next_cursor, cached_count
+
+# Department whose students receive placement cycle emails
+CYCLE_EMAIL_DEPARTMENT = 'cs'
+
+# Display names of the programs stored on students
+PROGRAM_NAMES = {'btech': 'B.Tech', 'mtech': 'M.Tech', 'phd': 'PhD'}
+
+# Sort keys of the student lists; both end in a unique field
+VERIFICATION_SORT = [('_id', 1)]
+ROLL_NUMBER_SORT = [('roll_number', 1), ('_id', 1)]
+
+# Profile fields, and profile sections whose records, must all be verified before applying
+VERIFIED_FIELDS = [
+    'name', 'email', 'phone', 'date_of_birth', 'gender', 'address', 'major',
+    'student_id', 'enrollment_year', 'expected_graduation_year', 'passport_image'
+]
+VERIFIED_SECTIONS = ['education', 'experience', 'positions', 'projects']
 
 class StudentService:
     @staticmethod
@@ -48,17 +68,22 @@ class StudentService:
             print(f"Error retrieving student by ID: {str(e)}")
             return None
     @classmethod
-    def get_students_with_pagination(cls, filters=None, page=1, per_page=20):
+    def get_students_with_pagination(cls, filters=None, page=1, per_page=20, cursor=None, include_total=True):
         """
         Retrieve students with optional filtering and pagination for admin verification
         
+        Students are listed in insertion (_id) order. Passing a cursor (an
+        empty string for the first page) switches to keyset pagination.
+        
         Args:
             filters: Dictionary of filter conditions
-            page: Page number for pagination
+            page: Page number for pagination (ignored when a cursor is given)
             per_page: Number of items per page
+            cursor: Cursor returned with the previous page, for keyset pagination
+            include_total: Whether to count all matching students
         
         Returns:
-            Tuple of (students list, total count)
+            Tuple of (students list, total count or None, next page cursor or None)
         """
         try:
             query = {}
@@ -77,21 +102,26 @@ class StudentService:
                 if filters.get('student_id'):
                     query['student_id'] = filters['student_id']
             
-            # Calculate skip value for pagination
-            skip = (page - 1) * per_page
-            
             # Get total count of students matching filters
-            total = mongo.db.student.count_documents(query)
+            total = cached_count(mongo.db.student, query) if include_total else None
             
             # Retrieve paginated students
-            students = list(mongo.db.student.find(query)
+            page_query = query
+            if cursor:
+                page_query = {'$and': [query, keyset_filter(VERIFICATION_SORT, decode_cursor(cursor, VERIFICATION_SORT))]}
+            
+            skip = 0 if cursor is not None else (page - 1) * per_page
+            students = list(mongo.db.student.find(page_query)
+                            .sort(VERIFICATION_SORT)
                             .skip(skip)
-                            .limit(per_page))
+                            .limit(per_page + 1))
             
-            return students, total
+            return students, total, next_cursor(students, VERIFICATION_SORT, per_page)
+        except InvalidCursor:
+            raise
         except Exception as e:
             print(f"Error retrieving students for verification: {str(e)}")
-            return [], 0
+            return [], 0, None
     @staticmethod
     def get_student_by_email(email):
         """
@@ -167,6 +197,11 @@ class StudentService:
             if 'major' in student_data:
                 student_data['branch'] = student_data['major']
             
+            # Batch, department and program are stored so cycle rosters can query them directly
+            for field, value in parse_cohort(student_data.get('email')).items():
+                student_data.setdefault(field, value)
+            student_data.setdefault('is_verified', False)
+            
             result = mongo.db.student.insert_one(student_data)
             return str(result.inserted_id)
         except Exception as e:
@@ -207,6 +242,10 @@ class StudentService:
                 {'$set': update_data}
             )
             
+            if any(field.startswith('verification') for field in update_data):
+                student_id = StudentService.get_student_id_by_user_id(user_id)
+                StudentService.refresh_verified_flag(student_id)
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating student by user ID: {str(e)}")
@@ -237,23 +276,32 @@ class StudentService:
                 {'$set': update_data}
             )
             
+            if any(field.startswith('verification') for field in update_data):
+                StudentService.refresh_verified_flag(student_id)
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating student: {str(e)}")
             return False
     
     @staticmethod
-    def get_all_students(filters=None, page=1, per_page=20):
+    def get_all_students(filters=None, page=1, per_page=20, cursor=None, include_total=True):
         """
         Get all students with optional filtering and pagination.
         
+        Students are listed by roll number. Passing a cursor (an empty string
+        for the first page) switches to keyset pagination.
+        
         Args:
             filters: Optional filters to apply
-            page: Page number
+            page: Page number (ignored when a cursor is given)
             per_page: Items per page
+            cursor: Cursor returned with the previous page, for keyset pagination
+            include_total: Whether to count all matching students
             
         Returns:
-            List of student documents and total count
+            List of student documents, total count (None if not requested)
+            and the cursor of the next page (None on the last page)
         """
         try:
             query = {}
@@ -270,18 +318,24 @@ class StudentService:
                     query['batch'] = filters['batch']
             
             # Get total count
-            total = mongo.db.student.count_documents(query)
+            total = cached_count(mongo.db.student, query) if include_total else None
             
-            # Get paginated results
-            students = list(mongo.db.student.find(query)
-                        .sort('roll_number', 1)
-                        .skip((page - 1) * per_page)
-                        .limit(per_page))
+            page_query = query
+            if cursor:
+                page_query = {'$and': [query, keyset_filter(ROLL_NUMBER_SORT, decode_cursor(cursor, ROLL_NUMBER_SORT))]}
             
-            return students, total
+            # Get paginated results
+            students = list(mongo.db.student.find(page_query)
+                        .sort(ROLL_NUMBER_SORT)
+                        .skip(0 if cursor is not None else (page - 1) * per_page)
+                        .limit(per_page + 1))
+            
+            return students, total, next_cursor(students, ROLL_NUMBER_SORT, per_page)
+        except InvalidCursor:
+            raise
         except Exception as e:
             print(f"Error retrieving students: {str(e)}")
-            return [], 0
+            return [], 0, None
     
     @staticmethod
     def delete_student(student_id):
@@ -462,6 +516,7 @@ class StudentService:
             education_data['updated_at'] = datetime.utcnow()
             
             result = mongo.db.education.insert_one(education_data)
+            StudentService.refresh_verified_flag(education_data.get('student_id'))
             return str(result.inserted_id)
         except Exception as e:
             print(f"Error adding education record: {str(e)}")
@@ -492,6 +547,11 @@ class StudentService:
                 {'$set': update_data}
             )
             
+            # An edit can change the record's verification
+            if result.modified_count:
+                education = mongo.db.education.find_one({'_id': education_id}, {'student_id': 1})
+                StudentService.refresh_verified_flag((education or {}).get('student_id'))
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating education record: {str(e)}")
@@ -513,8 +573,10 @@ class StudentService:
             if isinstance(education_id, str):
                 education_id = ObjectId(education_id)
                 
-            result = mongo.db.education.delete_one({'_id': education_id})
-            return result.deleted_count > 0
+            education = mongo.db.education.find_one_and_delete({'_id': education_id}, projection={'student_id': 1})
+            if education:
+                StudentService.refresh_verified_flag(education.get('student_id'))
+            return education is not None
         except Exception as e:
             print(f"Error deleting education record: {str(e)}")
             return False
@@ -550,6 +612,7 @@ class StudentService:
                 {'_id': education_id},
                 {'$set': update_data}
             )
+            StudentService.refresh_verified_flag(education.get('student_id'))
 
             return result.modified_count > 0
         except Exception as e:
@@ -641,6 +704,7 @@ class StudentService:
             experience_data['updated_at'] = datetime.utcnow()
             
             result = mongo.db.experience.insert_one(experience_data)
+            StudentService.refresh_verified_flag(experience_data.get('student_id'))
             return str(result.inserted_id)
         except Exception as e:
             print(f"Error adding experience record: {str(e)}")
@@ -671,6 +735,11 @@ class StudentService:
                 {'$set': update_data}
             )
             
+            # An edit can change the record's verification
+            if result.modified_count:
+                experience = mongo.db.experience.find_one({'_id': experience_id}, {'student_id': 1})
+                StudentService.refresh_verified_flag((experience or {}).get('student_id'))
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating experience record: {str(e)}")
@@ -692,8 +761,10 @@ class StudentService:
             if isinstance(experience_id, str):
                 experience_id = ObjectId(experience_id)
                 
-            result = mongo.db.experience.delete_one({'_id': experience_id})
-            return result.deleted_count > 0
+            experience = mongo.db.experience.find_one_and_delete({'_id': experience_id}, projection={'student_id': 1})
+            if experience:
+                StudentService.refresh_verified_flag(experience.get('student_id'))
+            return experience is not None
         except Exception as e:
             print(f"Error deleting experience record: {str(e)}")
             return False
@@ -729,6 +800,7 @@ class StudentService:
                 {'_id': experience_id},
                 {'$set': update_data}
             )
+            StudentService.refresh_verified_flag(experience.get('student_id'))
 
             return result.modified_count > 0
         except Exception as e:
@@ -816,6 +888,7 @@ class StudentService:
             position_data['updated_at'] = datetime.utcnow()
             
             result = mongo.db.positions.insert_one(position_data)
+            StudentService.refresh_verified_flag(position_data.get('student_id'))
             return str(result.inserted_id)
         except Exception as e:
             print(f"Error adding position record: {str(e)}")
@@ -846,6 +919,11 @@ class StudentService:
                 {'$set': update_data}
             )
             
+            # An edit can change the record's verification
+            if result.modified_count:
+                position = mongo.db.positions.find_one({'_id': position_id}, {'student_id': 1})
+                StudentService.refresh_verified_flag((position or {}).get('student_id'))
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating position record: {str(e)}")
@@ -867,8 +945,10 @@ class StudentService:
             if isinstance(position_id, str):
                 position_id = ObjectId(position_id)
                 
-            result = mongo.db.positions.delete_one({'_id': position_id})
-            return result.deleted_count > 0
+            position = mongo.db.positions.find_one_and_delete({'_id': position_id}, projection={'student_id': 1})
+            if position:
+                StudentService.refresh_verified_flag(position.get('student_id'))
+            return position is not None
         except Exception as e:
             print(f"Error deleting position record: {str(e)}")
             return False
@@ -904,6 +984,7 @@ class StudentService:
                 {'_id': position_id},
                 {'$set': update_data}
             )
+            StudentService.refresh_verified_flag(position.get('student_id'))
 
             return result.modified_count > 0
         except Exception as e:
@@ -999,6 +1080,7 @@ class StudentService:
             project_data['updated_at'] = datetime.utcnow()
             
             result = mongo.db.projects.insert_one(project_data)
+            StudentService.refresh_verified_flag(project_data.get('student_id'))
             return str(result.inserted_id)
         except Exception as e:
             print(f"Error adding project record: {str(e)}")
@@ -1029,6 +1111,11 @@ class StudentService:
                 {'$set': update_data}
             )
             
+            # An edit can change the record's verification
+            if result.modified_count:
+                project = mongo.db.projects.find_one({'_id': project_id}, {'student_id': 1})
+                StudentService.refresh_verified_flag((project or {}).get('student_id'))
+            
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating project record: {str(e)}")
@@ -1050,8 +1137,10 @@ class StudentService:
             if isinstance(project_id, str):
                 project_id = ObjectId(project_id)
                 
-            result = mongo.db.projects.delete_one({'_id': project_id})
-            return result.deleted_count > 0
+            project = mongo.db.projects.find_one_and_delete({'_id': project_id}, projection={'student_id': 1})
+            if project:
+                StudentService.refresh_verified_flag(project.get('student_id'))
+            return project is not None
         except Exception as e:
             print(f"Error deleting project record: {str(e)}")
             return False
@@ -1087,6 +1176,7 @@ class StudentService:
                 {'_id': project_id},
                 {'$set': update_data}
             )
+            StudentService.refresh_verified_flag(project.get('student_id'))
 
             return result.modified_count > 0
         except Exception as e:
@@ -1360,6 +1450,8 @@ class StudentService:
                 print("No documents were modified")
                 return None
 
+            StudentService.refresh_verified_flag(student_id)
+
             # Get the updated student document
             updated_student = mongo.db.student.find_one({'_id': student_id})
             print(f"Updated student document: {updated_student}")
@@ -1415,6 +1507,8 @@ class StudentService:
             if result.modified_count == 0:
                 return None
 
+            StudentService.refresh_verified_flag(student_id)
+
             # Get the updated student document
             return mongo.db.student.find_one({'_id': student_id})
 
@@ -1422,11 +1516,107 @@ class StudentService:
             print(f"Error verifying all fields: {str(e)}")
             return None
 
+    @staticmethod
+    def refresh_verified_flag(student_id):
+        """
+        Recompute whether a student's profile is fully verified and store it as ``is_verified``.
+        
+        Job applications only read this flag, so every write that changes a
+        field's verification or adds, edits or removes a profile record
+        refreshes it.
+        
+        Args:
+            student_id: The ID of the student document
+            
+        Returns:
+            The stored flag, or None if the student was not found
+        """
+        try:
+            if isinstance(student_id, str):
+                student_id = ObjectId(student_id)
+            
+            student = mongo.db.student.find_one({'_id': student_id}, {'verification': 1})
+            if not student:
+                return None
+            
+            verification = student.get('verification') or {}
+            verified = all(
+                (verification.get(field) or {}).get('status') == 'verified'
+                for field in VERIFIED_FIELDS
+            ) and not any(
+                mongo.db[section].find_one({'student_id': student_id, 'is_verified': {'$ne': True}}, {'_id': 1})
+                for section in VERIFIED_SECTIONS
+            )
+            
+            # Only a changed flag is a new version of the student
+            mongo.db.student.update_one(
+                {'_id': student_id, 'is_verified': {'$ne': verified}},
+                {'$set': {'is_verified': verified, 'updated_at': datetime.utcnow()}}
+            )
+            return verified
+        except Exception as e:
+            print(f"Error refreshing verification flag: {str(e)}")
+            return None
+
+    @staticmethod
+    def backfill_verified_flags():
+        """
+        Store the verification flag on every student.
+        
+        Returns:
+            Number of students found fully verified
+        """
+        verified = 0
+        for student in mongo.db.student.find({}, {'_id': 1}):
+            if StudentService.refresh_verified_flag(student['_id']):
+                verified += 1
+        return verified
+
+    @staticmethod
+    def _cycle_student_match(batch, eligible_programs):
+        """
+        Build the aggregation stages selecting the students of a batch in the eligible programs.
+        
+        Args:
+            batch: Batch year to filter by
+            eligible_programs: List of eligible programs (e.g., ['btech', 'mtech'])
+            
+        Returns:
+            List of aggregation pipeline stages
+        """
+        return [
+            {'$match': {'batch': batch, 'program': {'$in': list(eligible_programs or [])}}}
+        ]
+    
+    @staticmethod
+    def count_students_by_cohort(batches):
+        """
+        Count students per batch and program for several batches in one aggregation.
+        
+        Args:
+            batches: Batch years to count
+            
+        Returns:
+            Dictionary mapping (batch, program) to the number of students
+        """
+        try:
+            rows = mongo.db.student.aggregate([
+                {'$match': {'batch': {'$in': list(batches)}}},
+                {'$group': {'_id': {'batch': '$batch', 'program': '$program'}, 'count': {'$sum': 1}}}
+            ])
+            return {(row['_id'].get('batch'), row['_id'].get('program')): row['count'] for row in rows}
+        except Exception as e:
+            print(f"Error counting students by cohort: {str(e)}")
+            return {}
+    
     @staticmethod
     def get_students_by_cycle(cycle_id, batch, eligible_programs):
         """
         Get students eligible for a specific placement cycle based on batch and programs
         
+        The cycle's job IDs are read once; students are then matched and
+        joined to their applications for those jobs in a single aggregation.
+        
         Args:
             cycle_id: ID of the placement cycle
             batch: Batch year to filter by
@@ -1436,85 +1626,118 @@ class StudentService:
             List of formatted student documents for the cycle
         """
         try:
-            # Match students with the given batch
-            students = list(mongo.db.student.find({'enrollmentYear': batch}))
-
-            logger.info(f"Students in batch {batch}: {students}")
-            # Process students to match program eligibility
-            eligible_students = []
+            # Get all jobs in this cycle
+            job_ids = [job['_id'] for job in mongo.db.jobs.find({'cycleId': cycle_id}, {'_id': 1})]
+            
+            pipeline = StudentService._cycle_student_match(batch, eligible_programs) + [
+                # Count the student's applications to this cycle's jobs by status
+                {'$lookup': {
+                    'from': 'applications',
+                    'let': {'user_id': '$user_id'},
+                    'pipeline': [
+                        {'$match': {
+                            'job_id': {'$in': job_ids},
+                            '$expr': {'$eq': ['$student_id', '$$user_id']}
+                        }},
+                        {'$group': {
+                            '_id': None,
+                            'applied': {'$sum': 1},
+                            'selected': {'$sum': {'$cond': [{'$eq': ['$status', 'selected']}, 1, 0]}},
+                            'rejected': {'$sum': {'$cond': [{'$eq': ['$status', 'rejected']}, 1, 0]}}
+                        }}
+                    ],
+                    'as': 'applicationCounts'
+                }},
+                {'$project': {
+                    '_id': 1,
+                    'name': 1,
+                    'student_id': 1,
+                    'major': 1,
+                    'program': 1,
+                    'cgpa': {'$convert': {'input': '$cgpa', 'to': 'double', 'onError': 0.0, 'onNull': 0.0}},
+                    'status': 1,
+                    'counts': {'$ifNull': [{'$arrayElemAt': ['$applicationCounts', 0]}, {}]}
+                }}
+            ]
             
-            for student in students:
-                # Check program eligibility based on email
-                email = student.get('email', '')
-                program_identifier = None
-                
-                if '@' in email:
-                    program_identifier = email.split('@')[0][6].lower()
-                
-                # Match program identifier with eligible programs
-                is_eligible = False
-                student_program = ""
-                
-                if 'btech' in eligible_programs and program_identifier == 'b':
-                    is_eligible = True
-                    student_program = "B.Tech"
-                elif 'mtech' in eligible_programs and program_identifier == 'm':
-                    is_eligible = True
-                    student_program = "M.Tech"
-                elif 'phd' in eligible_programs and program_identifier == 'p':
-                    is_eligible = True
-                    student_program = "PhD"
-                
-                if not is_eligible:
-                    continue
+            eligible_students = []
+            for student in mongo.db.student.aggregate(pipeline):
+                counts = student['counts']
+                applied = counts.get('applied', 0)
+                selected = counts.get('selected', 0)
+                rejected = counts.get('rejected', 0)
                 
                 # Format student for response
-                formatted_student = {
+                eligible_students.append({
                     "id": str(student.get("_id", "")),
                     "name": student.get("name", ""),
                     "rollNo": student.get("student_id", ""),
                     "branch": student.get("major", ""),
-                    "program": student_program,
-                    "cgpa": float(student.get("cgpa", 0)),
+                    "program": PROGRAM_NAMES.get(student.get("program"), ""),
+                    "cgpa": student.get("cgpa", 0.0),
                     "status": student.get("status", "Registered"),
-                    "jobsApplied": 0,
-                    "jobsSelected": 0,
-                    "jobsRejected": 0,
-                    "jobsInProgress": 0
-                }
-                
-                # Get job application statistics for this student
-                student_id = str(student.get("_id", ""))
-                
-                # Get all jobs in this cycle
-                jobs = list(mongo.db.jobs.find({"cycleId": cycle_id}))
-                job_ids = [str(job["_id"]) for job in jobs]
-                
-                # Get student's applications for jobs in this cycle
-                if job_ids:
-                    applications = list(mongo.db.applications.find({
-                        "studentId": student_id,
-                        "jobId": {"$in": job_ids}
-                    }))
-                    
-                    if applications:
-                        formatted_student["jobsApplied"] = len(applications)
-                        formatted_student["jobsSelected"] = len([a for a in applications if a.get("status") == "selected"])
-                        formatted_student["jobsRejected"] = len([a for a in applications if a.get("status") == "rejected"])
-                        formatted_student["jobsInProgress"] = len([a for a in applications if a.get("status") not in ["selected", "rejected"]])
-                
-                eligible_students.append(formatted_student)
+                    "jobsApplied": applied,
+                    "jobsSelected": selected,
+                    "jobsRejected": rejected,
+                    "jobsInProgress": applied - selected - rejected
+                })
             
             return eligible_students
         
         except Exception as e:
             print(f"Error getting students for cycle: {str(e)}")
             return []
+    
+    @staticmethod
+    def ensure_indexes():
+        """Create the indexes used to list the students of a cycle and check verification."""
+        mongo.db.student.create_index([('batch', 1), ('program', 1)])
+        mongo.db.student.create_index([('roll_number', 1), ('_id', 1)])
+        mongo.db.student.create_index('user_id')
+        mongo.db.users.create_index([('role', 1), ('batch', 1), ('department', 1), ('program', 1)])
+        mongo.db.applications.create_index([('student_id', 1), ('job_id', 1)])
+        for section in VERIFIED_SECTIONS:
+            mongo.db[section].create_index('student_id')
+
+    @staticmethod
+    def backfill_cohorts(batch_size=500):
+        """
+        Store batch, department and program on students and student users created before they were recorded.
+        
+        Args:
+            batch_size: Number of updates sent per bulk write
+            
+        Returns:
+            Dictionary with the number of users and students updated
+        """
+        updated = {}
+        for name, query in (('users', {'role': 'student'}), ('student', {})):
+            collection = mongo.db[name]
+            updated[name] = 0
+            operations = []
+            documents = collection.find(
+                {**query, '$or': [{field: {'$exists': False}} for field in ('batch', 'department', 'program')]},
+                {'email': 1}
+            ).batch_size(batch_size)
+            
+            for document in documents:
+                update = parse_cohort(document.get('email'))
+                if name == 'student':
+                    update['updated_at'] = datetime.utcnow()
+                operations.append(UpdateOne({'_id': document['_id']}, {'$set': update}))
+                if len(operations) == batch_size:
+                    updated[name] += collection.bulk_write(operations, ordered=False).modified_count
+                    operations = []
+            
+            if operations:
+                updated[name] += collection.bulk_write(operations, ordered=False).modified_count
+        
+        return updated
 
     @staticmethod
     def get_student_eligible_cycles(student_id):
         """
-        Find all placement cycles that a student is eligible for based on their enrollment year and program
+        Find all placement cycles that a student is eligible for based on their batch and program
         
         Args:
             student_id: ID of the student
@@ -1527,34 +1750,14 @@ class StudentService:
             if isinstance(student_id, str):
                 student_id = ObjectId(student_id)
             
-            student = mongo.db.student.find_one({'user_id': student_id})
-            if not student:
-                return []
-            
-            enrollment_year = student.get('enrollmentYear')
-            email = student.get('email', '')
-            
-            # Determine program type from email
-            program_identifier = None
-            program_type = None
-            
-            if '@' in email:
-                program_identifier = email.split('@')[0][6].lower()
-                
-                if program_identifier == 'b':
-                    program_type = 'btech'
-                elif program_identifier == 'm':
-                    program_type = 'mtech'
-                elif program_identifier == 'p':
-                    program_type = 'phd'
-            
-            if not enrollment_year or not program_type:
+            student = mongo.db.student.find_one({'user_id': student_id}, {'batch': 1, 'program': 1})
+            if not student or not student.get('batch') or not student.get('program'):
                 return []
             
             # Find active placement cycles matching the student's batch and program
             cycle = mongo.db.placement_cycles.find_one({
-                'batch': enrollment_year,
-                'eligiblePrograms': program_type,
+                'batch': student['batch'],
+                'eligiblePrograms': student['program'],
                 'status': 'active'  # Only include active cycles
             })
 
@@ -1591,41 +1794,18 @@ class StudentService:
             batch = cycle['batch']
             print(f"Looking for students in batch: {batch}")
             
-            # Get users with role 'student' and matching batch from email
-            users = list(mongo.db.users.find({
-                'role': 'student',
-                'email': {'$regex': f'^{batch}cs'}  # Match emails starting with batch year and 'cs'
-            }))
-            
-            print(f"Found {len(users)} students in batch {batch}")
-            print("Student details:")
-            for user in users:
-                print(f"- Email: {user.get('email')}")
-            
-            # Filter students by program eligibility
-            eligible_students = []
-            for user in users:
-                email = user.get('email', '')
-                if '@' in email:
-                    program_identifier = email.split('@')[0][6].lower()  # Get the character after 'cs'
-                    print(f"\nChecking eligibility for {email}:")
-                    print(f"Program identifier: {program_identifier}")
-                    
-                    # Map single letter to full program name
-                    program_map = {
-                        'b': 'btech',
-                        'm': 'mtech',
-                        'p': 'phd'
-                    }
-                    program_type = program_map.get(program_identifier)
-                    print(f"Mapped program type: {program_type}")
-                    print(f"Is in eligible programs? {program_type in cycle.get('eligiblePrograms', [])}")
-                    
-                    if program_type and program_type in cycle.get('eligiblePrograms', []):
-                        eligible_students.append(email)
-                        print(f"[ELIGIBLE] {email} is eligible")
-                    else:
-                        print(f"[NOT ELIGIBLE] {email} is not eligible")
+            # Get the student users of the cycle's batch, department and eligible programs
+            eligible_students = [
+                user['email'] for user in mongo.db.users.find(
+                    {
+                        'role': 'student',
+                        'batch': batch,
+                        'department': CYCLE_EMAIL_DEPARTMENT,
+                        'program': {'$in': cycle.get('eligiblePrograms', [])}
+                    },
+                    {'email': 1}
+                )
+            ]
             
             print(f"\nFound {len(eligible_students)} eligible students")
             print(f"Eligible emails: {eligible_students}")
@@ -0,0 +1,159 @@
+# app/utils/blob_store.py
+from app import mongo
+from flask import current_app
+from datetime import datetime
+import gridfs
+import shutil
+import os
+import re
+
+
+class GridFSBlobStore:
+    """Blob store keeping files in a GridFS bucket, shared by every app node."""
+
+    def __init__(self, db, bucket_name='report_files'):
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+
+    def put(self, name, source):
+        """
+        Store a file, replacing any existing file with the same name.
+
+        Args:
+            name: Name of the blob (slash-separated, like a path)
+            source: Bytes or a readable binary file object
+        """
+        if isinstance(source, (bytes, bytearray)):
+            file_id = self.bucket.upload_from_stream(name, bytes(source))
+        else:
+            file_id = self.bucket.upload_from_stream(name, source)
+
+        # Older versions are removed only once the new one is complete
+        for old in self.files.find({'filename': name, '_id': {'$ne': file_id}}, {'_id': 1}):
+            self.bucket.delete(old['_id'])
+
+    def open(self, name):
+        """Open a blob for reading, or return None if it does not exist."""
+        try:
+            return self.bucket.open_download_stream_by_name(name)
+        except gridfs.errors.NoFile:
+            return None
+
+    def stat(self, name):
+        """
+        Get the size and modification time of a blob.
+
+        Returns:
+            Dictionary with length and modified, or None if the blob does not exist
+        """
+        latest = self.files.find_one(
+            {'filename': name},
+            {'length': 1, 'uploadDate': 1},
+            sort=[('uploadDate', -1)]
+        )
+        if not latest:
+            return None
+        return {'length': latest['length'], 'modified': latest['uploadDate']}
+
+    def delete_prefix(self, prefix):
+        """Delete every blob whose name starts with the prefix."""
+        for old in self.files.find({'filename': {'$regex': f"^{re.escape(prefix)}"}}, {'_id': 1}):
+            self.bucket.delete(old['_id'])
+
+
+class LocalBlobStore:
+    """Blob store on the local disk, for development and single-host deployments."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def put(self, name, source):
+        """
+        Store a file, replacing any existing file with the same name.
+
+        Args:
+            name: Name of the blob (slash-separated, like a path)
+            source: Bytes or a readable binary file object
+        """
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            if isinstance(source, (bytes, bytearray)):
+                f.write(source)
+            else:
+                shutil.copyfileobj(source, f)
+        os.replace(temp_path, path)
+
+    def open(self, name):
+        """Open a blob for reading, or return None if it does not exist."""
+        try:
+            return open(self._path(name), 'rb')
+        except FileNotFoundError:
+            return None
+
+    def stat(self, name):
+        """
+        Get the size and modification time of a blob.
+
+        Returns:
+            Dictionary with length and modified, or None if the blob does not exist
+        """
+        try:
+            info = os.stat(self._path(name))
+        except FileNotFoundError:
+            return None
+        return {'length': info.st_size, 'modified': datetime.utcfromtimestamp(info.st_mtime)}
+
+    def delete_prefix(self, prefix):
+        """Delete every blob whose name starts with the prefix."""
+        path = self._path(prefix.rstrip('/'))
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def get_report_store():
+    """
+    Get the blob store configured for report artifacts.
+
+    REPORT_STORAGE selects 'gridfs' (the default, shared across app nodes) or
+    'local' (files under UPLOAD_FOLDER/reports).
+    """
+    if current_app.config.get('REPORT_STORAGE', 'gridfs') == 'local':
+        return LocalBlobStore(os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), 'reports'))
+    return GridFSBlobStore(mongo.db, current_app.config.get('REPORT_GRIDFS_BUCKET', 'report_files'))
+
+
+def iter_blob(blob, start=0, end=None, chunk_size=256 * 1024):
+    """
+    Read a blob in chunks, optionally only a byte range of it.
+
+    Args:
+        blob: File object returned by a blob store's open()
+        start: First byte to read
+        end: Byte after the last one to read (defaults to the end of the blob)
+        chunk_size: Maximum size of each chunk
+
+    Yields:
+        Chunks of bytes
+    """
+    try:
+        if start:
+            blob.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = blob.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    finally:
+        blob.close()
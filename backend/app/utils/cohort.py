@@ -0,0 +1,32 @@
+# app/utils/cohort.py
+import re
+
+# Institute emails look like 2022csb1234@...: batch year, department, program letter
+EMAIL_PATTERN = re.compile(r'^(\d{4})([^@]{2})([a-z])[^@]*@', re.IGNORECASE)
+
+PROGRAMS_BY_CODE = {'b': 'btech', 'm': 'mtech', 'p': 'phd'}
+
+
+def parse_cohort(email):
+    """
+    Read a student's batch, department and program from their institute email.
+
+    Only meant for the moment a student is created (or backfilled); queries
+    should use the stored ``batch``, ``department`` and ``program`` fields.
+
+    Args:
+        email: The student's email address
+
+    Returns:
+        Dictionary with batch (e.g. '2022'), department code (e.g. 'cs') and
+        program ('btech', 'mtech' or 'phd'); a value is None when it cannot be
+        read from the email
+    """
+    match = EMAIL_PATTERN.match(email or '')
+    if not match:
+        return {'batch': None, 'department': None, 'program': None}
+    return {
+        'batch': match.group(1),
+        'department': match.group(2).lower(),
+        'program': PROGRAMS_BY_CODE.get(match.group(3).lower())
+    }
@@ -0,0 +1,114 @@
+# app/utils/compensation.py
+import re
+
+NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+# "cr"/"crore" as a unit, also straight after the number ("1.2cr"), but not inside words like "accrued"
+CRORE_PATTERN = re.compile(r'(?<![a-z])(?:cr|crores?)\b')
+
+# Amounts quoted per month ("50000/month", "50k per month", "40000 pm")
+MONTHLY_PATTERN = re.compile(r'/\s*(?:month|mo)\b|per\s+month|\bp\.?m\b|\bmonthly\b')
+
+# Job fields holding an annual package, in order of preference
+PACKAGE_FIELDS = ['package', 'salary']
+
+# Job fields a numeric package or stipend is derived from
+COMPENSATION_FIELDS = PACKAGE_FIELDS + ['stipend']
+
+
+def parse_package(value):
+    """
+    Convert a free-text package such as "12 LPA" or "12.5" into lakhs per annum.
+
+    Commas are ignored and the first number in the text is used. Amounts in
+    crores are scaled to lakhs, plain rupee amounts (1000 or more without
+    a unit) are converted to lakhs, and amounts quoted per month are
+    annualized.
+
+    Args:
+        value: The package as entered on the job (string or number)
+
+    Returns:
+        The package in LPA as a float, or None if no amount can be read
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).replace(',', '').lower()
+    match = NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+
+    amount = float(match.group())
+    if CRORE_PATTERN.search(text):
+        amount *= 100
+    elif amount >= 1000 and not re.search(r'lpa|lakh|lac|\bl\b', text):
+        amount /= 100000
+
+    if MONTHLY_PATTERN.search(text):
+        amount *= 12
+
+    return round(amount, 2)
+
+
+def parse_stipend(value):
+    """
+    Convert a free-text monthly stipend such as "50,000" or "50k" into rupees per month.
+
+    Args:
+        value: The stipend as entered on the job (string or number)
+
+    Returns:
+        The stipend in rupees per month as a float, or None if no amount can be read
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).replace(',', '').lower()
+    match = NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+
+    amount = float(match.group())
+    if re.match(r'\s*k\b', text[match.end():]):
+        amount *= 1000
+    elif re.search(r'lakh|lac', text):
+        amount *= 100000
+
+    return round(amount, 2)
+
+
+def job_package_value(job):
+    """
+    Get the annual package of a job from whichever package field it uses.
+
+    Stipends are monthly and are kept apart, see ``job_stipend_value``.
+
+    Args:
+        job: Job document or job data dictionary
+
+    Returns:
+        The package in LPA as a float, or None if the job has no readable amount
+    """
+    for field in PACKAGE_FIELDS:
+        amount = parse_package(job.get(field))
+        if amount is not None:
+            return amount
+    return None
+
+
+def job_stipend_value(job):
+    """
+    Get the monthly stipend of a job.
+
+    Args:
+        job: Job document or job data dictionary
+
+    Returns:
+        The stipend in rupees per month as a float, or None if the job has no readable stipend
+    """
+    return parse_stipend(job.get('stipend'))
@@ -1,5 +1,6 @@
 # app/utils/errors.py
 from flask import jsonify
+from app.utils.pagination import InvalidCursor
 
 def register_error_handlers(app):
     @app.errorhandler(400)
@@ -21,3 +22,7 @@ def register_error_handlers(app):
     @app.errorhandler(500)
     def internal_server_error(e):
         return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
+    
+    @app.errorhandler(InvalidCursor)
+    def invalid_cursor(e):
+        return jsonify({"error": "Bad Request", "message": str(e)}), 400
@@ -0,0 +1,165 @@
+# app/utils/pagination.py
+from bson import json_util
+import base64
+import threading
+import time
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(values):
+    """
+    Turn the sort-key values of the last item on a page into an opaque cursor.
+
+    Args:
+        values: Sort-key values, in sort order
+
+    Returns:
+        URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """
+    Read the sort-key values back from a cursor.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+        sort: Sort specification the cursor must match, as (field, direction) pairs
+
+    Returns:
+        List of sort-key values
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or was made for another sort
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise InvalidCursor("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise InvalidCursor("Invalid pagination cursor")
+    return values
+
+
+def cursor_args(args):
+    """
+    Read the keyset pagination arguments of a list request.
+
+    ``cursor`` selects keyset pagination (empty for the first page) and
+    ``total`` whether to count all items; totals default to on for page
+    numbers and off for cursors.
+
+    Args:
+        args: The request's query arguments
+
+    Returns:
+        Tuple of (cursor or None, include_total)
+    """
+    cursor = args.get('cursor')
+    total = args.get('total')
+    if total is None:
+        return cursor, cursor is None
+    return cursor, total.lower() in ('true', '1', 't')
+
+
+def _field_value(document, field):
+    """Read a dotted field from a document."""
+    for part in field.split('.'):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(part)
+    return document
+
+
+def _after(field, value, direction):
+    """Match values of one field that sort after ``value`` (nulls sort first ascending)."""
+    if direction == 1:
+        return {field: {'$ne': None}} if value is None else {field: {'$gt': value}}
+    if value is None:
+        return None
+    return {'$or': [{field: {'$lt': value}}, {field: None}]}
+
+
+def keyset_filter(sort, values):
+    """
+    Build the filter selecting items after a cursor position.
+
+    Args:
+        sort: Sort specification as (field, direction) pairs, ending in a unique field
+        values: Sort-key values of the last item already returned
+
+    Returns:
+        Mongo filter for the following items
+    """
+    branches = []
+    for index, (field, direction) in enumerate(sort):
+        after = _after(field, values[index], direction)
+        if after is None:
+            continue
+        equal = {prefix: values[i] for i, (prefix, _) in enumerate(sort[:index])}
+        branches.append({**equal, **after})
+    return {'$or': branches} if branches else {'_id': {'$exists': False}}
+
+
+def next_cursor(items, sort, per_page):
+    """
+    Get the cursor of the page after ``items``.
+
+    Callers fetch ``per_page + 1`` items; the extra one only signals that a
+    next page exists and is removed from ``items``.
+
+    Args:
+        items: Items fetched for the page (modified in place)
+        sort: Sort specification as (field, direction) pairs
+        per_page: Items per page
+
+    Returns:
+        Cursor string, or None on the last page
+    """
+    if len(items) <= per_page:
+        return None
+    del items[per_page:]
+    return encode_cursor([_field_value(items[-1], field) for field, _ in sort])
+
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def cached_count(collection, query, ttl=30):
+    """
+    Count the documents matching a query, reusing recent counts.
+
+    Unfiltered collections use the metadata estimate instead of counting.
+
+    Args:
+        collection: The pymongo collection
+        query: The filter to count
+        ttl: Seconds a count is reused for
+
+    Returns:
+        Number of matching documents
+    """
+    if not query:
+        return collection.estimated_document_count()
+
+    key = (collection.full_name, json_util.dumps(query, sort_keys=True))
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached and now - cached[1] < ttl:
+            return cached[0]
+
+    total = collection.count_documents(query)
+    with _count_lock:
+        # Drop expired entries so the cache stays small
+        if len(_count_cache) > 1000:
+            for stale in [k for k, (_, at) in _count_cache.items() if now - at >= ttl]:
+                del _count_cache[stale]
+        _count_cache[key] = (total, now)
+    return total
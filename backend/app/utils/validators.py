@@ -1,4 +1,5 @@
 from datetime import datetime
+from croniter import croniter
 import re
 
 def validate_login(data):
@@ -330,4 +331,31 @@ def validate_student_profile(data):
     
     # Add more validations as needed for other fields
     
-    return errors
\ No newline at end of file
+    return errors
+
+
+def validate_report_schedule(data):
+    """
+    Validate the schedule of a report template.
+    
+    Args:
+        data: Dictionary containing template data
+        
+    Returns:
+        Dictionary of validation errors or None if valid
+    """
+    errors = {}
+    
+    if not data.get('schedule'):
+        return None
+    
+    if not croniter.is_valid(data['schedule']):
+        errors['schedule'] = 'Schedule must be a valid cron expression'
+    
+    if not data.get('reportType'):
+        errors['reportType'] = 'Report type is required for scheduled templates'
+    
+    if not isinstance(data.get('filters'), dict) or not data['filters']:
+        errors['filters'] = 'Filters are required for scheduled templates'
+    
+    return errors if errors else None
@@ -32,6 +32,7 @@ import {
 } from "@/components/ui/dialog";
 import { useJobsApi } from "@/lib/api/jobs";
 import { useApi } from "@/lib/api";
+import { useReportsApi } from "@/lib/api/reports";
 
 interface JobApplicantsProps {
   jobId: string;
@@ -69,6 +70,7 @@ export function JobApplicants({ jobId }: JobApplicantsProps) {
 
   const jobsApi = useJobsApi();
   const { fetchWithAuth } = useApi();
+  const { generateReport } = useReportsApi();
 
   useEffect(() => {
     async function fetchData() {
@@ -136,24 +138,8 @@ export function JobApplicants({ jobId }: JobApplicantsProps) {
         status: statusFilter !== "all" ? statusFilter : undefined
       };
       
-      // Call the backend report generation API
-      const response = await fetchWithAuth('/api/reports/generate', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          type: 'job_applicants',
-          filters: filters,
-          includeResumeLinks: true  // Tell the backend to include resume links
-        })
-      });
-      
-      if (!response.ok) {
-        throw new Error(`Failed to generate report: ${response.status}`);
-      }
-      
-      const report = await response.json();
+      // Queue the report and wait for it to finish
+      const report = await generateReport('job_applicants', filters);
       
       // Now download the generated report
       const downloadResponse = await fetchWithAuth(`/api/reports/download/${report.id}?format=excel`, {
@@ -197,14 +183,10 @@ export function JobApplicants({ jobId }: JobApplicantsProps) {
     try {
       setIsUpdatingStatus(true);
       
-      // Call the API to update status for each selected application
+      // Update every selected application in one request
       // Status represents overall application state (selected, rejected, etc.)
       // while currentStage represents the specific hiring workflow step
-      const promises = selectedApplications.map(appId => 
-        jobsApi.updateApplicationStatus(appId, status, currentStage)
-      );
-      
-      await Promise.all(promises);
+      await jobsApi.bulkUpdateApplicationStatus(selectedApplications, status, currentStage);
       
       // Refresh the data
       const applicationData = await jobsApi.getJobApplications(jobId);
@@ -12,6 +12,9 @@ import { FileSpreadsheet, FileText, Filter, Loader2 } from "lucide-react"
 import { Sheet, SheetContent, SheetHeader, SheetTitle, SheetTrigger } from "@/components/ui/sheet"
 import { ScrollArea } from "@/components/ui/scroll-area"
 import { useApi } from "@/lib/api"
+import { useReportsApi } from "@/lib/api/reports"
+
+const ROWS_PAGE_SIZE = 500;
 
 interface ReportType {
   id: string;
@@ -26,12 +29,15 @@ interface PlacementCycle {
 
 export function ReportGenerator() {
   const { fetchWithAuth } = useApi();
+  const { generateReport: queueReport, getReportRows } = useReportsApi();
   const [selectedReport, setSelectedReport] = useState("")
   const [selectedCycle, setSelectedCycle] = useState("")
   const [reportTypes, setReportTypes] = useState<ReportType[]>([])
   const [placementCycles, setPlacementCycles] = useState<PlacementCycle[]>([])
   const [isLoading, setIsLoading] = useState(false)
   const [reportData, setReportData] = useState<any[]>([])
+  const [totalRows, setTotalRows] = useState(0)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
   const [reportId, setReportId] = useState<string | null>(null)
   const [reportSummary, setReportSummary] = useState<any>(null)
   const [filters, setFilters] = useState({
@@ -89,44 +95,32 @@ export function ReportGenerator() {
     setIsLoading(true);
     
     try {
-      const response = await fetchWithAuth('/api/reports/generate', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-          type: selectedReport,
-          filters: {
-            cycleId: selectedCycle,
-            branches: filters.branches.length > 0 ? filters.branches : undefined,
-            companies: filters.companies.length > 0 ? filters.companies : undefined,
-            minPackage: filters.minPackage || undefined,
-            maxPackage: filters.maxPackage || undefined,
-            status: filters.status.length > 0 ? filters.status : undefined
-          }
-        })
+      const data = await queueReport(selectedReport, {
+        cycleId: selectedCycle,
+        branches: filters.branches.length > 0 ? filters.branches : undefined,
+        companies: filters.companies.length > 0 ? filters.companies : undefined,
+        minPackage: filters.minPackage || undefined,
+        maxPackage: filters.maxPackage || undefined,
+        status: filters.status.length > 0 ? filters.status : undefined
       });
-
-      if (!response.ok) {
-        const error = await response.json();
-        throw new Error(error.message || 'Failed to generate report');
-      }
-      
-      const data = await response.json();
       console.log(data);
       setReportId(data.id);
-      setReportData(data.data || []);
+      
+      // Large reports are not inlined; load their first page of rows
+      const rows = data.data || (await getReportRows(data.id, 0, ROWS_PAGE_SIZE)).rows;
+      setReportData(rows);
+      setTotalRows(data.rowCount ?? rows.length);
       
       // Extract summary data if available
       if (data.summary) {
         setReportSummary(data.summary);
       } else {
-        // If no summary is provided, create a basic one based on the data
+        // If no summary is provided, create a basic one based on the loaded rows
         setReportSummary({
-          totalStudents: data.data?.length || 0,
-          placedStudents: data.data?.filter((item: any) => item.status === "Placed").length || 0,
-          averagePackage: data.data?.reduce((sum: number, item: any) => sum + (parseFloat(item.package) || 0), 0) / (data.data?.length || 1),
-          highestPackage: Math.max(...(data.data?.map((item: any) => parseFloat(item.package) || 0) || [0]))
+          totalStudents: data.rowCount ?? rows.length,
+          placedStudents: rows.filter((item: any) => item.status === "Placed").length,
+          averagePackage: rows.reduce((sum: number, item: any) => sum + (parseFloat(item.package) || 0), 0) / (rows.length || 1),
+          highestPackage: Math.max(...rows.map((item: any) => parseFloat(item.package) || 0), 0)
         });
       }
     } catch (error) {
@@ -136,6 +130,22 @@ export function ReportGenerator() {
     }
   }
 
+  // Load the next page of a large report
+  const loadMoreRows = async () => {
+    if (!reportId) return;
+
+    setIsLoadingMore(true);
+    try {
+      const page = await getReportRows(reportId, reportData.length, ROWS_PAGE_SIZE);
+      setReportData((rows) => [...rows, ...page.rows]);
+      setTotalRows(page.total);
+    } catch (error) {
+      console.error("Error loading report rows:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  }
+
   // Export report
   const handleExport = async (format: "excel" | "pdf") => {
     if (!reportId) {
@@ -185,8 +195,7 @@ export function ReportGenerator() {
       const reportName = reportTypes.find(rt => rt.id === selectedReport)?.name || selectedReport || 'report';
       const cycleName = placementCycles.find(pc => pc.id === selectedCycle)?.name || selectedCycle || 'cycle';
       const timestamp = new Date().toISOString().split('T')[0];
-      // Note: Backend currently generates CSV for PDF. Adjust extension if backend changes.
-      const extension = format === 'excel' ? 'xlsx' : 'csv'; // Use 'pdf' if backend generates actual PDFs
+      const extension = format === 'excel' ? 'xlsx' : 'pdf';
       a.download = `${reportName}_${cycleName}_${timestamp}.${extension}`;
 
       // Trigger download
@@ -408,6 +417,17 @@ export function ReportGenerator() {
                 columns={getColumnsFromData()} 
                 data={reportData} 
               />
+              {reportData.length < totalRows && (
+                <div className="mt-4 flex items-center justify-between">
+                  <p className="text-sm text-muted-foreground">
+                    Showing {reportData.length} of {totalRows} rows
+                  </p>
+                  <Button variant="outline" size="sm" onClick={loadMoreRows} disabled={isLoadingMore}>
+                    {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                    Load more
+                  </Button>
+                </div>
+              )}
             </CardContent>
           </Card>
 
@@ -67,6 +67,20 @@ export interface StudentProfile {
   cgpa:number
 }
 
+export interface JobApplicantsPage {
+  applicants: StudentProfile[];
+  total: number;
+  statusCounts: Record<string, number>;
+  page: number;
+  per_page: number;
+  nextCursor: string | null;
+}
+
+export interface BulkStatusUpdateResult {
+  updated: number;
+  results: { id: string; result: 'updated' | 'not_found' | 'conflict' | 'invalid' }[];
+}
+
 export function useJobsApi() {
   const { fetchWithAuth } = useApi();
 
@@ -158,8 +172,20 @@ export function useJobsApi() {
     });
   };
 
-  const getJobApplications = async (jobId: string): Promise<StudentProfile[]> => {
-    const response = await fetchWithAuth(`/api/jobs/${jobId}/applications`);
+  // Read one page of a job's applicants, with the total and per-status counts.
+  // Pass the previous page's nextCursor (or "" for the first page).
+  const getJobApplicantsPage = async (
+    jobId: string,
+    cursor = '',
+    perPage = 2000,
+    status?: string
+  ): Promise<JobApplicantsPage> => {
+    const params = new URLSearchParams({ cursor, per_page: String(perPage) });
+    if (status) {
+      params.set('status', status);
+    }
+
+    const response = await fetchWithAuth(`/api/jobs/${jobId}/applications?${params.toString()}`);
     if (!response.ok) {
       const error = await response.json();
       throw new Error(error.message || 'Failed to fetch applications');
@@ -167,6 +193,18 @@ export function useJobsApi() {
     return response.json();
   };
 
+  // Read every applicant of a job, following the cursor across pages.
+  const getJobApplications = async (jobId: string): Promise<StudentProfile[]> => {
+    const applicants: StudentProfile[] = [];
+    let cursor = '';
+    do {
+      const page = await getJobApplicantsPage(jobId, cursor);
+      applicants.push(...page.applicants);
+      cursor = page.nextCursor ?? '';
+    } while (cursor);
+    return applicants;
+  };
+
   const updateApplicationStatus = async (applicationId: string, status: string, currentStage: string): Promise<JobApplication> => {
     const response = await fetchWithAuth(`/api/jobs/applications/${applicationId}/status`, {
       method: 'PUT',
@@ -184,12 +222,31 @@ export function useJobsApi() {
     return response.json();
   };
 
+  const bulkUpdateApplicationStatus = async (applicationIds: string[], status: string, currentStage: string): Promise<BulkStatusUpdateResult> => {
+    const response = await fetchWithAuth('/api/jobs/applications/status', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ applicationIds, status, currentStage })
+    });
+    
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.message || 'Failed to update application statuses');
+    }
+    
+    return response.json();
+  };
+
   return {
     getJobs,
     getJobById,
     applyForJob,
     getMyApplications,
+    getJobApplicantsPage,
     getJobApplications,
-    updateApplicationStatus
+    updateApplicationStatus,
+    bulkUpdateApplicationStatus
   };
 } 
\ No newline at end of file
@@ -0,0 +1,114 @@
+import { useApi } from "@/lib/api";
+
+export interface Report {
+  id: string;
+  type: string;
+  filters: Record<string, any>;
+  status: "queued" | "processing" | "completed" | "error" | "cancelled";
+  progress?: number;
+  errorMessage?: string;
+  rowCount?: number;
+  columns?: string[];
+  data?: any[];
+  summary?: any;
+}
+
+export interface ReportRowsPage {
+  rows: any[];
+  columns: string[];
+  offset: number;
+  limit: number;
+  total: number;
+}
+
+const POLL_INTERVAL_MS = 1500;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export function useReportsApi() {
+  const { fetchWithAuth } = useApi();
+
+  const getReport = async (reportId: string): Promise<Report> => {
+    const response = await fetchWithAuth(`/api/reports/${reportId}`);
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.message || 'Failed to fetch report');
+    }
+    return response.json();
+  };
+
+  // Queue a report and poll until it finishes. The backend answers 202 while the
+  // report runs in the background, or 201 with the finished report when it
+  // generates inline.
+  const generateReport = async (
+    type: string,
+    filters: Record<string, any>,
+    onProgress?: (progress: number) => void
+  ): Promise<Report> => {
+    const response = await fetchWithAuth('/api/reports/generate', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ type, filters })
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.message || 'Failed to generate report');
+    }
+
+    let report: Report = await response.json();
+    while (report.status === "queued" || report.status === "processing") {
+      onProgress?.(report.progress || 0);
+      await sleep(POLL_INTERVAL_MS);
+      report = await getReport(report.id);
+    }
+
+    if (report.status !== "completed") {
+      throw new Error(report.errorMessage || `Report ${report.status}`);
+    }
+
+    onProgress?.(100);
+    return report;
+  };
+
+  // Read one page of a report's rows. Prefix the sort column with "-" for
+  // descending order.
+  const getReportRows = async (
+    reportId: string,
+    offset = 0,
+    limit = 100,
+    sort?: string
+  ): Promise<ReportRowsPage> => {
+    const params = new URLSearchParams({ offset: String(offset), limit: String(limit) });
+    if (sort) {
+      params.set('sort', sort);
+    }
+
+    const response = await fetchWithAuth(`/api/reports/${reportId}/rows?${params.toString()}`);
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.message || 'Failed to fetch report rows');
+    }
+    return response.json();
+  };
+
+  const cancelReport = async (reportId: string): Promise<Report> => {
+    const response = await fetchWithAuth(`/api/reports/${reportId}/cancel`, {
+      method: 'POST'
+    });
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.message || 'Failed to cancel report');
+    }
+    return response.json();
+  };
+
+  return {
+    getReport,
+    generateReport,
+    getReportRows,
+    cancelReport
+  };
+}